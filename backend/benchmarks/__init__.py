@@ -0,0 +1 @@
+# Offline scraper benchmarks
@@ -0,0 +1,78 @@
+"""
+Offline evaluation of the cheap-first relevance cascade
+Scores a labeled sample (profile + job + the LLM's relevance score) with the
+local scorer and reports, per ambiguity band, the share of LLM calls the
+cascade avoids and how often its local decisions agree with the LLM
+
+Samples are JSONL with skills, interests, experience, title, description,
+requirements and llm_score; --label fills llm_score for a sample with the
+configured LLM provider (needs OPENAI_API_KEY or GEMINI_API_KEY)
+
+Usage (from repo root):
+    python -m backend.benchmarks.bench_cascade [--sample file.jsonl] [--band 10 60 ...]
+    python -m backend.benchmarks.bench_cascade --label unlabeled.jsonl --out labeled.jsonl
+"""
+import os
+import sys
+import json
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.services.relevance_cascade import RelevanceCascade, CASCADE_LOW, CASCADE_HIGH  # noqa: E402
+
+DEFAULT_SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'labeled', 'relevance_sample.jsonl')
+SWEEP_BANDS = [(0, 50), (10, 60), (15, 60), (20, 60), (10, 70), (30, 70)]
+
+
+def _load(path: str) -> list:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def _label(samples: list) -> list:
+    from backend.services.ai_validator import ai_validator
+
+    for sample in samples:
+        result = await ai_validator.validate_job_relevance(
+            sample.get('skills', []), sample.get('interests', []), sample.get('experience', ''),
+            sample.get('title', ''), sample.get('description', ''), sample.get('requirements', '')
+        )
+        sample['llm_score'] = result['relevance_score']
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the relevance cascade against LLM labels")
+    parser.add_argument('--sample', default=DEFAULT_SAMPLE, help="Labeled JSONL sample")
+    parser.add_argument('--band', nargs=2, type=float, action='append', metavar=('LOW', 'HIGH'),
+                        help="Ambiguity bands to evaluate (default: a sweep including the configured band)")
+    parser.add_argument('--label', help="Unlabeled JSONL sample to label with the configured LLM")
+    parser.add_argument('--out', help="Where --label writes the labeled sample")
+    args = parser.parse_args()
+
+    if args.label:
+        samples = asyncio.run(_label(_load(args.label)))
+        with open(args.out or args.label, 'w', encoding='utf-8') as f:
+            for sample in samples:
+                f.write(json.dumps(sample) + '\n')
+        print(f"Labeled {len(samples)} samples -> {args.out or args.label}")
+        return
+
+    samples = _load(args.sample)
+    bands = [tuple(band) for band in args.band] if args.band else sorted(set(SWEEP_BANDS) | {(CASCADE_LOW, CASCADE_HIGH)})
+
+    print(f"{len(samples)} labeled samples from {args.sample}")
+    print(f"{'band':>12} {'decided':>8} {'agree(decided)':>15} {'agree(local-only)':>18}")
+    for low, high in bands:
+        result = RelevanceCascade(low=low, high=high).evaluate(samples)
+        marker = '  <- configured' if (low, high) == (CASCADE_LOW, CASCADE_HIGH) else ''
+        print(
+            f"{f'[{low:g}, {high:g})':>12} {result['decided_locally']:>8.0%} "
+            f"{result['agreement_when_decided']:>15.1%} {result['agreement_local_only']:>18.1%}{marker}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Parse-throughput benchmark for the HTML job scrapers
+Compares the old full-document html.parser path against the shared
+lxml + SoupStrainer path in backend.utils.html_parser
+
+Usage (from repo root):
+    python -m backend.benchmarks.bench_parsing [--rounds 20]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from bs4 import BeautifulSoup
+
+from backend.utils.html_parser import HTML_PARSER, JOB_CARD_SELECTORS, parse_job_cards
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'html')
+SOURCES = ['indeed', 'linkedin', 'glassdoor', 'handshake', 'upwork']
+
+
+def _load_fixture(source: str) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, f"{source}.html"), 'rb') as f:
+        return f.read()
+
+
+def _baseline_parse(html: bytes, source: str) -> list:
+    """Previous behaviour: build the whole tree, then search it"""
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag, css_class in JOB_CARD_SELECTORS[source]:
+        cards = soup.find_all(tag, class_=css_class)
+        if cards:
+            return cards
+    return []
+
+
+def _time_parse(parse_fn, html: bytes, source: str, rounds: int) -> tuple:
+    cards = parse_fn(html, source)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        parse_fn(html, source)
+    elapsed = time.perf_counter() - start
+    return elapsed / rounds, len(cards)
+
+
+def run(rounds: int = 20) -> list:
+    """Run the benchmark and return one result dict per source"""
+    results = []
+    for source in SOURCES:
+        html = _load_fixture(source)
+        base_time, base_cards = _time_parse(_baseline_parse, html, source, rounds)
+        fast_time, fast_cards = _time_parse(parse_job_cards, html, source, rounds)
+
+        if base_cards != fast_cards:
+            raise AssertionError(f"{source}: card count mismatch ({base_cards} vs {fast_cards})")
+
+        results.append({
+            'source': source,
+            'bytes': len(html),
+            'cards': fast_cards,
+            'baseline_ms': base_time * 1000,
+            'fast_ms': fast_time * 1000,
+            'speedup': base_time / fast_time if fast_time else 0.0,
+            'fast_mb_per_s': len(html) / fast_time / 1e6 if fast_time else 0.0,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scraper HTML parsing")
+    parser.add_argument('--rounds', type=int, default=20, help="Parses per source and path")
+    args = parser.parse_args()
+
+    print(f"Parser: {HTML_PARSER}, rounds: {args.rounds}")
+    print(f"{'source':<10} {'KB':>7} {'cards':>6} {'baseline ms':>12} {'fast ms':>9} {'MB/s':>7} {'speedup':>8}")
+    for r in run(args.rounds):
+        print(
+            f"{r['source']:<10} {r['bytes'] / 1024:>7.1f} {r['cards']:>6} "
+            f"{r['baseline_ms']:>12.2f} {r['fast_ms']:>9.2f} {r['fast_mb_per_s']:>7.1f} {r['speedup']:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
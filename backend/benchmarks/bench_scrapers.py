@@ -0,0 +1,264 @@
+"""
+Offline benchmark for every scraper source and a full scrape cycle
+Scrapers run unmodified against recorded fixtures served by a local stub
+HTTP server; Selenium sources get a stub driver and Firestore is replaced by
+an in-memory database, so no network, Chrome or credentials are needed
+
+Reports per source: jobs, wall time, jobs/s, document parse time, peak traced
+memory and net allocated blocks; then the same for a simulated multi-user
+cycle (personalized scrapes for --users users followed by the general scrape)
+
+Usage (from repo root):
+    python -m backend.benchmarks.bench_scrapers [--rounds 5] [--users 20] [--json out.json]
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+_CACHE_ROOT = tempfile.mkdtemp(prefix='bench-http-cache-')
+os.environ['SCRAPER_HTTP_CACHE_DIR'] = _CACHE_ROOT
+os.environ['SCRAPER_ARCHIVE_DIR'] = os.path.join(_CACHE_ROOT, 'archive')
+
+from backend.benchmarks import offline  # noqa: E402
+
+db = offline.install()
+
+import requests  # noqa: E402
+
+from backend.services import scraper_api, scraper_general, scraper_personalized  # noqa: E402
+from backend.services.scraper_api import api_scraper  # noqa: E402
+from backend.services.scraper_general import general_scraper  # noqa: E402
+from backend.services.scraper_personalized import personalized_scraper  # noqa: E402
+from backend.services.scrape_policy import scrape_policy  # noqa: E402
+from backend.services.source_registry import source_registry  # noqa: E402
+from backend.services.watermarks import watermark_store  # noqa: E402
+from backend.utils.circuit_breaker import circuit_breakers  # noqa: E402
+from backend.utils.http_cache import HTTPCache  # noqa: E402
+from backend.utils.near_duplicates import near_duplicates  # noqa: E402
+from backend.utils.query_memo import query_memo  # noqa: E402
+
+# Source name -> zero-arg coroutine function (breaker name is the same)
+SOURCES = {
+    'RemoteOK': lambda: api_scraper.scrape_remoteok('', 100),
+    'Arbeitnow': lambda: api_scraper.scrape_arbeitnow('', 100),
+    'Himalayas': lambda: api_scraper.scrape_github_jobs('', 'US', 100),
+    'Adzuna': lambda: api_scraper.scrape_adzuna('python', 'US', 50),
+    'USAJobs': lambda: api_scraper.scrape_usajobs('analyst', 100),
+    'Indeed': lambda: personalized_scraper.scrape_indeed('python', 'Remote', 200),
+    'LinkedIn': lambda: personalized_scraper.scrape_linkedin('python', 'Remote', 200),
+    'Glassdoor': lambda: personalized_scraper.scrape_glassdoor('python', 'Remote', 200),
+    'Handshake': lambda: personalized_scraper.scrape_handshake('python', 'Remote', 200),
+    'Upwork': lambda: general_scraper.scrape_upwork_gigs(100),
+    'Fiverr': lambda: general_scraper.scrape_fiverr_gigs(),
+}
+
+# Skill sets for simulated users; repeats exercise the query memo like real overlap does
+USER_PROFILES = [
+    (['Python'], 'Senior'),
+    (['Python', 'SQL'], 'Mid Level'),
+    (['React'], 'Entry Level'),
+    (['Data Analyst'], 'Student'),
+    (['Java'], 'Senior'),
+    (['Python'], 'Entry Level'),
+    (['DevOps'], 'Mid Level'),
+]
+
+
+class ParseTimer:
+    """Accumulates time spent decoding JSON and parsing HTML inside the scrapers"""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self._restore = []
+
+    def _wrap(self, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.seconds += time.perf_counter() - start
+        return timed
+
+    def _patch(self, owner, name, value):
+        self._restore.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, value)
+
+    def __enter__(self):
+        self._patch(scraper_api, 'json', type(sys)('json'))
+        scraper_api.json.loads = self._wrap(json.loads)
+        self._patch(requests.Response, 'json', self._wrap(requests.Response.json))
+        for module in (scraper_personalized, scraper_general):
+            self._patch(module, 'parse_job_cards', self._wrap(module.parse_job_cards))
+        self._patch(scraper_personalized, 'parse_html', self._wrap(scraper_personalized.parse_html))
+        return self
+
+    def __exit__(self, *exc):
+        for owner, name, value in reversed(self._restore):
+            setattr(owner, name, value)
+        self._restore = []
+
+
+def _route_to_stub(base_url: str):
+    """Send scraper traffic to the stub server and drop politeness sleeps and source rate limits"""
+    for scraper in (api_scraper, general_scraper, personalized_scraper):
+        offline.route_session(scraper.session, base_url)
+    for scraper in (general_scraper, personalized_scraper):
+        scraper._get_selenium_driver = lambda: offline.StubDriver(base_url)
+        scraper._random_delay = lambda *args, **kwargs: None
+    for adapter in source_registry._adapters.values():
+        adapter.min_interval_seconds = 0
+
+
+def _reset_state(round_name: str):
+    """Start from an empty database and cold caches"""
+    db.clear()
+    api_scraper.http_cache = HTTPCache(cache_dir=os.path.join(_CACHE_ROOT, round_name))
+    watermark_store.reset()
+    query_memo.clear()
+    near_duplicates.clear()
+    scrape_policy.last_scraped.clear()
+    circuit_breakers._breakers.clear()
+
+
+def _failed(source: str) -> bool:
+    """True if the source errored (and probably returned fallback data)"""
+    breaker = circuit_breakers.get_status().get(source)
+    return bool(breaker and breaker['consecutive_failures'])
+
+
+def _measure_memory(run_once) -> tuple:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    run_once()
+    after = tracemalloc.take_snapshot()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    return peak, blocks
+
+
+def bench_source(source: str, rounds: int) -> dict:
+    """Time one source over several cold rounds, then one traced round for memory"""
+    fetch = SOURCES[source]
+    elapsed = parse_seconds = 0.0
+    jobs = []
+    failed = False
+
+    for n in range(rounds):
+        _reset_state(f"{source}-{n}")
+        with ParseTimer() as timer:
+            start = time.perf_counter()
+            jobs = asyncio.run(fetch())
+            elapsed += time.perf_counter() - start
+        parse_seconds += timer.seconds
+        failed = failed or _failed(source)
+
+    _reset_state(f"{source}-traced")
+    peak, blocks = _measure_memory(lambda: asyncio.run(fetch()))
+
+    per_round = elapsed / rounds
+    return {
+        'source': source,
+        'jobs': len(jobs),
+        'ms': per_round * 1000,
+        'jobs_per_s': len(jobs) / per_round if per_round else 0.0,
+        'parse_ms': parse_seconds / rounds * 1000,
+        'peak_kb': peak / 1024,
+        'alloc_blocks': blocks,
+        'failed': failed,
+    }
+
+
+def _seed_users(count: int):
+    now = datetime.now(timezone.utc)
+    for i in range(count):
+        skills, experience = USER_PROFILES[i % len(USER_PROFILES)]
+        db.collection('users').document(f"bench-user-{i}").set({
+            'email': f"user{i}@example.com",
+            'skills': skills,
+            'interests': [],
+            'location': 'Remote',
+            'experience': experience,
+            'lastLogin': now,
+        })
+
+
+async def _run_cycle():
+    await personalized_scraper.scrape_jobs_for_all_users()
+    await general_scraper.scrape_all_general_jobs()
+
+
+def bench_cycle(users: int) -> dict:
+    """One personalized cycle for `users` users plus the general scrape"""
+    _reset_state("cycle")
+    _seed_users(users)
+    with ParseTimer() as timer:
+        start = time.perf_counter()
+        asyncio.run(_run_cycle())
+        elapsed = time.perf_counter() - start
+    jobs = db.count('personalizedJobs') + db.count('generalJobs')
+    writes = db.writes
+
+    _reset_state("cycle-traced")
+    _seed_users(users)
+    peak, blocks = _measure_memory(lambda: asyncio.run(_run_cycle()))
+
+    return {
+        'source': f"cycle ({users} users)",
+        'jobs': jobs,
+        'ms': elapsed * 1000,
+        'jobs_per_s': jobs / elapsed if elapsed else 0.0,
+        'parse_ms': timer.seconds * 1000,
+        'peak_kb': peak / 1024,
+        'alloc_blocks': blocks,
+        'failed': any(s['consecutive_failures'] for s in circuit_breakers.get_status().values()),
+        'db_writes': writes,
+        'query_memo': query_memo.get_stats(),
+    }
+
+
+def run(rounds: int = 5, users: int = 20, sources=None) -> list:
+    """Run the benchmark and return one result dict per source plus the cycle"""
+    with offline.StubServer() as server:
+        _route_to_stub(server.base_url)
+        results = [bench_source(source, rounds) for source in (sources or SOURCES)]
+        if users:
+            results.append(bench_cycle(users))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scrapers offline against recorded fixtures")
+    parser.add_argument('--rounds', type=int, default=5, help="Cold runs per source")
+    parser.add_argument('--users', type=int, default=20, help="Users in the simulated cycle (0 to skip)")
+    parser.add_argument('--source', action='append', choices=list(SOURCES), help="Only these sources")
+    parser.add_argument('--json', help="Also write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.rounds, args.users, args.source)
+
+    print(f"rounds: {args.rounds}")
+    print(f"{'source':<18} {'jobs':>6} {'ms/run':>9} {'jobs/s':>9} {'parse ms':>9} {'peak KB':>9} {'blocks':>8}")
+    for r in results:
+        print(
+            f"{r['source']:<18} {r['jobs']:>6} {r['ms']:>9.1f} {r['jobs_per_s']:>9.0f} "
+            f"{r['parse_ms']:>9.1f} {r['peak_kb']:>9.0f} {r['alloc_blocks']:>8}"
+            + ("  FAILED (fallback data)" if r['failed'] else "")
+        )
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
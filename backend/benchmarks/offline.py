@@ -0,0 +1,333 @@
+"""
+Offline environment for scraper benchmarks
+- StubServer: local HTTP server replaying recorded fixtures (with ETag/304)
+- StubRoutingAdapter: sends a requests.Session's https:// traffic to the stub
+- StubDriver: PageDriver (Selenium stand-in) that loads pages from the stub
+- InMemoryFirestore: just enough of the Firestore API for FirestoreClient
+
+install() must run before any backend.services module is imported, since
+FirestoreClient connects at import time
+"""
+import os
+import copy
+import uuid
+import hashlib
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from backend.utils.page_driver import PageDriver
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Upstream host -> (fixture path relative to FIXTURES_DIR, content type)
+ROUTES: Dict[str, tuple] = {
+    'remoteok.com': ('api/remoteok.json', 'application/json'),
+    'www.arbeitnow.com': ('api/arbeitnow.json', 'application/json'),
+    'himalayas.app': ('api/himalayas.json', 'application/json'),
+    'api.adzuna.com': ('api/adzuna.json', 'application/json'),
+    'data.usajobs.gov': ('api/usajobs.json', 'application/json'),
+    'www.indeed.com': ('html/indeed.html', 'text/html; charset=utf-8'),
+    'www.linkedin.com': ('html/linkedin.html', 'text/html; charset=utf-8'),
+    'www.glassdoor.com': ('html/glassdoor.html', 'text/html; charset=utf-8'),
+    'joinhandshake.com': ('html/handshake.html', 'text/html; charset=utf-8'),
+    'www.upwork.com': ('html/upwork.html', 'text/html; charset=utf-8'),
+    'www.fiverr.com': ('html/fiverr.html', 'text/html; charset=utf-8'),
+}
+
+
+# ==================== STUB HTTP SERVER ====================
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    """Serves /<upstream host>/<path> from the fixture for that host"""
+
+    fixtures: Dict[str, tuple] = {}
+
+    def do_GET(self):
+        host = self.path.lstrip('/').split('/', 1)[0].split('?', 1)[0]
+        fixture = self.fixtures.get(host)
+        if fixture is None:
+            self.send_error(404, f"No fixture for {host}")
+            return
+
+        body, content_type, etag = fixture
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer:
+    """Replays recorded fixtures on 127.0.0.1 in a background thread"""
+
+    def __init__(self, routes: Dict[str, tuple] = ROUTES):
+        fixtures = {}
+        for host, (path, content_type) in routes.items():
+            with open(os.path.join(FIXTURES_DIR, path), 'rb') as f:
+                body = f.read()
+            fixtures[host] = (body, content_type, '"' + hashlib.sha1(body).hexdigest() + '"')
+        handler = type('FixtureHandler', (_FixtureHandler,), {'fixtures': fixtures})
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> 'StubServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StubRoutingAdapter(HTTPAdapter):
+    """Rewrites https://host/path?q to <stub>/host/path?q before sending"""
+
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = f"{self.base_url}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+        return super().send(request, **kwargs)
+
+
+def route_session(session: requests.Session, base_url: str):
+    """Send all of a session's upstream traffic to the stub server"""
+    adapter = StubRoutingAdapter(base_url)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+
+# ==================== SELENIUM STAND-IN ====================
+
+class StubDriver(PageDriver):
+    """Selenium stand-in that loads pages from the stub server"""
+
+    def __init__(self, base_url: str):
+        super().__init__()
+        self.session = requests.Session()
+        route_session(self.session, base_url)
+
+    def fetch(self, url: str) -> str:
+        return self.session.get(url, timeout=15).text
+
+    def quit(self):
+        self.session.close()
+
+
+# ==================== IN-MEMORY FIRESTORE ====================
+
+def _resolve_sentinels(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace SERVER_TIMESTAMP sentinels with the current time, like the server does"""
+    from firebase_admin import firestore
+    now = datetime.now(timezone.utc)
+    return {key: now if value is firestore.SERVER_TIMESTAMP else value for key, value in data.items()}
+
+
+def _merge(target: Dict[str, Any], data: Dict[str, Any]):
+    """set(merge=True): nested maps are merged field by field, like Firestore does"""
+    for key, value in data.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+
+
+class _Snapshot:
+    def __init__(self, reference: '_DocumentRef', data: Optional[Dict[str, Any]]):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return copy.copy(self._data) if self._data is not None else None
+
+
+class _DocumentRef:
+    def __init__(self, db: 'InMemoryFirestore', path: tuple):
+        self._db = db
+        self.path = path
+        self.id = path[-1]
+
+    def collection(self, name: str) -> '_CollectionRef':
+        return _CollectionRef(self._db, self.path + (name,))
+
+    def _documents(self) -> Dict[str, Dict[str, Any]]:
+        return self._db._collections.setdefault(self.path[:-1], {})
+
+    def get(self) -> _Snapshot:
+        return _Snapshot(self, self._documents().get(self.id))
+
+    def set(self, data: Dict[str, Any], merge: bool = False):
+        documents = self._documents()
+        data = _resolve_sentinels(data)
+        if merge and self.id in documents:
+            _merge(documents[self.id], data)
+        else:
+            documents[self.id] = data
+        self._db.writes += 1
+
+    def update(self, data: Dict[str, Any]):
+        self._documents()[self.id].update(_resolve_sentinels(data))
+        self._db.writes += 1
+
+    def delete(self):
+        self._documents().pop(self.id, None)
+
+
+class _Query:
+    def __init__(self, collection: '_CollectionRef', filters: tuple = (), limit: Optional[int] = None):
+        self._collection = collection
+        self._filters = filters
+        self._limit = limit
+
+    def where(self, field: str, op: str, value: Any) -> '_Query':
+        return _Query(self._collection, self._filters + ((field, op, value),), self._limit)
+
+    def limit(self, count: int) -> '_Query':
+        return _Query(self._collection, self._filters, count)
+
+    def order_by(self, *args, **kwargs) -> '_Query':
+        return self
+
+    def _matches(self, data: Dict[str, Any]) -> bool:
+        for field, op, value in self._filters:
+            current = data.get(field)
+            if op == '==':
+                if current != value:
+                    return False
+            elif op == '<':
+                try:
+                    if not current < value:
+                        return False
+                except TypeError:
+                    return False
+            else:
+                raise NotImplementedError(f"InMemoryFirestore: unsupported operator {op}")
+        return True
+
+    def stream(self):
+        db, path = self._collection._db, self._collection.path
+        db.reads += 1
+        count = 0
+        for doc_id, data in list(db._collections.get(path, {}).items()):
+            if not self._matches(data):
+                continue
+            yield _Snapshot(_DocumentRef(db, path + (doc_id,)), data)
+            count += 1
+            if self._limit is not None and count >= self._limit:
+                return
+
+
+class _CollectionRef(_Query):
+    def __init__(self, db: 'InMemoryFirestore', path: tuple):
+        self._db = db
+        self.path = path
+        self.id = path[-1]
+        super().__init__(self)
+
+    def document(self, doc_id: Optional[str] = None) -> _DocumentRef:
+        return _DocumentRef(self._db, self.path + (doc_id or uuid.uuid4().hex,))
+
+    def add(self, data: Dict[str, Any]) -> tuple:
+        ref = self.document()
+        ref.set(data)
+        return None, ref
+
+
+class _WriteBatch:
+    def __init__(self):
+        self._ops = []
+
+    def set(self, reference: _DocumentRef, data: Dict[str, Any], merge: bool = False):
+        self._ops.append((reference.set, data, merge))
+
+    def update(self, reference: _DocumentRef, data: Dict[str, Any]):
+        self._ops.append((lambda data, merge: reference.update(data), data, False))
+
+    def delete(self, reference: _DocumentRef):
+        self._ops.append((lambda data, merge: reference.delete(), None, False))
+
+    def commit(self):
+        for write, data, merge in self._ops:
+            write(data, merge=merge)
+        self._ops = []
+
+
+class InMemoryFirestore:
+    """Dict-backed stand-in for google.cloud.firestore.Client"""
+
+    def __init__(self):
+        # Collection path -> document id -> data
+        self._collections: Dict[tuple, Dict[str, Dict[str, Any]]] = {}
+        self.reads = 0
+        self.writes = 0
+
+    def collection(self, name: str) -> _CollectionRef:
+        return _CollectionRef(self, (name,))
+
+    def batch(self) -> _WriteBatch:
+        return _WriteBatch()
+
+    def get_all(self, references: List[_DocumentRef], field_paths: Optional[List[str]] = None):
+        self.reads += 1
+        for reference in references:
+            snapshot = reference.get()
+            if snapshot.exists and field_paths is not None:
+                snapshot._data = {key: snapshot._data[key] for key in field_paths if key in snapshot._data}
+            yield snapshot
+
+    def count(self, collection: str) -> int:
+        """Number of documents in every collection with this name"""
+        return sum(len(docs) for path, docs in self._collections.items() if path[-1] == collection)
+
+    def clear(self):
+        """Drop all documents and reset counters"""
+        self._collections.clear()
+        self.reads = 0
+        self.writes = 0
+
+
+def install() -> InMemoryFirestore:
+    """Point firebase_admin at an in-memory database; call before importing backend.services"""
+    import firebase_admin
+    from firebase_admin import firestore
+
+    db = InMemoryFirestore()
+    firebase_admin._apps.setdefault('[DEFAULT]', object())
+    firestore.client = lambda *args, **kwargs: db
+
+    from backend.database.firestore_client import FirestoreClient
+    FirestoreClient._db = db
+    if FirestoreClient._instance is not None:
+        FirestoreClient._instance._db = db
+    return db
@@ -3,9 +3,12 @@ Firebase/Firestore client configuration for job aggregation platform.
 Handles all Firestore operations including user data, jobs, and chat history.
 """
 import os
+import re
 import base64
-from typing import Optional, List, Dict, Any
-from datetime import datetime, timedelta
+import hashlib
+import threading
+from typing import Optional, List, Dict, Any, Tuple
+from datetime import datetime, timedelta, timezone
 import firebase_admin
 from firebase_admin import credentials, firestore
 from dotenv import load_dotenv
@@ -14,11 +17,41 @@ import logging
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Max writes per Firestore WriteBatch
+FIRESTORE_BATCH_LIMIT = 500
+# Unchanged jobs get lastSeenAt bumped at most this often, so steady-state cycles write almost nothing
+LAST_SEEN_REFRESH = timedelta(hours=int(os.getenv("SCRAPER_LAST_SEEN_REFRESH_HOURS", "12")))
+# Jobs stored before deterministic ids have auto-generated ids; job_document_id values look like this
+DOCUMENT_ID_RE = re.compile(r'[0-9a-f]{40}')
+# scraperState document recording that migrate_legacy_job_ids has run
+JOB_ID_MIGRATION_STATE = 'migration_deterministic_job_ids'
+
+def job_document_id(*parts: str) -> str:
+    """
+    Deterministic document id from a job's identifying fields
+    Re-delivered or re-run scrape units overwrite the same document instead of duplicating it
+    """
+    normalized = '|'.join(' '.join(str(part or '').lower().split()) for part in parts)
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+def _identity(data: Optional[Dict[str, Any]]) -> Tuple[str, ...]:
+    """A stored job's full identity (title, company, sourceLink), normalized like job_document_id"""
+    return tuple(' '.join(str((data or {}).get(field) or '').lower().split()) for field in ('jobTitle', 'company', 'sourceLink'))
+
+
+def _scraped_at(data: Optional[Dict[str, Any]]) -> float:
+    """Sort key for stored jobs by scrape time (oldest/unknown first)"""
+    scraped_at = (data or {}).get('scrapedAt')
+    return scraped_at.timestamp() if isinstance(scraped_at, datetime) else 0.0
+
 class FirestoreClient:
     """Singleton Firestore client for the application"""
     
     _instance = None
     _db = None
+    # Scrapers on worker threads share this client; initialize it only once
+    _init_lock = threading.Lock()
     
     def __new__(cls):
         if cls._instance is None:
@@ -68,7 +101,9 @@ class FirestoreClient:
     def db(self):
         """Get Firestore database instance"""
         if self._db is None:
-            self._initialize()
+            with self._init_lock:
+                if self._db is None:
+                    self._initialize()
         return self._db
     
     # ==================== USER OPERATIONS ====================
@@ -137,20 +172,40 @@ class FirestoreClient:
     
     # ==================== PERSONALIZED JOBS OPERATIONS ====================
     
-    async def add_personalized_job(self, user_id: str, job_data: Dict[str, Any]) -> str:
-        """Add a personalized job for a specific user"""
+    async def add_personalized_job(self, user_id: str, job_data: Dict[str, Any], job_id: Optional[str] = None) -> str:
+        """Add a personalized job for a specific user (idempotent when job_id is given)"""
         try:
             jobs_ref = self.db.collection('users').document(user_id).collection('personalizedJobs')
             job_data['scrapedAt'] = firestore.SERVER_TIMESTAMP
             job_data['isActive'] = True
-            doc_ref = jobs_ref.add(job_data)
-            job_id = doc_ref[1].id
+            if job_id:
+                jobs_ref.document(job_id).set(job_data)
+            else:
+                job_id = jobs_ref.add(job_data)[1].id
             logger.info(f"Personalized job added for user {user_id}: {job_id}")
             return job_id
         except Exception as e:
             logger.error(f"Error adding personalized job for {user_id}: {e}")
             raise
     
+    async def add_personalized_jobs_batch(self, user_id: str, jobs: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """Write (job_id, job_data) pairs for a user in Firestore batches (idempotent)"""
+        try:
+            jobs_ref = self.db.collection('users').document(user_id).collection('personalizedJobs')
+            return self._commit_job_batches(jobs_ref, jobs)
+        except Exception as e:
+            logger.error(f"Error batch adding personalized jobs for {user_id}: {e}")
+            raise
+    
+    async def filter_changed_personalized_jobs(self, user_id: str, hashes: Dict[str, str]) -> set:
+        """Ids from {job_id: content_hash} that are new or changed for a user; see _filter_changed_jobs"""
+        try:
+            jobs_ref = self.db.collection('users').document(user_id).collection('personalizedJobs')
+            return self._filter_changed_jobs(jobs_ref, hashes)
+        except Exception as e:
+            logger.error(f"Error checking stored personalized jobs for {user_id}: {e}")
+            return set(hashes)
+    
     async def get_personalized_jobs(
         self, 
         user_id: str, 
@@ -198,10 +253,20 @@ class FirestoreClient:
             logger.error(f"Error checking duplicate job: {e}")
             return False
     
+    @staticmethod
+    def _seen_since(job_data: Dict[str, Any], cutoff: datetime) -> bool:
+        """True if an unchanged job was still listed after cutoff (scrapedAt only moves on writes)"""
+        last_seen = job_data.get('lastSeenAt')
+        if last_seen is None:
+            return False
+        if last_seen.tzinfo is None:
+            last_seen = last_seen.replace(tzinfo=timezone.utc)
+        return last_seen >= cutoff
+    
     async def deactivate_old_jobs(self, days: int = 7):
         """Mark jobs older than specified days as inactive"""
         try:
-            cutoff_date = datetime.now() - timedelta(days=days)
+            cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
             
             # Get all users
             users_ref = self.db.collection('users')
@@ -213,6 +278,8 @@ class FirestoreClient:
                 old_jobs = jobs_ref.where('scrapedAt', '<', cutoff_date).where('isActive', '==', True).stream()
                 
                 for job in old_jobs:
+                    if self._seen_since(job.to_dict(), cutoff_date):
+                        continue
                     job.reference.update({'isActive': False})
                     count += 1
             
@@ -224,20 +291,168 @@ class FirestoreClient:
     
     # ==================== GENERAL JOBS OPERATIONS ====================
     
-    async def add_general_job(self, job_data: Dict[str, Any]) -> str:
-        """Add a general gig job available to all users"""
+    async def add_general_job(self, job_data: Dict[str, Any], job_id: Optional[str] = None) -> str:
+        """Add a general gig job available to all users (idempotent when job_id is given)"""
         try:
             jobs_ref = self.db.collection('generalJobs')
             job_data['scrapedAt'] = firestore.SERVER_TIMESTAMP
             job_data['isActive'] = True
-            doc_ref = jobs_ref.add(job_data)
-            job_id = doc_ref[1].id
+            if job_id:
+                jobs_ref.document(job_id).set(job_data)
+            else:
+                job_id = jobs_ref.add(job_data)[1].id
             logger.info(f"General job added: {job_id}")
             return job_id
         except Exception as e:
             logger.error(f"Error adding general job: {e}")
             raise
     
+    async def add_general_jobs_batch(self, jobs: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """Write (job_id, job_data) general jobs in Firestore batches (idempotent)"""
+        try:
+            return self._commit_job_batches(self.db.collection('generalJobs'), jobs)
+        except Exception as e:
+            logger.error(f"Error batch adding general jobs: {e}")
+            raise
+    
+    async def filter_changed_general_jobs(self, hashes: Dict[str, str]) -> set:
+        """Ids from {job_id: content_hash} that are new or changed; see _filter_changed_jobs"""
+        try:
+            return self._filter_changed_jobs(self.db.collection('generalJobs'), hashes)
+        except Exception as e:
+            logger.error(f"Error checking stored general jobs: {e}")
+            return set(hashes)
+    
+    def _filter_changed_jobs(self, jobs_ref, hashes: Dict[str, str]) -> set:
+        """
+        Compare content hashes with the stored documents (one batched read)
+        Unchanged jobs are not rewritten; their lastSeenAt is bumped in bulk once it
+        is older than LAST_SEEN_REFRESH (or the job was deactivated)
+        Returns the ids that are new or changed and need a full write
+        """
+        refs = [jobs_ref.document(job_id) for job_id in hashes]
+        stale_before = datetime.now(timezone.utc) - LAST_SEEN_REFRESH
+        unchanged, touch = set(), []
+        
+        for snapshot in self.db.get_all(refs, field_paths=['contentHash', 'lastSeenAt', 'isActive']):
+            stored = snapshot.to_dict() if snapshot.exists else None
+            if not stored:
+                continue
+            if stored.get('contentHash') != hashes[snapshot.id]:
+                continue
+            unchanged.add(snapshot.id)
+            last_seen = stored.get('lastSeenAt')
+            if last_seen is None or last_seen < stale_before or not stored.get('isActive', True):
+                touch.append(snapshot.id)
+        
+        for start in range(0, len(touch), FIRESTORE_BATCH_LIMIT):
+            batch = self.db.batch()
+            for job_id in touch[start:start + FIRESTORE_BATCH_LIMIT]:
+                batch.update(jobs_ref.document(job_id), {'lastSeenAt': firestore.SERVER_TIMESTAMP, 'isActive': True})
+            batch.commit()
+        
+        if unchanged:
+            logger.info(f"{len(unchanged)} unchanged jobs in {jobs_ref.id} skipped, {len(touch)} marked seen")
+        return set(hashes) - unchanged
+    
+    async def migrate_legacy_job_ids(self, force: bool = False) -> Dict[str, int]:
+        """
+        One-time move of jobs stored before deterministic ids to their job_document_id
+        Runs once (a marker is kept in scraperState) unless forced; see
+        backend/workers/migrate_job_ids.py
+        """
+        marker = await self.get_scraper_state(JOB_ID_MIGRATION_STATE)
+        if marker and marker.get('completed') and not force:
+            logger.info("Legacy job id migration already completed, skipping")
+            return {'moved': 0, 'deleted': 0, 'conflicts': 0, 'skipped': 1}
+        
+        totals = {'moved': 0, 'deleted': 0, 'conflicts': 0, 'skipped': 0}
+        general = self._rekey_legacy_jobs(
+            self.db.collection('generalJobs'), lambda data: job_document_id(data.get('sourceLink'), data.get('jobTitle'))
+        )
+        for key in totals:
+            totals[key] += general.get(key, 0)
+        for user_doc in self.db.collection('users').stream():
+            personalized = self._rekey_legacy_jobs(
+                user_doc.reference.collection('personalizedJobs'),
+                lambda data: job_document_id(data.get('jobTitle'), data.get('company'))
+            )
+            for key in totals:
+                totals[key] += personalized.get(key, 0)
+        
+        await self.set_scraper_state(JOB_ID_MIGRATION_STATE, {'completed': True, **totals})
+        logger.info(f"Legacy job id migration done: {totals}")
+        return totals
+    
+    def _rekey_legacy_jobs(self, jobs_ref, target_id) -> Dict[str, int]:
+        """
+        Move a collection's auto-id jobs to the id the scrapers now write (target_id(data))
+        Copies are only merged for exact duplicates (same title, company and sourceLink);
+        distinct postings whose identity maps to an id already claimed by another posting
+        are left in place. Legacy fields survive: they are merged under any fields the
+        deterministic document already has, and later scrapes write with merge=True
+        """
+        groups: Dict[Tuple[str, ...], List[Any]] = {}
+        existing_ids = set()
+        for doc in jobs_ref.stream():
+            if DOCUMENT_ID_RE.fullmatch(doc.id):
+                existing_ids.add(doc.id)
+                continue
+            groups.setdefault(_identity(doc.to_dict()), []).append(doc)
+        
+        counts = {'moved': 0, 'deleted': 0, 'conflicts': 0}
+        claimed: Dict[str, Tuple[str, ...]] = {}
+        batch, pending = self.db.batch(), 0
+        for identity, docs in groups.items():
+            docs.sort(key=lambda doc: _scraped_at(doc.to_dict()), reverse=True)
+            job_id = target_id(docs[0].to_dict())
+            if claimed.setdefault(job_id, identity) != identity:
+                counts['conflicts'] += len(docs)
+                logger.warning(f"{jobs_ref.id}: {len(docs)} legacy jobs map to already-claimed id {job_id}, left in place")
+                continue
+            
+            target = jobs_ref.document(job_id)
+            current = target.get().to_dict() if job_id in existing_ids else None
+            if current and _identity(current) != identity:
+                counts['conflicts'] += len(docs)
+                logger.warning(f"{jobs_ref.id}: {job_id} already holds a different posting, {len(docs)} legacy jobs left in place")
+                continue
+            # The newest legacy copy wins over older ones; the deterministic document's own fields win over both
+            data = {}
+            for doc in reversed(docs):
+                data.update(doc.to_dict())
+            data.pop('contentHash', None)
+            if current:
+                data = {key: value for key, value in data.items() if key not in current}
+            batch.set(target, data, merge=True)
+            for doc in docs:
+                batch.delete(doc.reference)
+            counts['moved'] += 1
+            counts['deleted'] += len(docs)
+            pending += 1 + len(docs)
+            if pending >= FIRESTORE_BATCH_LIMIT - 10:
+                batch.commit()
+                batch, pending = self.db.batch(), 0
+        if pending:
+            batch.commit()
+        if counts['moved']:
+            logger.info(f"Re-keyed {counts['moved']} legacy jobs in {jobs_ref.id} ({counts['deleted']} documents)")
+        return counts
+    
+    def _commit_job_batches(self, jobs_ref, jobs: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """Set job documents in write batches of at most FIRESTORE_BATCH_LIMIT"""
+        for start in range(0, len(jobs), FIRESTORE_BATCH_LIMIT):
+            batch = self.db.batch()
+            for job_id, job_data in jobs[start:start + FIRESTORE_BATCH_LIMIT]:
+                job_data['scrapedAt'] = firestore.SERVER_TIMESTAMP
+                job_data['lastSeenAt'] = firestore.SERVER_TIMESTAMP
+                job_data['isActive'] = True
+                # Merge, so fields kept from a migrated legacy document survive rewrites
+                batch.set(jobs_ref.document(job_id), job_data, merge=True)
+            batch.commit()
+        logger.info(f"Batch wrote {len(jobs)} jobs to {jobs_ref.id}")
+        return len(jobs)
+    
     async def get_general_jobs(
         self, 
         limit: int = 20, 
@@ -289,12 +504,14 @@ class FirestoreClient:
     async def deactivate_old_general_jobs(self, days: int = 7):
         """Mark general jobs older than specified days as inactive"""
         try:
-            cutoff_date = datetime.now() - timedelta(days=days)
+            cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
             jobs_ref = self.db.collection('generalJobs')
             old_jobs = jobs_ref.where('scrapedAt', '<', cutoff_date).where('isActive', '==', True).stream()
             
             count = 0
             for job in old_jobs:
+                if self._seen_since(job.to_dict(), cutoff_date):
+                    continue
                 job.reference.update({'isActive': False})
                 count += 1
             
@@ -304,6 +521,30 @@ class FirestoreClient:
             logger.error(f"Error deactivating old general jobs: {e}")
             return 0
     
+    # ==================== SCRAPER STATE OPERATIONS ====================
+    
+    async def get_scraper_state(self, state_id: str) -> Optional[Dict[str, Any]]:
+        """Get persisted scraper state (e.g. a source watermark)"""
+        try:
+            state_doc = self.db.collection('scraperState').document(state_id).get()
+            if state_doc.exists:
+                return state_doc.to_dict()
+            return None
+        except Exception as e:
+            logger.error(f"Error getting scraper state {state_id}: {e}")
+            return None
+    
+    async def set_scraper_state(self, state_id: str, state_data: Dict[str, Any]) -> bool:
+        """Persist scraper state, merging into any existing document"""
+        try:
+            state_ref = self.db.collection('scraperState').document(state_id)
+            state_data['updatedAt'] = firestore.SERVER_TIMESTAMP
+            state_ref.set(state_data, merge=True)
+            return True
+        except Exception as e:
+            logger.error(f"Error setting scraper state {state_id}: {e}")
+            return False
+    
     # ==================== CHAT HISTORY OPERATIONS ====================
     
     async def add_chat_message(self, user_id: str, message_data: Dict[str, Any]):
@@ -21,7 +21,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -32,6 +32,11 @@ from backend.routers import auth, jobs, chat, user, opportunities, resumes, seed
 
 # Import services
 from backend.services.scheduler import scraper_scheduler
+from backend.services.ai_validator import ai_validator
+from backend.services.llm_dispatch import llm_dispatcher
+from backend.services.relevance_cascade import relevance_cascade
+from backend.services.job_categorizer import job_categorizer
+from backend.utils.scrape_telemetry import scrape_telemetry
 
 load_dotenv()
 logging.basicConfig(
@@ -66,6 +71,7 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down...")
     scraper_scheduler.stop()
     logger.info("Background scheduler stopped")
+    await llm_dispatcher.aclose()
 
 # Create FastAPI app
 app = FastAPI(
@@ -154,7 +160,11 @@ async def health_check(request: Request):
             "status": "healthy",
             "api": "running",
             "database": db_status,
-            "scheduler": scheduler_status
+            "scheduler": scheduler_status,
+            "ai_validator": ai_validator.get_stats(),
+            "llm_dispatch": llm_dispatcher.get_status(),
+            "relevance_cascade": relevance_cascade.get_stats(),
+            "job_categorizer": job_categorizer.get_stats()
         }
         
     except Exception as e:
@@ -176,9 +186,17 @@ async def scraper_health():
     - Jobs added counts
     - Error counts
     - Next scheduled runs
+    - Per-tier (hot/warm/cold) user scraping stats
+    - Per-source telemetry over recent runs (latency, bytes, items, fallbacks, errors)
     """
     return scraper_scheduler.get_status()
 
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metrics():
+    """Per-source scraper telemetry in Prometheus text format"""
+    return PlainTextResponse(scrape_telemetry.render_prometheus(), media_type="text/plain; version=0.0.4")
+
 # ==================== ERROR HANDLERS ====================
 
 @app.exception_handler(404)
@@ -10,6 +10,7 @@ import logging
 
 from backend.database.firestore_client import firestore_client
 from backend.utils.jwt_handler import jwt_handler
+from backend.services.scrape_policy import scrape_policy
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +67,9 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     if not user:
         raise credentials_exception
     
+    # Recent API activity keeps the user in a hot scraping tier
+    await scrape_policy.record_activity(user_id)
+    
     return user
 
 # ==================== ENDPOINTS ====================
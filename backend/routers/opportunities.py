@@ -11,6 +11,7 @@ from datetime import datetime
 
 from backend.database.firestore_client import firestore_client
 from backend.routers.auth import get_current_user
+from backend.services.job_details import job_details
 
 logger = logging.getLogger(__name__)
 
@@ -234,6 +235,7 @@ async def get_opportunity_by_id(opportunity_id: str):
             return OpportunityResponse(**opportunity)
         
         # If not found in provider opportunities, check general jobs
+        # Scraped descriptions are truncated; the full one is fetched lazily and cached
         general_job = await firestore_client.get_general_job_by_id(opportunity_id)
         
         if general_job:
@@ -242,7 +244,7 @@ async def get_opportunity_by_id(opportunity_id: str):
                 "title": general_job.get('jobTitle', ''),
                 "type": general_job.get('category', 'job'),
                 "location": general_job.get('location', 'Remote'),
-                "description": general_job.get('description', ''),
+                "description": await job_details.full_description(general_job),
                 "requirements": general_job.get('requirements', ''),
                 "company": general_job.get('company', ''),
                 "tags": [],
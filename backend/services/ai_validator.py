@@ -2,68 +2,78 @@
 AI Validator using Google Gemini API & OpenAI GPT-4
 Validates job relevance against user profiles
 Supports multiple AI providers for redundancy
+Completions go through the shared LLM dispatcher, which applies provider rate
+limits and fails over between providers
 """
 import os
-import google.generativeai as genai
-from openai import OpenAI
-from typing import Dict, Any, List
+import asyncio
+from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 import logging
 import json
 
+from backend.services.llm_dispatch import llm_dispatcher
+from backend.utils.validation_cache import ValidationCache, make_key, normalize_text, normalize_terms
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
-# Configure Gemini API
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+# Jobs per batched validation request, batched requests in flight per call, and
+# how much of each description goes into a batch prompt
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "15"))
+LLM_BATCH_CONCURRENCY = int(os.getenv("LLM_BATCH_CONCURRENCY", "4"))
+BATCH_DESCRIPTION_CHARS = 600
+BATCH_TOKENS_PER_JOB = 120
 
-GEMINI_MODEL = os.getenv("GEMINI_CHAT_MODEL", "gemini-1.5-flash-latest")
+# Bump a prompt's version when its wording or output format changes, so cached answers are not reused
+PROMPT_VERSIONS = {'relevance': 1, 'relevance_batch': 1, 'quick_relevance': 1, 'category': 1}
 
-# Configure OpenAI API
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-openai_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+SYSTEM_PROMPT = "You are an expert career advisor and job matching AI. Always respond in valid JSON format."
+# GPT-4 first, Gemini as fallback
+PROVIDER_PREFERENCE = ['openai', 'gemini']
 
 class AIValidator:
     """AI-powered job validation using Gemini and OpenAI"""
     
     def __init__(self):
-        self.use_openai = bool(openai_client)
-        self.use_gemini = bool(GEMINI_API_KEY)
+        self.dispatcher = llm_dispatcher
+        self.use_openai = 'openai' in self.dispatcher.providers
+        self.use_gemini = 'gemini' in self.dispatcher.providers
+        # Configured models in preference order; a provider change invalidates cached answers
+        self.model_id = self.dispatcher.model_id(PROVIDER_PREFERENCE)
+        self.cache = ValidationCache()
+        self.batch_stats = {'requests': 0, 'jobs': 0, 'splits': 0, 'failed_jobs': 0}
         logger.info(f"AI Validator initialized - OpenAI: {self.use_openai}, Gemini: {self.use_gemini}")
     
-    async def _call_openai(self, prompt: str, response_format: str = "json") -> str:
-        """Call OpenAI GPT-4 API"""
-        try:
-            if not openai_client:
-                raise Exception("OpenAI not configured")
-            
-            response = openai_client.chat.completions.create(
-                model="gpt-4-turbo-preview",
-                messages=[
-                    {"role": "system", "content": "You are an expert career advisor and job matching AI. Always respond in valid JSON format."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=1000
-            )
-            
-            return response.choices[0].message.content
-            
-        except Exception as e:
-            logger.error(f"OpenAI API error: {e}")
-            raise
+    def _cache_key(self, kind: str, *parts) -> str:
+        return make_key(kind, self.model_id, PROMPT_VERSIONS[kind], *parts)
     
-    async def _call_gemini(self, prompt: str) -> str:
-        """Call Google Gemini API"""
-        try:
-            model = genai.GenerativeModel(GEMINI_MODEL)
-            response = model.generate_content(prompt)
-            return response.text.strip()
-        except Exception as e:
-            logger.error(f"Gemini API error: {e}")
-            raise
+    def get_stats(self) -> Dict[str, Any]:
+        """Provider configuration and cache counters for the health endpoint"""
+        return {'model': self.model_id, 'cache': self.cache.get_stats(), 'batches': dict(self.batch_stats)}
+    
+    async def _complete(self, prompt: str, max_tokens: int = 1000) -> str:
+        """Run a JSON prompt through the dispatcher (OpenAI first, Gemini as fallback)"""
+        return await self.dispatcher.complete(
+            prompt,
+            system=SYSTEM_PROMPT,
+            temperature=0.3,
+            max_tokens=max_tokens,
+            prefer=PROVIDER_PREFERENCE
+        )
+    
+    @staticmethod
+    def _extract_json(response_text: str) -> str:
+        """Extract JSON from response (handles markdown code blocks)"""
+        if "```json" in response_text:
+            json_start = response_text.find("```json") + 7
+            json_end = response_text.find("```", json_start)
+            response_text = response_text[json_start:json_end].strip()
+        elif "```" in response_text:
+            json_start = response_text.find("```") + 3
+            json_end = response_text.find("```", json_start)
+            response_text = response_text[json_start:json_end].strip()
+        return response_text
     
     async def validate_job_relevance(
         self,
@@ -86,6 +96,16 @@ class AIValidator:
                 'skill_gaps': List[str]
             }
         """
+        cache_key = self._cache_key(
+            'relevance',
+            normalize_terms(user_skills), normalize_terms(user_interests), normalize_text(user_experience),
+            normalize_text(job_title), normalize_text(job_description), normalize_text(job_requirements)
+        )
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+        
+        response_text = ""
         try:
             # Construct validation prompt
             prompt = f"""
@@ -119,40 +139,8 @@ Provide a detailed analysis in JSON format with:
 Return ONLY valid JSON, no additional text.
 """
             
-            # Try OpenAI first (GPT-4), fallback to Gemini
-            response_text = ""
-            try:
-                if self.use_openai:
-                    response_text = await self._call_openai(prompt)
-                    logger.info("Used OpenAI GPT-4 for validation")
-                elif self.use_gemini:
-                    response_text = await self._call_gemini(prompt)
-                    logger.info("Used Google Gemini for validation")
-                else:
-                    raise Exception("No AI provider configured")
-            except Exception as e:
-                # Fallback to alternative provider
-                logger.warning(f"Primary AI failed: {e}, trying fallback...")
-                if self.use_gemini and not response_text:
-                    response_text = await self._call_gemini(prompt)
-                    logger.info("Used Gemini as fallback")
-                elif self.use_openai and not response_text:
-                    response_text = await self._call_openai(prompt)
-                    logger.info("Used OpenAI as fallback")
-                else:
-                    raise
-            
-            # Extract JSON from response (handles markdown code blocks)
-            if "```json" in response_text:
-                json_start = response_text.find("```json") + 7
-                json_end = response_text.find("```", json_start)
-                response_text = response_text[json_start:json_end].strip()
-            elif "```" in response_text:
-                json_start = response_text.find("```") + 3
-                json_end = response_text.find("```", json_start)
-                response_text = response_text[json_start:json_end].strip()
-            
-            validation_result = json.loads(response_text)
+            response_text = await self._complete(prompt)
+            validation_result = json.loads(self._extract_json(response_text))
             
             # Ensure all required fields exist
             default_result = {
@@ -163,7 +151,9 @@ Return ONLY valid JSON, no additional text.
                 'skill_gaps': []
             }
             
-            return {**default_result, **validation_result}
+            result = {**default_result, **validation_result}
+            self.cache.set(cache_key, result)
+            return result
             
         except json.JSONDecodeError as e:
             logger.error(f"JSON parse error in AI validation: {e}\nResponse: {response_text}")
@@ -184,11 +174,147 @@ Return ONLY valid JSON, no additional text.
                 'skill_gaps': []
             }
     
+    async def validate_jobs_batch(
+        self,
+        user_skills: List[str],
+        user_interests: List[str],
+        user_experience: str,
+        jobs: List[Dict[str, str]],
+        batch_size: int = LLM_BATCH_SIZE
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Validate many jobs against one profile, `batch_size` jobs per LLM request
+        
+        Args:
+            jobs: dicts with 'title', 'description' and 'requirements'
+        
+        Returns:
+            One result per job, in order, shaped like validate_job_relevance's;
+            None for a job that still failed when sent on its own
+        """
+        profile_parts = (normalize_terms(user_skills), normalize_terms(user_interests), normalize_text(user_experience))
+        keys = [
+            self._cache_key(
+                'relevance_batch', *profile_parts, normalize_text(job.get('title')),
+                normalize_text((job.get('description') or '')[:BATCH_DESCRIPTION_CHARS]),
+                normalize_text((job.get('requirements') or '')[:BATCH_DESCRIPTION_CHARS])
+            )
+            for job in jobs
+        ]
+        results: List[Optional[Dict[str, Any]]] = []
+        for key in keys:
+            cached = self.cache.get(key)
+            results.append(dict(cached) if cached is not None else None)
+        
+        pending = [index for index, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+        
+        profile_text = (
+            f"- Skills: {', '.join(user_skills) if user_skills else 'Not specified'}\n"
+            f"- Interests: {', '.join(user_interests) if user_interests else 'Not specified'}\n"
+            f"- Experience Level: {user_experience if user_experience else 'Not specified'}"
+        )
+        semaphore = asyncio.Semaphore(LLM_BATCH_CONCURRENCY)
+        
+        async def validate_chunk(indexes: List[int]):
+            try:
+                async with semaphore:
+                    scored = await self._request_batch(profile_text, [jobs[index] for index in indexes])
+            except Exception as e:
+                logger.warning(f"Batch validation of {len(indexes)} jobs failed: {e}")
+                scored = {}
+            
+            missing = []
+            for position, index in enumerate(indexes):
+                if position in scored:
+                    results[index] = scored[position]
+                    self.cache.set(keys[index], scored[position])
+                else:
+                    missing.append(index)
+            
+            if not missing:
+                return
+            if len(indexes) == 1:
+                self.batch_stats['failed_jobs'] += 1
+                return
+            # Split what failed and retry the halves; a single bad job ends up alone
+            self.batch_stats['splits'] += 1
+            half = (len(missing) + 1) // 2
+            await asyncio.gather(*(validate_chunk(part) for part in (missing[:half], missing[half:]) if part))
+        
+        await asyncio.gather(*(
+            validate_chunk(pending[start:start + batch_size]) for start in range(0, len(pending), batch_size)
+        ))
+        return results
+    
+    async def _request_batch(self, profile_text: str, jobs: List[Dict[str, str]]) -> Dict[int, Dict[str, Any]]:
+        """One batched validation request; returns the well-formed results by job position"""
+        job_blocks = "\n\n".join(
+            f"[{position}] Title: {job.get('title', '')}\n"
+            f"Description: {(job.get('description') or '')[:BATCH_DESCRIPTION_CHARS]}\n"
+            f"Requirements: {(job.get('requirements') or '')[:BATCH_DESCRIPTION_CHARS]}"
+            for position, job in enumerate(jobs)
+        )
+        prompt = f"""
+You are an expert career advisor and job matching AI. Analyze how relevant each job below is for the candidate.
+
+**Candidate Profile:**
+{profile_text}
+
+**Jobs:**
+{job_blocks}
+
+**Task:**
+Return a JSON array with one object per job:
+{{"id": <job number in brackets>, "relevance_score": <0-100>, "reasoning": "<one sentence>", "skill_matches": [<candidate skills the job needs>], "skill_gaps": [<required skills the candidate lacks>]}}
+
+**Scoring Guidelines:**
+- 90-100: Perfect match, candidate highly qualified
+- 70-89: Good match, candidate qualified with minor gaps
+- 50-69: Moderate match, candidate could apply
+- 40-49: Acceptable match, candidate can learn on the job
+- 0-39: Poor match, not recommended
+
+Return ONLY valid JSON, no additional text.
+"""
+        self.batch_stats['requests'] += 1
+        self.batch_stats['jobs'] += len(jobs)
+        response_text = await self._complete(prompt, max_tokens=200 + BATCH_TOKENS_PER_JOB * len(jobs))
+        
+        parsed = json.loads(self._extract_json(response_text))
+        if isinstance(parsed, dict):
+            # Some models wrap the array: {"results": [...]}
+            parsed = next((value for value in parsed.values() if isinstance(value, list)), [])
+        
+        scored = {}
+        for item in parsed if isinstance(parsed, list) else []:
+            try:
+                position = int(item['id'])
+                score = min(100.0, max(0.0, float(item['relevance_score'])))
+            except (TypeError, KeyError, ValueError):
+                continue
+            if not 0 <= position < len(jobs):
+                continue
+            scored[position] = {
+                'relevance_score': score,
+                'reasoning': str(item.get('reasoning') or ''),
+                'is_relevant': score >= 40,
+                'skill_matches': [str(skill) for skill in item.get('skill_matches') or []],
+                'skill_gaps': [str(skill) for skill in item.get('skill_gaps') or []]
+            }
+        return scored
+    
     async def quick_relevance_check(self, user_skills: List[str], job_description: str) -> float:
         """
         Quick relevance score without detailed analysis
         Returns score 0-100
         """
+        cache_key = self._cache_key('quick_relevance', normalize_terms(user_skills), normalize_text(job_description[:500]))
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             prompt = f"""
 Rate the relevance of this job for a candidate with these skills: {', '.join(user_skills)}
@@ -198,16 +324,14 @@ Job Description: {job_description[:500]}
 Provide ONLY a number from 0-100 representing relevance percentage.
 """
             
-            response_text = ""
-            if self.use_openai:
-                response_text = await self._call_openai(prompt)
-            elif self.use_gemini:
-                response_text = await self._call_gemini(prompt)
+            response_text = await self._complete(prompt)
             
             # Extract number from response
             score_text = response_text.strip()
             score = float(''.join(filter(str.isdigit, score_text)))
-            return min(100, max(0, score))
+            score = min(100, max(0, score))
+            self.cache.set(cache_key, score)
+            return score
             
         except Exception as e:
             logger.error(f"Error in quick relevance check: {e}")
@@ -218,6 +342,11 @@ Provide ONLY a number from 0-100 representing relevance percentage.
         Categorize job into predefined categories
         Returns category name
         """
+        cache_key = self._cache_key('category', normalize_text(job_title), normalize_text(job_description[:300]))
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             prompt = f"""
 Categorize this job into ONE of these categories:
@@ -239,13 +368,11 @@ Job Description: {job_description[:300]}
 Return ONLY the category name, nothing else.
 """
             
-            response_text = ""
-            if self.use_openai:
-                response_text = await self._call_openai(prompt)
-            elif self.use_gemini:
-                response_text = await self._call_gemini(prompt)
+            response_text = await self._complete(prompt)
             
             category = response_text.strip()
+            if category:
+                self.cache.set(cache_key, category)
             return category
             
         except Exception as e:
@@ -10,11 +10,12 @@ import google.generativeai as genai
 from dotenv import load_dotenv
 
 # LangChain imports
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.prompts import PromptTemplate, ChatPromptTemplate, MessagesPlaceholder
 
 from backend.database.firestore_client import firestore_client
+from backend.services.llm_dispatch import llm_dispatcher
 from backend.utils.embeddings import embeddings_handler
 
 load_dotenv()
@@ -23,6 +24,8 @@ logger = logging.getLogger(__name__)
 # Configure Gemini
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_MODEL = os.getenv("GEMINI_CHAT_MODEL", "gemini-1.5-flash-latest")
+# Reply length cap for chat answers; the dispatcher's 1000-token default cuts long answers short
+CHAT_MAX_TOKENS = int(os.getenv("CHAT_MAX_TOKENS", "4096"))
 
 if GEMINI_API_KEY:
     genai.configure(api_key=GEMINI_API_KEY)
@@ -33,13 +36,8 @@ class GophoraAI:
     def __init__(self):
         """Initialize chatbot with LangChain components"""
         try:
-            # Initialize Gemini LLM
-            self.llm = ChatGoogleGenerativeAI(
-                model=GEMINI_MODEL,
-                google_api_key=GEMINI_API_KEY,
-                temperature=0.7,
-                convert_system_message_to_human=True
-            )
+            # Completions go through the shared dispatcher (Gemini first, OpenAI as fallback)
+            self.dispatcher = llm_dispatcher
             
             # Initialize embeddings
             self.embeddings = GoogleGenerativeAIEmbeddings(
@@ -208,8 +206,12 @@ Answer naturally like ChatGPT or Gemini would.
                 conversation_context += f"{msg['role']}: {msg['content']}\n"
             conversation_context += f"user: {message}\nassistant:"
             
-            response_obj = await self.llm.ainvoke(conversation_context)
-            response = response_obj.content if hasattr(response_obj, 'content') else str(response_obj)
+            response = await self.dispatcher.complete(
+                conversation_context,
+                temperature=0.7,
+                max_tokens=CHAT_MAX_TOKENS,
+                prefer=['gemini', 'openai']
+            )
             
             # Add to history
             self._add_to_history(user_id, 'user', message)
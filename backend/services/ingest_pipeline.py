@@ -0,0 +1,286 @@
+"""
+Streaming staged ingestion pipeline
+fetch -> normalize -> dedup -> score -> batched write, connected by bounded
+asyncio queues so jobs flow downstream as soon as any source returns and a
+slow stage applies backpressure instead of letting an all_jobs list grow
+
+Before each batch is written, an optional change filter drops jobs whose
+stored copy is identical, so re-emitted postings don't cost a write, and an
+optional batch scorer scores the rest together (e.g. one LLM request for many jobs)
+
+Sources can defer bookkeeping that marks their input as processed (watermarks,
+feed hashes) with after_stored(); it runs once everything the source yielded
+has been stored, and is dropped if the fetch or any of its batches failed
+"""
+import asyncio
+import inspect
+import logging
+import contextvars
+from typing import List, Dict, Any, Callable, Awaitable, Optional, Hashable, Tuple
+
+from backend.utils.scrape_telemetry import scrape_telemetry, SourceRun
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_QUEUE_SIZE = 100
+PIPELINE_BATCH_SIZE = 50
+
+# Marks the end of the stream on every queue; other items are (source, job) pairs
+_END = object()
+
+# Raw scraper dicts before the normalize stage, JobRecords after it
+Job = Any
+
+# Callbacks deferred by the source currently being fetched (None outside a pipeline)
+_deferred_commits: contextvars.ContextVar[Optional[List[Callable[[], Any]]]] = \
+    contextvars.ContextVar('ingest_deferred_commits', default=None)
+
+
+async def _maybe_await(value):
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+async def after_stored(commit: Callable[[], Any]):
+    """
+    Run `commit` (sync or async) once the jobs of the source being fetched are stored
+    Outside a pipeline run it is called right away
+    """
+    pending = _deferred_commits.get()
+    if pending is None:
+        await _maybe_await(commit())
+    else:
+        pending.append(commit)
+
+
+class IngestPipeline:
+    """
+    One ingestion run over a set of sources
+
+    Args:
+        name: Label for logs (e.g. 'user:abc', 'general')
+        sources: source name -> zero-arg coroutine function returning a list of jobs
+        write_batch: async callable persisting a list of jobs, returns count written
+        normalize: optional job -> job (or None to drop)
+        dedup_key: optional job -> hashable key for in-run dedup
+        is_duplicate: optional async job -> bool checked against stored jobs
+        score: optional job -> job (sync or async)
+        filter_changed: optional async batch -> the jobs in it that are new or changed;
+            the rest are counted as unchanged and not written
+        score_batch: optional async batch -> batch, applied to new or changed jobs just before writing
+        on_stored: optional callback with the jobs of a batch once they are stored (written or unchanged)
+        on_failed: optional callback with the jobs of a batch that could not be stored
+    """
+
+    def __init__(
+        self,
+        name: str,
+        sources: Dict[str, Callable[[], Awaitable[List[Job]]]],
+        write_batch: Callable[[List[Job]], Awaitable[int]],
+        normalize: Optional[Callable[[Job], Optional[Job]]] = None,
+        dedup_key: Optional[Callable[[Job], Hashable]] = None,
+        is_duplicate: Optional[Callable[[Job], Awaitable[bool]]] = None,
+        score: Optional[Callable[[Job], Any]] = None,
+        filter_changed: Optional[Callable[[List[Job]], Awaitable[List[Job]]]] = None,
+        score_batch: Optional[Callable[[List[Job]], Awaitable[List[Job]]]] = None,
+        on_stored: Optional[Callable[[List[Job]], Any]] = None,
+        on_failed: Optional[Callable[[List[Job]], Any]] = None,
+        queue_size: int = PIPELINE_QUEUE_SIZE,
+        batch_size: int = PIPELINE_BATCH_SIZE
+    ):
+        self.name = name
+        self.sources = sources
+        self.write_batch = write_batch
+        self.normalize = normalize
+        self.dedup_key = dedup_key
+        self.is_duplicate = is_duplicate
+        self.score = score
+        self.filter_changed = filter_changed
+        self.score_batch = score_batch
+        self.on_stored = on_stored
+        self.on_failed = on_failed
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.stats = {
+            'fetched': 0,
+            'dropped': 0,
+            'duplicates': 0,
+            'unchanged': 0,
+            'written': 0,
+            'score_failed': 0,  # jobs lost to filter_changed/score_batch errors
+            'write_failed': 0,  # jobs lost to write_batch errors
+            'batches': 0,
+            'source_errors': 0,
+            'per_source': {}
+        }
+        self.runs: Dict[str, SourceRun] = {}
+        self._commits: Dict[str, List[Callable[[], Any]]] = {}
+        self._failed_sources = set()
+
+    async def _fetch_source(self, source: str, fetch: Callable[[], Awaitable[List[Job]]], out: asyncio.Queue):
+        # Each source runs in its own task (and context), so deferred commits stay per source
+        commits = []
+        _deferred_commits.set(commits)
+        try:
+            with scrape_telemetry.track(source, self.name) as run:
+                self.runs[source] = run
+                jobs = await fetch()
+                run.items_parsed = len(jobs)
+        except Exception as e:
+            logger.error(f"[{self.name}] {source} fetch failed: {e}")
+            self.stats['source_errors'] += 1
+            return
+
+        self._commits[source] = commits
+        self.stats['per_source'][source] = len(jobs)
+        logger.info(f"[{self.name}] {source} yielded {len(jobs)} jobs in {run.latency_seconds:.2f}s")
+        for job in jobs:
+            self.stats['fetched'] += 1
+            await out.put((source, job))
+
+    async def _fetch_stage(self, out: asyncio.Queue):
+        await asyncio.gather(*(
+            self._fetch_source(source, fetch, out) for source, fetch in self.sources.items()
+        ))
+        await out.put(_END)
+
+    async def _normalize_stage(self, inp: asyncio.Queue, out: asyncio.Queue):
+        while (item := await inp.get()) is not _END:
+            source, job = item
+            try:
+                job = self.normalize(job) if self.normalize else job
+            except Exception as e:
+                logger.warning(f"[{self.name}] normalize failed: {e}")
+                job = None
+            if job is None:
+                self.stats['dropped'] += 1
+                continue
+            await out.put((source, job))
+        await out.put(_END)
+
+    def _count_duplicate(self, source: str):
+        self.stats['duplicates'] += 1
+        self.runs[source].items_deduped += 1
+
+    async def _dedup_stage(self, inp: asyncio.Queue, out: asyncio.Queue):
+        seen = set()
+        while (item := await inp.get()) is not _END:
+            source, job = item
+            if self.dedup_key:
+                key = self.dedup_key(job)
+                if key in seen:
+                    self._count_duplicate(source)
+                    continue
+                seen.add(key)
+            if self.is_duplicate and await self.is_duplicate(job):
+                self._count_duplicate(source)
+                continue
+            await out.put(item)
+        await out.put(_END)
+
+    async def _score_stage(self, inp: asyncio.Queue, out: asyncio.Queue):
+        while (item := await inp.get()) is not _END:
+            source, job = item
+            if self.score:
+                job = await _maybe_await(self.score(job))
+            await out.put((source, job))
+        await out.put(_END)
+
+    async def _flush(self, batch: List[Tuple[str, Job]]):
+        all_jobs = [job for _, job in batch]
+        unchanged_jobs: List[Job] = []
+        changed = batch
+        step = 'scoring'
+        try:
+            if self.filter_changed:
+                kept = {id(job) for job in await self.filter_changed(all_jobs)}
+                changed = [(source, job) for source, job in batch if id(job) in kept]
+                for source, job in batch:
+                    if id(job) not in kept:
+                        unchanged_jobs.append(job)
+                        self.stats['unchanged'] += 1
+                        self.runs[source].items_unchanged += 1
+            # Unchanged jobs are already stored, whatever happens to the rest of the batch
+            if unchanged_jobs and self.on_stored:
+                await _maybe_await(self.on_stored(unchanged_jobs))
+            if not changed:
+                return
+
+            scored = changed
+            if self.score_batch:
+                scored_jobs = await self.score_batch([job for _, job in changed])
+                scored = [(source, job) for (source, _), job in zip(changed, scored_jobs)]
+
+            step = 'write'
+            written = await self.write_batch([job for _, job in scored])
+            self.stats['written'] += written
+            self.stats['batches'] += 1
+            for source, _ in scored:
+                self.runs[source].items_written += 1
+        except Exception as e:
+            # Only jobs that didn't get stored count as failed (the whole batch if the change filter failed)
+            logger.error(f"[{self.name}] batch {step} of {len(changed)} jobs failed: {e}")
+            self.stats['score_failed' if step == 'scoring' else 'write_failed'] += len(changed)
+            self._failed_sources.update(source for source, _ in changed)
+            if self.on_failed:
+                await _maybe_await(self.on_failed([job for _, job in changed]))
+            return
+        if self.on_stored:
+            await _maybe_await(self.on_stored([job for _, job in scored]))
+
+    async def _write_stage(self, inp: asyncio.Queue):
+        batch: List[Tuple[str, Job]] = []
+        while (item := await inp.get()) is not _END:
+            batch.append(item)
+            # Flush full batches, or partial ones when upstream has nothing ready
+            if len(batch) >= self.batch_size or inp.empty():
+                await self._flush(batch)
+                batch = []
+        if batch:
+            await self._flush(batch)
+
+    async def _run_commits(self):
+        """Deferred commits of sources whose jobs were all stored"""
+        for source, commits in self._commits.items():
+            if source in self._failed_sources:
+                logger.warning(f"[{self.name}] {source}: not all jobs stored, leaving it to be re-read next run")
+                continue
+            for commit in commits:
+                try:
+                    await _maybe_await(commit())
+                except Exception as e:
+                    logger.error(f"[{self.name}] {source}: commit after store failed: {e}")
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Run all stages to completion and return run statistics
+        If a stage raises, the other stages are cancelled (so none is left blocked
+        on a queue), deferred commits are skipped and the first error is re-raised
+        """
+        fetched, normalized, deduped, scored = (asyncio.Queue(maxsize=self.queue_size) for _ in range(4))
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(self._fetch_stage(fetched))
+                group.create_task(self._normalize_stage(fetched, normalized))
+                group.create_task(self._dedup_stage(normalized, deduped))
+                group.create_task(self._score_stage(deduped, scored))
+                group.create_task(self._write_stage(scored))
+        except ExceptionGroup as eg:
+            logger.error(f"[{self.name}] pipeline aborted: {eg.exceptions[0]}")
+            raise eg.exceptions[0] from eg
+        finally:
+            for run in self.runs.values():
+                scrape_telemetry.record(run)
+
+        await self._run_commits()
+
+        logger.info(
+            f"[{self.name}] pipeline done: fetched {self.stats['fetched']}, "
+            f"duplicates {self.stats['duplicates']}, unchanged {self.stats['unchanged']}, "
+            f"written {self.stats['written']} "
+            f"in {self.stats['batches']} batches, "
+            f"failed {self.stats['score_failed']} in scoring and {self.stats['write_failed']} in writes"
+        )
+        return self.stats
@@ -0,0 +1,294 @@
+"""
+Local deterministic job categorizer
+Maps uncategorized jobs into the fixed category set in-process: weighted
+keyword rules, optionally blended with a small multinomial logistic regression
+trained offline on labeled jobs (python -m backend.workers.train_categorizer,
+enabled with JOB_CATEGORY_MODEL_PATH). Thousands of jobs per second, no
+network; the LLM is only an optional fallback for low-confidence jobs
+"""
+import os
+import re
+import json
+import math
+import random
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+
+from backend.services.ai_validator import ai_validator
+from backend.services.job_record import JobRecord
+
+logger = logging.getLogger(__name__)
+
+JOB_CATEGORIES = [
+    'Technology & IT',
+    'Creative & Design',
+    'Data Entry & Admin',
+    'Customer Service',
+    'Sales & Marketing',
+    'Writing & Content',
+    'Education & Training',
+    'Healthcare',
+    'Finance & Accounting',
+    'Freelance & Gig',
+    'Other'
+]
+FALLBACK_CATEGORY = 'Other'
+
+# Optional trained model blended with the rules; unset means keyword rules only.
+# Only point this at a model trained on real labeled jobs (the seed set is too small)
+MODEL_PATH = os.getenv("JOB_CATEGORY_MODEL_PATH", "")
+# Where train_categorizer writes a model by default
+DEFAULT_MODEL_OUT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'job_category_model.json')
+# Categories that mean "not categorized yet"; curated source labels ('Government',
+# 'Survey & Research', ...) drive the frontend's category filters and are kept
+UNCATEGORIZED = {'', 'General'}
+# Below this confidence the LLM is asked instead if LLM fallback is on, otherwise the job is 'Other'
+CATEGORY_MIN_CONFIDENCE = float(os.getenv("JOB_CATEGORY_MIN_CONFIDENCE", "0.4"))
+CATEGORY_LLM_FALLBACK = os.getenv("JOB_CATEGORY_LLM_FALLBACK", "0") == "1"
+DESCRIPTION_CHARS = 1000
+
+# Category -> keyword/phrase weights; title hits count double
+CATEGORY_RULES: Dict[str, Dict[str, float]] = {
+    'Technology & IT': {
+        'software': 2, 'developer': 2, 'engineer': 1, 'programming': 2, 'python': 2, 'java': 2, 'javascript': 2,
+        'react': 2, 'devops': 3, 'cloud': 1, 'aws': 2, 'kubernetes': 2, 'sql': 1, 'data scientist': 3,
+        'machine learning': 3, 'it support': 3, 'help desk': 1, 'network': 1, 'cybersecurity': 3, 'backend': 3,
+        'frontend': 3, 'full stack': 3, 'qa': 1, 'database': 2, 'api': 1
+    },
+    'Creative & Design': {
+        'designer': 3, 'design': 1, 'graphic': 2, 'figma': 3, 'illustrator': 2, 'photoshop': 2, 'ui/ux': 3,
+        'ux': 2, 'video editor': 3, 'animation': 2, 'photographer': 3, 'logo': 2, 'branding': 2, 'art director': 3,
+        'creative': 1, '3d': 1, 'motion graphics': 2
+    },
+    'Data Entry & Admin': {
+        'data entry': 4, 'administrative': 3, 'admin': 2, 'assistant': 1, 'receptionist': 3, 'clerk': 3,
+        'virtual assistant': 3, 'office manager': 3, 'scheduling': 1, 'filing': 2, 'typing': 3, 'transcription': 3,
+        'transcribe': 3, 'data labeling': 3, 'label images': 2, 'spreadsheet': 1, 'records': 1
+    },
+    'Customer Service': {
+        'customer service': 4, 'customer support': 4, 'call center': 4, 'support agent': 3, 'chat support': 3,
+        'customer care': 4, 'client success': 3, 'customer success': 3, 'inbound calls': 2, 'complaints': 2,
+        'guest services': 3, 'support tickets': 2
+    },
+    'Sales & Marketing': {
+        'sales': 3, 'marketing': 3, 'account executive': 4, 'business development': 3, 'lead generation': 3,
+        'cold call': 2, 'seo': 2, 'social media': 2, 'campaigns': 1, 'advertising': 2, 'google ads': 3,
+        'brand manager': 3, 'growth': 1, 'crm': 1, 'prospect': 2, 'real estate agent': 3
+    },
+    'Writing & Content': {
+        'writer': 3, 'writing': 2, 'copywriter': 4, 'copywriting': 3, 'content': 1, 'editor': 2, 'editing': 2,
+        'proofread': 3, 'proofreading': 3, 'blog': 2, 'articles': 2, 'journalist': 3, 'translator': 3,
+        'translate': 2, 'technical writer': 4, 'ghostwriter': 4
+    },
+    'Education & Training': {
+        'teacher': 4, 'tutor': 4, 'tutoring': 3, 'teaching': 3, 'instructor': 3, 'trainer': 2, 'curriculum': 3,
+        'students': 2, 'school': 2, 'education': 2, 'lesson plans': 3, 'instructional': 3, 'e-learning': 3
+    },
+    'Healthcare': {
+        'nurse': 4, 'nursing': 3, 'patient': 2, 'patients': 2, 'medical': 2, 'clinical': 2, 'health': 1,
+        'healthcare': 3, 'pharmacy': 3, 'therapist': 3, 'caregiver': 3, 'dental': 3, 'hospital': 2,
+        'physician': 2, 'emt': 3, 'veterinary': 3
+    },
+    'Finance & Accounting': {
+        'accountant': 4, 'accounting': 4, 'bookkeeper': 4, 'bookkeeping': 3, 'financial analyst': 4,
+        'finance': 2, 'financial': 2, 'payroll': 3, 'tax': 2, 'audit': 3, 'auditor': 3, 'accounts payable': 4,
+        'invoices': 1, 'quickbooks': 3, 'reconciliations': 3, 'loan': 2, 'bank teller': 3, 'controller': 2
+    },
+    'Freelance & Gig': {
+        'survey': 3, 'surveys': 3, 'gig': 3, 'micro task': 3, 'microtask': 3, 'per task': 2, 'usability test': 3,
+        'test websites': 3, 'mystery shopper': 4, 'focus group': 3, 'research study': 2, 'rideshare': 3,
+        'delivery driver': 2, 'flexible hours': 1, 'earn rewards': 2, 'freelance': 2, 'per visit': 2, 'odd jobs': 3
+    },
+    'Other': {
+        'warehouse': 3, 'driver': 1, 'cdl': 3, 'forklift': 3, 'barista': 3, 'cook': 3, 'electrician': 3,
+        'plumber': 3, 'janitor': 3, 'security guard': 3, 'construction': 3, 'landscaper': 3, 'manufacturing': 2
+    }
+}
+
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#/]*')
+STEM_SUFFIXES = ('ing', 'ers', 'er', 'ed', 'es', 's', 'e', 'ist', 'ian')
+
+
+def _build_rule_index() -> Tuple[Dict[str, List[Tuple[str, float]]], re.Pattern]:
+    """Phrase -> (category, weight) pairs, and one alternation over every phrase (longest first)"""
+    weights: Dict[str, List[Tuple[str, float]]] = {}
+    for category, rules in CATEGORY_RULES.items():
+        for phrase, weight in rules.items():
+            weights.setdefault(phrase, []).append((category, weight))
+    alternation = '|'.join(re.escape(phrase) for phrase in sorted(weights, key=len, reverse=True))
+    return weights, re.compile(r'(?<![a-z0-9])(' + alternation + r')(?![a-z0-9])')
+
+
+_RULE_WEIGHTS, _RULE_RE = _build_rule_index()
+
+
+def _stem(token: str) -> str:
+    """Crude suffix stripping so designer/design/designs share a feature"""
+    for suffix in STEM_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    return token
+
+
+def _tokens(text: str) -> List[str]:
+    return [_stem(token) for token in TOKEN_RE.findall((text or '').lower())]
+
+
+def featurize(title: str, description: str) -> Counter:
+    """Bag of title unigrams/bigrams and description unigrams"""
+    title_tokens = _tokens(title)
+    features = Counter(f"t:{token}" for token in title_tokens)
+    features.update(f"tb:{a}_{b}" for a, b in zip(title_tokens, title_tokens[1:]))
+    features.update(f"d:{token}" for token in set(_tokens((description or '')[:DESCRIPTION_CHARS])))
+    return features
+
+
+def rule_scores(title: str, description: str) -> Dict[str, float]:
+    """Keyword rule weight per category (title hits count double)"""
+    scores: Dict[str, float] = {}
+    # Each phrase counts once per field
+    for text, multiplier in ((title, 2), ((description or '')[:DESCRIPTION_CHARS], 1)):
+        for phrase in set(_RULE_RE.findall((text or '').lower())):
+            for category, weight in _RULE_WEIGHTS[phrase]:
+                scores[category] = scores.get(category, 0.0) + weight * multiplier
+    return scores
+
+
+def _softmax(scores: Dict[str, float]) -> Dict[str, float]:
+    top = max(scores.values())
+    exps = {category: math.exp(score - top) for category, score in scores.items()}
+    total = sum(exps.values())
+    return {category: value / total for category, value in exps.items()}
+
+
+class LinearCategoryModel:
+    """Multinomial logistic regression over sparse bag-of-words features"""
+
+    def __init__(self, weights: Optional[Dict[str, Dict[str, float]]] = None, bias: Optional[Dict[str, float]] = None):
+        self.weights = weights or {}
+        self.bias = bias or {category: 0.0 for category in JOB_CATEGORIES}
+
+    def probabilities(self, features: Counter) -> Dict[str, float]:
+        scores = dict(self.bias)
+        for feature, count in features.items():
+            for category, weight in self.weights.get(feature, {}).items():
+                scores[category] += weight * count
+        return _softmax(scores)
+
+    @classmethod
+    def train(
+        cls, samples: List[Tuple[Counter, str]], epochs: int = 30, learning_rate: float = 0.3,
+        l2: float = 1e-4, seed: int = 13
+    ) -> 'LinearCategoryModel':
+        """SGD on (features, category) pairs; deterministic for a given seed"""
+        model = cls()
+        order = list(range(len(samples)))
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(order)
+            rate = learning_rate / (1 + epoch * 0.1)
+            for index in order:
+                features, label = samples[index]
+                probabilities = model.probabilities(features)
+                for category in JOB_CATEGORIES:
+                    gradient = probabilities[category] - (category == label)
+                    model.bias[category] -= rate * gradient
+                    for feature, count in features.items():
+                        row = model.weights.setdefault(feature, {})
+                        weight = row.get(category, 0.0)
+                        row[category] = weight - rate * (gradient * count + l2 * weight)
+        # Drop near-zero weights to keep the model file small
+        model.weights = {
+            feature: {category: round(weight, 3) for category, weight in row.items() if abs(weight) >= 0.05}
+            for feature, row in model.weights.items()
+        }
+        model.weights = {feature: row for feature, row in model.weights.items() if row}
+        return model
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'categories': JOB_CATEGORIES, 'bias': self.bias, 'weights': self.weights}, f, sort_keys=True)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['LinearCategoryModel']:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Job category model not loaded from {path}: {e}; using keyword rules only")
+            return None
+        if data.get('categories') != JOB_CATEGORIES:
+            logger.warning(f"Job category model at {path} was trained on other categories; using keyword rules only")
+            return None
+        return cls(data['weights'], data['bias'])
+
+
+@dataclass
+class CategoryPrediction:
+    category: str
+    confidence: float
+    method: str  # 'local' or 'llm'
+
+
+class JobCategorizer:
+    """Keyword rules blended with the linear model; optional LLM fallback for low confidence"""
+
+    def __init__(self, model_path: str = MODEL_PATH, rule_weight: float = 1.0):
+        self.model = LinearCategoryModel.load(model_path) if model_path else None
+        self.rule_weight = rule_weight
+        self.stats = {'local': 0, 'low_confidence': 0, 'llm_fallbacks': 0, 'llm_rejected': 0}
+
+    def predict(self, title: str, description: str) -> CategoryPrediction:
+        """Local prediction (no I/O)"""
+        rules = rule_scores(title, description)
+        total = sum(rules.values())
+        combined = {category: 0.0 for category in JOB_CATEGORIES}
+        weight = 0.0
+        if total:
+            for category, score in rules.items():
+                combined[category] += self.rule_weight * score / total
+            weight += self.rule_weight
+        if self.model is not None:
+            for category, probability in self.model.probabilities(featurize(title, description)).items():
+                combined[category] += probability
+            weight += 1.0
+        if not weight:
+            return CategoryPrediction(FALLBACK_CATEGORY, 0.0, 'local')
+
+        category = max(combined, key=combined.get)
+        return CategoryPrediction(category, round(combined[category] / weight, 3), 'local')
+
+    async def categorize(self, title: str, description: str) -> CategoryPrediction:
+        """Local prediction, or the LLM's answer for low-confidence jobs when LLM fallback is on"""
+        prediction = self.predict(title, description)
+        self.stats['local'] += 1
+        if prediction.confidence >= CATEGORY_MIN_CONFIDENCE:
+            return prediction
+
+        self.stats['low_confidence'] += 1
+        if CATEGORY_LLM_FALLBACK and (ai_validator.use_openai or ai_validator.use_gemini):
+            self.stats['llm_fallbacks'] += 1
+            answer = (await ai_validator.categorize_job(title, description)).strip().strip('."\'').lower()
+            for category in JOB_CATEGORIES:
+                if category.lower() == answer:
+                    return CategoryPrediction(category, prediction.confidence, 'llm')
+            self.stats['llm_rejected'] += 1
+        # A low-confidence guess is worse than the catch-all
+        return CategoryPrediction(FALLBACK_CATEGORY, prediction.confidence, 'local')
+
+    async def apply(self, job: JobRecord) -> JobRecord:
+        """Set a job's category if its source left it missing or 'General'"""
+        if job.category in UNCATEGORIZED:
+            job.category = (await self.categorize(job.job_title, job.description)).category
+        return job
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Prediction counters since startup"""
+        return {'model_loaded': self.model is not None, **self.stats}
+
+
+# Global instance
+job_categorizer = JobCategorizer()
@@ -0,0 +1,201 @@
+"""
+Lazy full-description fetcher
+List scrapers keep descriptions short (APIs are truncated to 500 chars, some
+HTML sources only store a one-line placeholder); the full posting is fetched
+from sourceLink when a job's detail view is opened, cached on disk with a TTL,
+and prefetched in the background for the jobs shown first
+"""
+import os
+import json
+import asyncio
+import logging
+import weakref
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from backend.utils.detail_cache import DetailCache
+from backend.utils.html_parser import parse_html
+
+logger = logging.getLogger(__name__)
+
+DETAIL_FETCH_CONCURRENCY = int(os.getenv("SCRAPER_DETAIL_CONCURRENCY", "4"))
+DETAIL_FETCH_TIMEOUT_SECONDS = float(os.getenv("SCRAPER_DETAIL_TIMEOUT", "10"))
+# How long a detail view waits for a fetch before showing the stored description
+DETAIL_VIEW_WAIT_SECONDS = float(os.getenv("SCRAPER_DETAIL_VIEW_WAIT", "3"))
+DETAIL_PREFETCH_COUNT = int(os.getenv("SCRAPER_DETAIL_PREFETCH", "20"))
+MAX_DESCRIPTION_CHARS = 20000
+
+# Sources whose stored description is truncated or a placeholder; curated gig lists are complete
+DETAIL_SOURCES = {
+    'RemoteOK', 'Arbeitnow', 'Himalayas', 'Adzuna', 'USAJobs',
+    'Indeed', 'LinkedIn', 'Glassdoor', 'Handshake', 'Upwork'
+}
+
+# Description containers per host suffix, tried when the page has no JobPosting JSON-LD
+DETAIL_SELECTORS: Dict[str, List[str]] = {
+    'linkedin.com': ['div.show-more-less-html__markup', 'div.description__text'],
+    'glassdoor.com': ['div.jobDescriptionContent', 'div[class*="JobDetails_jobDescription"]'],
+    'indeed.com': ['#jobDescriptionText'],
+    'upwork.com': ['[data-test="Description"]', 'div.job-description'],
+    'usajobs.gov': ['#duties', '#summary'],
+}
+
+
+def _html_to_text(html: str) -> str:
+    return parse_html(html).get_text('\n', strip=True)
+
+
+def _job_posting_description(data: Any) -> Optional[str]:
+    """Description of the first schema.org JobPosting in a JSON-LD document"""
+    if isinstance(data, list):
+        for item in data:
+            description = _job_posting_description(item)
+            if description:
+                return description
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    types = data.get('@type')
+    if types == 'JobPosting' or (isinstance(types, list) and 'JobPosting' in types):
+        return data.get('description') or None
+    return _job_posting_description(data.get('@graph'))
+
+
+def extract_description(html, url: str) -> Optional[str]:
+    """
+    Full job description from a posting page
+    Tries schema.org JobPosting JSON-LD (used by most boards), then known
+    per-site containers, then the page's meta description
+    """
+    soup = parse_html(html)
+
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            description = _job_posting_description(json.loads(script.string or ''))
+        except ValueError:
+            continue
+        if description:
+            return _html_to_text(description)[:MAX_DESCRIPTION_CHARS]
+
+    host = urlsplit(url).netloc
+    for suffix, selectors in DETAIL_SELECTORS.items():
+        if host == suffix or host.endswith('.' + suffix):
+            for selector in selectors:
+                node = soup.select_one(selector)
+                text = node.get_text('\n', strip=True) if node else ''
+                if text:
+                    return text[:MAX_DESCRIPTION_CHARS]
+
+    meta = soup.find('meta', attrs={'property': 'og:description'}) or soup.find('meta', attrs={'name': 'description'})
+    content = (meta.get('content') or '').strip() if meta else ''
+    return content[:MAX_DESCRIPTION_CHARS] or None
+
+
+class JobDetailFetcher:
+    """Fetches, caches and prefetches full job descriptions"""
+
+    def __init__(self, cache: Optional[DetailCache] = None, concurrency: int = DETAIL_FETCH_CONCURRENCY):
+        self.cache = cache or DetailCache()
+        self.concurrency = concurrency
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        })
+        # Semaphores are bound to an event loop
+        self._semaphores: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]' = \
+            weakref.WeakKeyDictionary()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.stats = {'fetches': 0, 'failures': 0, 'not_found': 0, 'prefetched': 0}
+
+    @staticmethod
+    def needs_detail(job: Dict[str, Any]) -> bool:
+        """True if the job's stored description is partial and it links to its posting"""
+        link = job.get('sourceLink') or ''
+        return job.get('source') in DETAIL_SOURCES and link.startswith(('http://', 'https://'))
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        return self._semaphores[loop]
+
+    def _fetch_page(self, url: str) -> Optional[str]:
+        response = self.session.get(url, timeout=DETAIL_FETCH_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        return extract_description(response.content, url)
+
+    async def _fetch(self, url: str) -> Optional[str]:
+        async with self._semaphore():
+            self.stats['fetches'] += 1
+            try:
+                description = await asyncio.to_thread(self._fetch_page, url)
+            except requests.HTTPError as e:
+                # Posting removed (or never real, e.g. fallback links): remember that for a while
+                self.stats['not_found'] += 1
+                logger.info(f"Detail fetch for {url} returned {e.response.status_code}")
+                description = None
+            except Exception as e:
+                # Network trouble: not cached, the next view retries
+                self.stats['failures'] += 1
+                logger.warning(f"Detail fetch for {url} failed: {e}")
+                return None
+
+        self.cache.set(url, description)
+        return description
+
+    async def get_description(self, job: Dict[str, Any]) -> Optional[str]:
+        """
+        Full description for a job from the cache or its posting page, None if unavailable
+        Concurrent callers for the same URL share one fetch
+        """
+        if not self.needs_detail(job):
+            return None
+        url = job['sourceLink']
+
+        entry = self.cache.get(url)
+        if entry is not None:
+            return entry['description']
+
+        task = self._in_flight.get(url)
+        if task is None:
+            task = asyncio.create_task(self._fetch(url))
+            self._in_flight[url] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(url, None))
+        # Shielded so a caller giving up doesn't cancel the fetch for everyone else
+        return await asyncio.shield(task)
+
+    async def full_description(self, job: Dict[str, Any], wait: float = DETAIL_VIEW_WAIT_SECONDS) -> str:
+        """
+        Description to show in a detail view: the full one if it is cached or
+        arrives within `wait` seconds, otherwise the stored one (the fetch keeps
+        running and fills the cache for the next view)
+        """
+        stored = job.get('description') or ''
+        try:
+            description = await asyncio.wait_for(self.get_description(job), wait)
+        except asyncio.TimeoutError:
+            description = None
+        return description if description and len(description) > len(stored) else stored
+
+    async def prefetch(self, jobs: List[Dict[str, Any]], limit: int = DETAIL_PREFETCH_COUNT) -> int:
+        """Warm the cache for the first `limit` jobs (pass them highest-ranked first); returns pages fetched"""
+        fetches_before = self.stats['fetches']
+        await asyncio.gather(
+            *(self.get_description(job) for job in jobs[:limit] if self.needs_detail(job)),
+            return_exceptions=True
+        )
+        fetched = self.stats['fetches'] - fetches_before
+        self.stats['prefetched'] += fetched
+        logger.info(f"Prefetched {fetched} job descriptions")
+        return fetched
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Fetch and cache counters for the health endpoint"""
+        return {**self.stats, 'in_flight': len(self._in_flight), 'cache': self.cache.get_stats()}
+
+
+# Global instance
+job_details = JobDetailFetcher()
@@ -0,0 +1,151 @@
+"""
+Normalized job record shared by all scrapers
+Scrapers still emit raw dicts; one normalizer per source adapter maps them to a
+compact, fixed-field JobRecord so dedup, scoring and storage stop patching
+missing keys with setdefault
+"""
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class JobRecord:
+    """One scraped job with fixed fields (Firestore keys via to_dict)"""
+    job_title: str
+    source: str
+    source_link: str = ''
+    company: str = ''
+    location: str = ''
+    description: str = ''
+    requirements: str = ''
+    salary: str = ''
+    category: str = 'General'
+    tags: Tuple[str, ...] = ()
+    # Gig-only fields
+    estimated_pay: str = ''
+    duration: str = ''
+    # Filled in by the score stage
+    ai_validation_score: Optional[float] = None
+    ai_reasoning: str = ''
+    skill_matches: List[str] = field(default_factory=list)
+    skill_gaps: List[str] = field(default_factory=list)
+
+    def content_hash(self) -> str:
+        """Hash of the scraped content (not the scores); equal hashes mean the stored document is current"""
+        content = '\x1f'.join([
+            self.job_title, self.source, self.source_link, self.company, self.location, self.description,
+            self.requirements, self.salary, self.category, '\x1e'.join(self.tags), self.estimated_pay, self.duration
+        ])
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Firestore document for this job; optional fields are omitted when unset"""
+        doc = {
+            'jobTitle': self.job_title,
+            'company': self.company,
+            'location': self.location,
+            'description': self.description,
+            'requirements': self.requirements,
+            'salary': self.salary,
+            'sourceLink': self.source_link,
+            'source': self.source,
+            'category': self.category,
+            'contentHash': self.content_hash()
+        }
+        if self.tags:
+            doc['tags'] = list(self.tags)
+        if self.estimated_pay:
+            doc['estimatedPay'] = self.estimated_pay
+        if self.duration:
+            doc['duration'] = self.duration
+        if self.ai_validation_score is not None:
+            doc['aiValidationScore'] = self.ai_validation_score
+            doc['aiReasoning'] = self.ai_reasoning
+            doc['skillMatches'] = list(self.skill_matches)
+            doc['skillGaps'] = list(self.skill_gaps)
+        return doc
+
+
+def _text(raw: Dict[str, Any], key: str, default: str = '') -> str:
+    value = raw.get(key)
+    if value is None or value == '':
+        return default
+    return str(value).strip()
+
+
+def normalize_job_board(raw: Dict[str, Any]) -> JobRecord:
+    """Job boards and APIs (Indeed, LinkedIn, RemoteOK, Adzuna, ...)"""
+    return JobRecord(
+        job_title=_text(raw, 'jobTitle'),
+        source=_text(raw, 'source', 'Unknown'),
+        source_link=_text(raw, 'sourceLink'),
+        company=_text(raw, 'company', 'Unknown'),
+        location=_text(raw, 'location'),
+        description=_text(raw, 'description'),
+        requirements=_text(raw, 'requirements'),
+        salary=_text(raw, 'salary'),
+        category=_text(raw, 'category', 'General'),
+        tags=tuple(str(tag) for tag in raw.get('tags') or ())
+    )
+
+
+def normalize_gig(raw: Dict[str, Any]) -> JobRecord:
+    """Gig and micro-task platforms: pay instead of salary, usually no company or location"""
+    source = _text(raw, 'source', 'Unknown')
+    estimated_pay = _text(raw, 'estimatedPay')
+    return JobRecord(
+        job_title=_text(raw, 'jobTitle'),
+        source=source,
+        source_link=_text(raw, 'sourceLink'),
+        company=_text(raw, 'company', source),
+        location=_text(raw, 'location', 'Remote'),
+        description=_text(raw, 'description'),
+        requirements=_text(raw, 'requirements', 'No experience required'),
+        salary=_text(raw, 'salary', estimated_pay or 'Varies'),
+        category=_text(raw, 'category', 'General'),
+        tags=tuple(str(tag) for tag in raw.get('tags') or ()),
+        estimated_pay=estimated_pay,
+        duration=_text(raw, 'duration')
+    )
+
+
+# Source name (as set in the raw 'source' field) -> normalizer
+NORMALIZERS: Dict[str, Callable[[Dict[str, Any]], JobRecord]] = {
+    'Indeed': normalize_job_board,
+    'LinkedIn': normalize_job_board,
+    'Glassdoor': normalize_job_board,
+    'Handshake': normalize_job_board,
+    'RemoteOK': normalize_job_board,
+    'Arbeitnow': normalize_job_board,
+    'Himalayas': normalize_job_board,
+    'Adzuna': normalize_job_board,
+    'USAJobs': normalize_job_board,
+    'Upwork': normalize_gig,
+    'Fiverr': normalize_gig,
+    'Amazon MTurk': normalize_gig,
+    'Swagbucks': normalize_gig,
+    'Survey Junkie': normalize_gig,
+    'Clickworker': normalize_gig,
+    'UserTesting': normalize_gig,
+    'Respondent': normalize_gig,
+}
+
+
+def normalize_job(raw: Dict[str, Any]) -> Optional[JobRecord]:
+    """
+    Map a raw scraper dict to a JobRecord using its source's normalizer
+    Returns None for jobs without a title, which the pipeline drops
+    """
+    normalizer = NORMALIZERS.get(raw.get('source'))
+    if normalizer is None:
+        # Unknown source: gig-style if it carries gig fields, otherwise a job board
+        normalizer = normalize_gig if 'estimatedPay' in raw else normalize_job_board
+    record = normalizer(raw)
+    if not record.job_title:
+        logger.debug(f"Dropping {record.source} job without a title")
+        return None
+    return record
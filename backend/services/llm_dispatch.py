@@ -0,0 +1,374 @@
+"""
+LLM dispatch layer
+Every LLM completion (AIValidator, GophoraAI) goes through one dispatcher that
+tracks each provider's quota and health: token buckets for requests and
+tokens per minute, bounded concurrency, failover ordered by recent error rate
+and latency, and optional hedging to the next provider when the first is slow.
+Identical prompts already in flight are coalesced into one call
+"""
+import os
+import time
+import asyncio
+import logging
+import threading
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Callable, Awaitable, Optional
+
+import httpx
+import google.generativeai as genai
+from openai import AsyncOpenAI
+from dotenv import load_dotenv
+
+from backend.utils.single_flight import SingleFlight, flight_key
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_MODEL = "gpt-4-turbo-preview"
+
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL = os.getenv("GEMINI_CHAT_MODEL", "gemini-1.5-flash-latest")
+if GEMINI_API_KEY:
+    genai.configure(api_key=GEMINI_API_KEY)
+
+# Per-call ceiling for one LLM round-trip, and the size of the shared connection pool
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+
+# Provider quotas (requests and tokens per minute) and in-flight calls per provider
+OPENAI_RPM = int(os.getenv("LLM_OPENAI_RPM", "500"))
+OPENAI_TPM = int(os.getenv("LLM_OPENAI_TPM", "150000"))
+GEMINI_RPM = int(os.getenv("LLM_GEMINI_RPM", "60"))
+GEMINI_TPM = int(os.getenv("LLM_GEMINI_TPM", "1000000"))
+LLM_PROVIDER_CONCURRENCY = int(os.getenv("LLM_PROVIDER_CONCURRENCY", "8"))
+
+# How long a call may queue for quota before moving on to the next provider
+LLM_MAX_QUOTA_WAIT_SECONDS = float(os.getenv("LLM_MAX_QUOTA_WAIT", "20"))
+# Start the same request on the next provider if the first hasn't answered by then (0 disables)
+LLM_HEDGE_AFTER_SECONDS = float(os.getenv("LLM_HEDGE_AFTER", "0"))
+
+# A provider is demoted behind healthy ones when its recent error rate or latency is too high
+FAILOVER_ERROR_RATE = 0.5
+FAILOVER_LATENCY_SECONDS = 20.0
+FAILOVER_MIN_SAMPLES = 4
+HEALTH_WINDOW = 20
+# A demoted provider gets the traffic back to re-probe once it has been idle this long
+FAILOVER_COOLDOWN_SECONDS = 60.0
+LATENCY_EWMA_ALPHA = 0.2
+
+
+class LLMUnavailableError(Exception):
+    """No provider could answer (none configured, all out of quota or all failed)"""
+
+
+class _QuotaExhausted(Exception):
+    pass
+
+
+def estimate_tokens(prompt: str, max_tokens: int) -> int:
+    """Prompt tokens (~4 chars each) plus the completion budget"""
+    return len(prompt) // 4 + max_tokens
+
+
+class TokenBucket:
+    """Per-minute budget refilled continuously; reservations may be queued ahead of the refill"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until `amount` is available"""
+        self._refill(time.monotonic())
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+
+@dataclass
+class LLMProvider:
+    """One configured provider with its quota buckets and recent health"""
+    name: str
+    model: str
+    call: Callable[[str, Optional[str], float, int], Awaitable[str]]
+    requests_per_minute: int
+    tokens_per_minute: int
+    max_concurrency: int = LLM_PROVIDER_CONCURRENCY
+    requests: TokenBucket = field(init=False)
+    tokens: TokenBucket = field(init=False)
+    outcomes: deque = field(init=False)
+    latency_ewma: Optional[float] = field(default=None, init=False)
+    last_outcome_at: float = field(default=0.0, init=False)
+    stats: Dict[str, int] = field(init=False)
+
+    def __post_init__(self):
+        self.requests = TokenBucket(self.requests_per_minute)
+        self.tokens = TokenBucket(self.tokens_per_minute)
+        self.outcomes = deque(maxlen=HEALTH_WINDOW)
+        self.stats = {'calls': 0, 'failures': 0, 'quota_skips': 0}
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int, max_wait: float) -> float:
+        """Reserve one request and `tokens`; returns the wait before calling, raises if over max_wait"""
+        with self._lock:
+            wait = max(self.requests.wait_for(1), self.tokens.wait_for(tokens))
+            if wait > max_wait:
+                raise _QuotaExhausted(f"{self.name} quota exhausted for {wait:.0f}s")
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            return wait
+
+    def record(self, ok: bool, latency: float):
+        self.outcomes.append(ok)
+        self.last_outcome_at = time.monotonic()
+        self.stats['calls'] += 1
+        if not ok:
+            self.stats['failures'] += 1
+            return
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += LATENCY_EWMA_ALPHA * (latency - self.latency_ewma)
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    @property
+    def degraded(self) -> bool:
+        if time.monotonic() - self.last_outcome_at >= FAILOVER_COOLDOWN_SECONDS:
+            return False
+        if len(self.outcomes) >= FAILOVER_MIN_SAMPLES and self.error_rate >= FAILOVER_ERROR_RATE:
+            return True
+        return self.latency_ewma is not None and self.latency_ewma >= FAILOVER_LATENCY_SECONDS
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'model': self.model,
+            **self.stats,
+            'error_rate': round(self.error_rate, 3),
+            'latency_ewma_seconds': round(self.latency_ewma, 2) if self.latency_ewma is not None else None,
+            'degraded': self.degraded,
+            'requests_available': int(self.requests.level),
+            'tokens_available': int(self.tokens.level)
+        }
+
+
+class LLMDispatcher:
+    """Routes completions to providers under their limits, with failover and optional hedging"""
+
+    def __init__(self):
+        self.providers: Dict[str, LLMProvider] = {}
+        if OPENAI_API_KEY:
+            self.register(LLMProvider('openai', OPENAI_MODEL, self._call_openai, OPENAI_RPM, OPENAI_TPM))
+        if GEMINI_API_KEY:
+            self.register(LLMProvider('gemini', GEMINI_MODEL, self._call_gemini, GEMINI_RPM, GEMINI_TPM))
+        # Async clients and semaphores are bound to an event loop; Celery tasks each run their own loop
+        self._openai_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]' = \
+            weakref.WeakKeyDictionary()
+        self._gemini_model = genai.GenerativeModel(GEMINI_MODEL) if GEMINI_API_KEY else None
+        self._semaphores: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]' = \
+            weakref.WeakKeyDictionary()
+        # Identical prompts already in flight (same job validated for several users, same chat question) share one call
+        self.single_flight = SingleFlight()
+        self.stats = {'completions': 0, 'failovers': 0, 'hedges': 0, 'hedge_wins': 0, 'unavailable': 0}
+
+    def register(self, provider: LLMProvider):
+        self.providers[provider.name] = provider
+
+    def model_id(self, prefer: Optional[List[str]] = None) -> str:
+        """Configured models in preference order (for cache keys)"""
+        names = [name for name in (prefer or list(self.providers)) if name in self.providers]
+        return '+'.join(self.providers[name].model for name in names)
+
+    # ==================== PROVIDERS ====================
+
+    def _openai_client(self) -> AsyncOpenAI:
+        """OpenAI client for the running loop; all calls on a loop share its connection pool"""
+        loop = asyncio.get_running_loop()
+        client = self._openai_clients.get(loop)
+        if client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS),
+                timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=10.0)
+            )
+            # Retries are left to failover so a slow call can't exceed its timeout
+            client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=http_client, max_retries=0)
+            self._openai_clients[loop] = client
+        return client
+
+    async def _call_openai(self, prompt: str, system: Optional[str], temperature: float, max_tokens: int) -> str:
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": prompt})
+        response = await self._openai_client().chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        return response.choices[0].message.content
+
+    async def _call_gemini(self, prompt: str, system: Optional[str], temperature: float, max_tokens: int) -> str:
+        # The SDK's async client binds its gRPC channel to the first event loop that uses it,
+        # so the public sync call runs on a worker thread instead; it works from any loop
+        response = await asyncio.to_thread(
+            self._gemini_model.generate_content,
+            f"{system}\n\n{prompt}" if system else prompt,
+            generation_config={'temperature': temperature, 'max_output_tokens': max_tokens},
+            # Retries are left to failover, like OpenAI's max_retries=0
+            request_options={'timeout': LLM_TIMEOUT_SECONDS, 'retry': None}
+        )
+        return response.text.strip()
+
+    async def aclose(self):
+        """Close the running loop's connections (application shutdown)"""
+        loop = asyncio.get_running_loop()
+        client = self._openai_clients.pop(loop, None)
+        if client is not None:
+            await client.close()
+
+    # ==================== DISPATCH ====================
+
+    def _semaphore(self, provider: LLMProvider) -> asyncio.Semaphore:
+        semaphores = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        if provider.name not in semaphores:
+            semaphores[provider.name] = asyncio.Semaphore(provider.max_concurrency)
+        return semaphores[provider.name]
+
+    def _order(self, prefer: Optional[List[str]]) -> List[LLMProvider]:
+        """Preferred order, with degraded providers moved behind healthy ones"""
+        names = [name for name in (prefer or []) if name in self.providers]
+        names += [name for name in self.providers if name not in names]
+        return sorted((self.providers[name] for name in names), key=lambda provider: provider.degraded)
+
+    async def _attempt(self, provider: LLMProvider, request: Dict[str, Any], max_wait: float) -> str:
+        try:
+            wait = provider.reserve(estimate_tokens(request['prompt'], request['max_tokens']), max_wait)
+        except _QuotaExhausted:
+            provider.stats['quota_skips'] += 1
+            raise
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        async with self._semaphore(provider):
+            started = time.monotonic()
+            try:
+                # wait_for cancels the request (and closes its connection) on timeout;
+                # a cancelled caller cancels it the same way
+                text = await asyncio.wait_for(
+                    provider.call(request['prompt'], request['system'], request['temperature'], request['max_tokens']),
+                    LLM_TIMEOUT_SECONDS
+                )
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                provider.record(False, time.monotonic() - started)
+                raise asyncio.TimeoutError(f"{provider.name} timed out after {LLM_TIMEOUT_SECONDS:.0f}s") from None
+            except Exception:
+                provider.record(False, time.monotonic() - started)
+                raise
+            provider.record(True, time.monotonic() - started)
+            return text
+
+    async def _sequential(self, providers: List[LLMProvider], request: Dict[str, Any], errors: List[str]) -> str:
+        for position, provider in enumerate(providers):
+            if position or errors:
+                self.stats['failovers'] += 1
+            try:
+                return await self._attempt(provider, request, LLM_MAX_QUOTA_WAIT_SECONDS)
+            except Exception as e:
+                logger.warning(f"LLM provider {provider.name} failed: {e}")
+                errors.append(f"{provider.name}: {e}")
+        raise LLMUnavailableError("; ".join(errors))
+
+    async def _hedged(self, providers: List[LLMProvider], request: Dict[str, Any]) -> str:
+        """Primary first; if it hasn't answered within the hedge delay, race it against the next provider"""
+        errors: List[str] = []
+        primary = asyncio.create_task(self._attempt(providers[0], request, LLM_MAX_QUOTA_WAIT_SECONDS))
+        try:
+            return await asyncio.wait_for(asyncio.shield(primary), LLM_HEDGE_AFTER_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        except Exception as e:
+            logger.warning(f"LLM provider {providers[0].name} failed: {e}")
+            errors.append(f"{providers[0].name}: {e}")
+            return await self._sequential(providers[1:], request, errors)
+
+        # The hedge doesn't queue for quota: it only helps if it can start now
+        self.stats['hedges'] += 1
+        hedge = asyncio.create_task(self._attempt(providers[1], request, 0.0))
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    provider = providers[0] if task is primary else providers[1]
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.stats['hedge_wins'] += 1
+                        return task.result()
+                    errors.append(f"{provider.name}: {task.exception()}")
+        finally:
+            for task in pending:
+                task.cancel()
+        return await self._sequential(providers[2:], request, errors)
+
+    async def complete(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: float = 0.3,
+        max_tokens: int = 1000,
+        prefer: Optional[List[str]] = None
+    ) -> str:
+        """
+        Completion text from the first provider able to answer
+        prefer: provider names in preference order ('openai', 'gemini'); others follow
+        Concurrent calls with the same prompt and settings share one completion
+        Raises LLMUnavailableError if no provider answered
+        """
+        providers = self._order(prefer)
+        if not providers:
+            self.stats['unavailable'] += 1
+            raise LLMUnavailableError("No AI provider configured")
+
+        request = {'prompt': prompt, 'system': system, 'temperature': temperature, 'max_tokens': max_tokens}
+        key = flight_key(request, prefer or [])
+        return await self.single_flight.run(key, lambda: self._dispatch(providers, request))
+
+    async def _dispatch(self, providers: List[LLMProvider], request: Dict[str, Any]) -> str:
+        self.stats['completions'] += 1
+        try:
+            if LLM_HEDGE_AFTER_SECONDS > 0 and len(providers) > 1:
+                return await self._hedged(providers, request)
+            return await self._sequential(providers, request, [])
+        except LLMUnavailableError:
+            self.stats['unavailable'] += 1
+            raise
+
+    def get_status(self) -> Dict[str, Any]:
+        """Per-provider quota and health, plus dispatch counters, for the health endpoint"""
+        return {
+            **self.stats,
+            'coalesced': self.single_flight.coalesced,
+            'hedge_after_seconds': LLM_HEDGE_AFTER_SECONDS,
+            'providers': {name: provider.get_status() for name, provider in self.providers.items()}
+        }
+
+
+# Global instance
+llm_dispatcher = LLMDispatcher()
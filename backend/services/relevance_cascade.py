@@ -0,0 +1,208 @@
+"""
+Cheap-first relevance cascade
+A local scorer (profile skill coverage, title hits and TF-IDF similarity
+between profile and job text) decides clear matches and clear misses; only
+jobs whose local score falls in the ambiguous band go to AIValidator, so most
+jobs never cost an LLM call
+"""
+import os
+import re
+import math
+import logging
+from collections import Counter
+from typing import List, Dict, Any, Iterable, Optional
+
+from backend.services.ai_validator import ai_validator, AIValidator
+
+logger = logging.getLogger(__name__)
+
+# Local scores in [LOW, HIGH) are ambiguous and escalated to the LLM; the defaults agree
+# with every LLM label the cascade decides on the offline sample (see bench_cascade)
+CASCADE_LOW = float(os.getenv("LLM_CASCADE_LOW", "10"))
+CASCADE_HIGH = float(os.getenv("LLM_CASCADE_HIGH", "60"))
+RELEVANT_SCORE = 40  # Same threshold as the LLM prompt's is_relevant
+
+# Skills beyond this many aren't expected in a single posting
+SKILL_COVERAGE_CAP = 2
+ENTRY_LEVELS = {'entry level', 'student', 'intern', ''}
+SENIOR_TITLE_RE = re.compile(r'\b(senior|sr\.?|lead|principal|staff|head of|director|manager)\b', re.IGNORECASE)
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*')
+STEM_SUFFIXES = ('ing', 'ers', 'er', 'ed', 'es', 's', 'e')
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it of on or our that the this to we will with you your'.split()
+)
+
+
+def _stem(token: str) -> str:
+    """Crude suffix stripping so design/designer/designs and write/writing compare equal"""
+    for suffix in STEM_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    return token
+
+
+def _tokens(text: str) -> List[str]:
+    return [_stem(token) for token in TOKEN_RE.findall((text or '').lower()) if token not in STOPWORDS]
+
+
+def _job_tokens(job: Dict[str, str]) -> List[str]:
+    return _tokens(f"{job.get('title') or ''} {job.get('description') or ''} {job.get('requirements') or ''}")
+
+
+def _phrase_re(phrase: str) -> re.Pattern:
+    return re.compile(r'(?<![a-z0-9])' + re.escape(phrase) + r'(?![a-z0-9+#])')
+
+
+def _terms(values: Iterable[str]) -> List[str]:
+    seen = []
+    for value in values or []:
+        term = ' '.join(str(value).lower().split())
+        if term and term not in seen:
+            seen.append(term)
+    return seen
+
+
+def _idf(documents: List[List[str]]) -> Dict[str, float]:
+    document_frequency = Counter(token for document in documents for token in set(document))
+    return {token: math.log((1 + len(documents)) / (1 + count)) + 1 for token, count in document_frequency.items()}
+
+
+def _cosine(a: List[str], b: List[str], idf: Dict[str, float]) -> float:
+    weights_a = {token: count * idf.get(token, 1.0) for token, count in Counter(a).items()}
+    weights_b = {token: count * idf.get(token, 1.0) for token, count in Counter(b).items()}
+    dot = sum(weight * weights_b.get(token, 0.0) for token, weight in weights_a.items())
+    norm = math.sqrt(sum(w * w for w in weights_a.values())) * math.sqrt(sum(w * w for w in weights_b.values()))
+    return dot / norm if norm else 0.0
+
+
+def local_relevance(
+    skills: List[str],
+    interests: List[str],
+    experience: str,
+    job: Dict[str, str],
+    idf: Optional[Dict[str, float]] = None
+) -> Dict[str, Any]:
+    """
+    Score one job 0-100 without an LLM, shaped like AIValidator results
+    idf: token weights from the batch being scored (plain term frequency if omitted)
+    """
+    skills, interests = _terms(skills), _terms(interests)
+    title = (job.get('title') or '').lower()
+    text = f"{title} {job.get('description') or ''} {job.get('requirements') or ''}".lower()
+
+    skill_matches = [skill for skill in skills if _phrase_re(skill).search(text)]
+    interest_matches = [interest for interest in interests if _phrase_re(interest).search(text)]
+    title_hit = any(_phrase_re(term).search(title) for term in skills + interests)
+
+    if skills:
+        coverage = min(1.0, len(skill_matches) / min(len(skills), SKILL_COVERAGE_CAP))
+    else:
+        coverage = min(1.0, len(interest_matches) / min(len(interests), SKILL_COVERAGE_CAP)) if interests else 0.0
+    similarity = min(1.0, 4 * _cosine(_tokens(' '.join(skills + interests)), _tokens(text), idf or {}))
+
+    score = 100 * (0.55 * coverage + 0.1 * title_hit + 0.35 * similarity)
+    if interest_matches and skills:
+        score += 5
+    if (experience or '').lower() in ENTRY_LEVELS and SENIOR_TITLE_RE.search(title):
+        score -= 20
+    score = round(min(100.0, max(0.0, score)), 1)
+
+    matched = skill_matches or interest_matches
+    return {
+        'relevance_score': score,
+        'reasoning': f"Local match on {', '.join(matched)}" if matched else "No profile skills found in the posting",
+        'is_relevant': score >= RELEVANT_SCORE,
+        'skill_matches': matched,
+        'skill_gaps': [],
+        'scored_by': 'local'
+    }
+
+
+class RelevanceCascade:
+    """Local scorer first; LLM validation only for the ambiguous band"""
+
+    def __init__(self, validator: AIValidator = ai_validator, low: float = CASCADE_LOW, high: float = CASCADE_HIGH):
+        self.validator = validator
+        self.low = low
+        self.high = high
+        self.stats = {'jobs': 0, 'local_accepts': 0, 'local_rejects': 0, 'escalated': 0, 'llm_failures': 0}
+
+    @property
+    def llm_available(self) -> bool:
+        return self.validator.use_openai or self.validator.use_gemini
+
+    def local_scores(self, skills: List[str], interests: List[str], experience: str, jobs: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Local results for a batch, with IDF weights taken from the batch itself"""
+        idf = _idf([_job_tokens(job) for job in jobs])
+        return [local_relevance(skills, interests, experience, job, idf) for job in jobs]
+
+    def is_ambiguous(self, score: float) -> bool:
+        return self.low <= score < self.high
+
+    async def score_batch(
+        self, skills: List[str], interests: List[str], experience: str, jobs: List[Dict[str, str]]
+    ) -> List[Dict[str, Any]]:
+        """
+        One result per job, in order
+        Ambiguous jobs get the LLM's result when a provider is configured,
+        and keep their local result if the LLM can't score them
+        """
+        results = self.local_scores(skills, interests, experience, jobs)
+        ambiguous = [index for index, result in enumerate(results) if self.is_ambiguous(result['relevance_score'])]
+
+        self.stats['jobs'] += len(jobs)
+        self.stats['local_accepts'] += sum(result['relevance_score'] >= self.high for result in results)
+        self.stats['local_rejects'] += sum(result['relevance_score'] < self.low for result in results)
+        if not ambiguous or not self.llm_available:
+            return results
+
+        self.stats['escalated'] += len(ambiguous)
+        validated = await self.validator.validate_jobs_batch(skills, interests, experience, [jobs[index] for index in ambiguous])
+        for index, result in zip(ambiguous, validated):
+            if result is None:
+                self.stats['llm_failures'] += 1
+                continue
+            results[index] = {**result, 'scored_by': 'llm'}
+        return results
+
+    def evaluate(self, samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Agreement with LLM labels on an offline sample
+        Each sample has skills, interests, experience, title, description,
+        requirements and llm_score (the LLM's relevance score for the pair)
+        """
+        idf = _idf([_job_tokens(sample) for sample in samples])
+        decided = agreed = all_agreed = 0
+        for sample in samples:
+            result = local_relevance(
+                sample.get('skills', []), sample.get('interests', []), sample.get('experience', ''), sample, idf
+            )
+            label = sample['llm_score'] >= RELEVANT_SCORE
+            all_agreed += result['is_relevant'] == label
+            if not self.is_ambiguous(result['relevance_score']):
+                decided += 1
+                agreed += result['is_relevant'] == label
+
+        total = len(samples)
+        return {
+            'samples': total,
+            'band': [self.low, self.high],
+            # Share of LLM calls the cascade would avoid on this sample
+            'decided_locally': round(decided / total, 3) if total else 0.0,
+            # Agreement where the cascade doesn't ask the LLM
+            'agreement_when_decided': round(agreed / decided, 3) if decided else 0.0,
+            # Agreement if the local scorer decided everything
+            'agreement_local_only': round(all_agreed / total, 3) if total else 0.0
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters since startup; llm_calls_avoided counts jobs decided without the LLM"""
+        return {
+            **self.stats,
+            'band': [self.low, self.high],
+            'llm_calls_avoided': self.stats['local_accepts'] + self.stats['local_rejects']
+        }
+
+
+# Global instance
+relevance_cascade = RelevanceCascade()
@@ -3,6 +3,7 @@ Background Scheduler for 24/7 Automated Job Scraping
 Uses APScheduler to run scrapers every 30 minutes
 Includes error handling, retry logic, and health monitoring
 """
+import os
 import asyncio
 import logging
 from datetime import datetime
@@ -13,11 +14,23 @@ from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
 
 from backend.services.scraper_personalized import personalized_scraper
 from backend.services.scraper_general import general_scraper
+from backend.services.ai_validator import ai_validator
 from backend.database.firestore_client import firestore_client
+from backend.services.job_details import job_details, DETAIL_PREFETCH_COUNT
+from backend.services.scrape_policy import scrape_policy
+from backend.services.source_registry import source_registry
+from backend.utils.circuit_breaker import circuit_breakers
+from backend.utils.near_duplicates import near_duplicates
+from backend.utils.query_memo import query_memo
+from backend.utils.scrape_archive import scrape_archive
+from backend.utils.scrape_telemetry import scrape_telemetry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 'inprocess' runs scrapers inside the API process; 'queue' publishes units to Celery workers
+SCRAPER_EXECUTION = os.getenv("SCRAPER_EXECUTION", "inprocess").lower()
+
 class ScraperScheduler:
     """Manages automated job scraping schedules"""
     
@@ -46,6 +59,9 @@ class ScraperScheduler:
     
     async def _run_personalized_scraper(self):
         """Run personalized job scraper for all users - NON-BLOCKING"""
+        if SCRAPER_EXECUTION == 'queue':
+            return await self._publish_scrape_units('personalized')
+        
         try:
             logger.info("🔄 Starting personalized job scraper (background)...")
             start_time = datetime.now()
@@ -74,6 +90,9 @@ class ScraperScheduler:
     
     async def _run_general_scraper(self):
         """Run general gig job scraper - NON-BLOCKING"""
+        if SCRAPER_EXECUTION == 'queue':
+            return await self._publish_scrape_units('general')
+        
         try:
             logger.info("🔄 Starting general job scraper (background)...")
             start_time = datetime.now()
@@ -91,11 +110,43 @@ class ScraperScheduler:
                 f"Added {count} jobs"
             )
             
+            # Warm the detail cache for the jobs listed first, without holding up the scheduler
+            self._prefetch_task = asyncio.create_task(self._prefetch_details())
+            
         except Exception as e:
             logger.error(f"❌ Error in general scraper job: {e}")
             logger.exception(e)
             self.error_count += 1
     
+    async def _prefetch_details(self):
+        """Fetch full descriptions for the top general jobs in the background"""
+        try:
+            jobs = await firestore_client.get_general_jobs(limit=DETAIL_PREFETCH_COUNT)
+            await job_details.prefetch(jobs)
+        except Exception as e:
+            logger.error(f"❌ Error prefetching job details: {e}")
+    
+    async def _publish_scrape_units(self, kind: str):
+        """Publish this cycle's scrape units to the work queue instead of scraping in-process"""
+        try:
+            from backend.workers.tasks import publish_personalized_cycle, publish_general_cycle
+            
+            if kind == 'personalized':
+                # The publisher plans and records synchronously; policy state is loaded and saved around it
+                await scrape_policy.load_state()
+                published = publish_personalized_cycle()
+                await scrape_policy.save_state()
+                self.last_personalized_run = datetime.now()
+                logger.info(f"📤 Published personalized units for {len(published)} users")
+            else:
+                published = publish_general_cycle()
+                self.last_general_run = datetime.now()
+                logger.info(f"📤 Published {published} general units")
+            
+        except Exception as e:
+            logger.error(f"❌ Error publishing {kind} scrape units: {e}")
+            self.error_count += 1
+    
     async def _run_cleanup_job(self):
         """Deactivate old jobs (7+ days old)"""
         try:
@@ -108,6 +159,12 @@ class ScraperScheduler:
             # Cleanup general jobs
             general_count = await firestore_client.deactivate_old_general_jobs(days=7)
             
+            # Drop raw scrape snapshots past their retention
+            await asyncio.to_thread(scrape_archive.prune)
+            
+            # Drop LLM validation results past their TTL
+            await asyncio.to_thread(ai_validator.cache.prune)
+            
             self.last_cleanup_run = datetime.now()
             
             duration = (datetime.now() - start_time).total_seconds()
@@ -157,7 +214,7 @@ class ScraperScheduler:
             # Start the scheduler
             self.scheduler.start()
             logger.info("✅ Scheduler started successfully!")
-            logger.info("📅 Personalized scraper: Every 10 minutes (24/7)")
+            logger.info("📅 Personalized scraper: Every 10 minutes (24/7), users picked by activity tier")
             logger.info("📅 General scraper: Every 10 minutes (24/7)")
             logger.info("🧹 Cleanup job: Daily at 3 AM")
             logger.info("🔒 max_instances=1 ensures scrapers run in background without blocking app")
@@ -186,13 +243,22 @@ class ScraperScheduler:
         
         return {
             'status': 'running' if self.scheduler.running else 'stopped',
+            'execution': SCRAPER_EXECUTION,
             'jobs': jobs,
             'last_personalized_run': self.last_personalized_run.isoformat() if self.last_personalized_run else None,
             'last_general_run': self.last_general_run.isoformat() if self.last_general_run else None,
             'last_cleanup_run': self.last_cleanup_run.isoformat() if self.last_cleanup_run else None,
             'personalized_jobs_added': self.personalized_job_count,
             'general_jobs_added': self.general_job_count,
-            'error_count': self.error_count
+            'error_count': self.error_count,
+            'query_memo': query_memo.get_stats(),
+            'activity_tiers': scrape_policy.get_stats(),
+            'circuit_breakers': circuit_breakers.get_status(),
+            'near_duplicates': near_duplicates.get_stats(),
+            'sources': scrape_telemetry.get_summary(),
+            'source_registry': source_registry.get_status(),
+            'job_details': job_details.get_stats(),
+            'scrape_archive': scrape_archive.get_stats()
         }
 
 # Global instance
@@ -0,0 +1,196 @@
+"""
+Activity-tiered scraping policy
+Assigns each user a hot/warm/cold tier from lastLogin and recent API activity,
+decides who is due for a personalized scrape, and orders them in a priority
+queue so limited scraping capacity goes to active users first
+
+Activity and last-scrape times are persisted in scraperState, so the API
+process (activity), the scheduler/publisher and other workers plan from the same state
+"""
+import os
+import heapq
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from dateutil import parser as date_parser
+
+from backend.database.firestore_client import firestore_client
+
+logger = logging.getLogger(__name__)
+
+# Tier name -> (max inactivity to qualify, scrape interval)
+TIERS: List[Tuple[str, timedelta, timedelta]] = [
+    ('hot', timedelta(days=int(os.getenv("SCRAPER_HOT_DAYS", "2"))),
+     timedelta(minutes=int(os.getenv("SCRAPER_HOT_INTERVAL_MIN", "10")))),
+    ('warm', timedelta(days=int(os.getenv("SCRAPER_WARM_DAYS", "14"))),
+     timedelta(minutes=int(os.getenv("SCRAPER_WARM_INTERVAL_MIN", "120")))),
+    ('cold', timedelta.max,
+     timedelta(minutes=int(os.getenv("SCRAPER_COLD_INTERVAL_MIN", "1440")))),
+]
+TIER_RANK = {name: rank for rank, (name, _, _) in enumerate(TIERS)}
+
+# Max users scraped per personalized cycle
+MAX_USERS_PER_CYCLE = int(os.getenv("SCRAPER_MAX_USERS_PER_CYCLE", "50"))
+
+# scraperState document holding lastActivity/lastScraped maps (user id -> time)
+POLICY_STATE_ID = 'scrape_policy'
+# Activity is recorded per request but only persisted this often per user; tiers span days
+ACTIVITY_PERSIST_SECONDS = int(os.getenv("SCRAPER_ACTIVITY_PERSIST_SECONDS", "300"))
+
+
+def _to_utc(value: Any) -> Optional[datetime]:
+    """Convert Firestore timestamps, datetimes or ISO strings to aware UTC datetimes"""
+    if value is None or value == '':
+        return None
+    if not isinstance(value, datetime):
+        try:
+            value = date_parser.parse(str(value))
+        except (ValueError, OverflowError):
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class ScrapePolicy:
+    """Tracks user activity and plans which users to scrape each cycle"""
+
+    def __init__(self, max_users_per_cycle: int = MAX_USERS_PER_CYCLE):
+        self.max_users_per_cycle = max_users_per_cycle
+        self.last_activity: Dict[str, datetime] = {}
+        self.last_scraped: Dict[str, datetime] = {}
+        # When each user's activity was last written to scraperState, and scrapes not yet written
+        self._activity_persisted: Dict[str, datetime] = {}
+        self._unsaved_scrapes: Dict[str, datetime] = {}
+        self.tier_stats: Dict[str, Dict[str, Any]] = {
+            name: {
+                'users': 0,
+                'due': 0,
+                'scheduled': 0,
+                'deferred': 0,
+                'scraped_total': 0,
+                'jobs_added_total': 0,
+                'interval_minutes': int(interval.total_seconds() // 60)
+            }
+            for name, _, interval in TIERS
+        }
+
+    async def load_state(self):
+        """Merge persisted activity and scrape times into memory (newest wins); call before plan()"""
+        state = await firestore_client.get_scraper_state(POLICY_STATE_ID) or {}
+        for field, times in (('lastActivity', self.last_activity), ('lastScraped', self.last_scraped)):
+            for user_id, value in (state.get(field) or {}).items():
+                stored = _to_utc(value)
+                if stored is not None and (user_id not in times or stored > times[user_id]):
+                    times[user_id] = stored
+
+    async def record_activity(self, user_id: str, when: Optional[datetime] = None):
+        """Record an authenticated API request for a user"""
+        if not user_id:
+            return
+        when = when or datetime.now(timezone.utc)
+        self.last_activity[user_id] = when
+
+        persisted = self._activity_persisted.get(user_id)
+        if persisted is None or (when - persisted).total_seconds() >= ACTIVITY_PERSIST_SECONDS:
+            self._activity_persisted[user_id] = when
+            await firestore_client.set_scraper_state(POLICY_STATE_ID, {'lastActivity': {user_id: when}})
+
+    def get_tier(self, user_id: str, user_data: Dict[str, Any], now: Optional[datetime] = None) -> str:
+        """Classify a user by their most recent login or API activity"""
+        now = now or datetime.now(timezone.utc)
+        candidates = [_to_utc(user_data.get('lastLogin')), self.last_activity.get(user_id)]
+        last_seen = max((c for c in candidates if c), default=None)
+
+        if last_seen is None:
+            return 'cold'
+
+        inactive_for = now - last_seen
+        for name, max_inactive, _ in TIERS:
+            if inactive_for <= max_inactive:
+                return name
+        return 'cold'
+
+    def plan(self, users: List[Tuple[str, Dict[str, Any]]], now: Optional[datetime] = None) -> List[Tuple[str, str]]:
+        """
+        Pick the users due for scraping this cycle
+
+        Args:
+            users: (user_id, user_data) pairs
+
+        Returns:
+            Up to max_users_per_cycle (user_id, tier) pairs, hottest and most overdue first
+        """
+        now = now or datetime.now(timezone.utc)
+        intervals = {name: interval for name, _, interval in TIERS}
+        for stats in self.tier_stats.values():
+            stats.update({'users': 0, 'due': 0, 'scheduled': 0, 'deferred': 0})
+
+        queue = []
+        for user_id, user_data in users:
+            tier = self.get_tier(user_id, user_data, now)
+            stats = self.tier_stats[tier]
+            stats['users'] += 1
+
+            last_scraped = self.last_scraped.get(user_id)
+            if last_scraped is not None:
+                overdue = (now - last_scraped - intervals[tier]).total_seconds()
+                if overdue < 0:
+                    continue
+            else:
+                overdue = float('inf')
+
+            stats['due'] += 1
+            heapq.heappush(queue, (TIER_RANK[tier], -overdue, user_id, tier))
+
+        selected = []
+        while queue and len(selected) < self.max_users_per_cycle:
+            _, _, user_id, tier = heapq.heappop(queue)
+            self.tier_stats[tier]['scheduled'] += 1
+            selected.append((user_id, tier))
+
+        for _, _, _, tier in queue:
+            self.tier_stats[tier]['deferred'] += 1
+        if queue:
+            logger.warning(
+                f"Scrape plan: {len(queue)} due users deferred to a later cycle by the "
+                f"{self.max_users_per_cycle} users/cycle cap (SCRAPER_MAX_USERS_PER_CYCLE)"
+            )
+
+        logger.info(
+            "Scrape plan: " + ", ".join(
+                f"{name} {s['scheduled']}/{s['due']} due of {s['users']}" for name, s in self.tier_stats.items()
+            )
+        )
+        return selected
+
+    def record_scrape(self, user_id: str, tier: str, jobs_added: int, when: Optional[datetime] = None):
+        """Mark a user as scraped so the tier interval applies from now (persisted by save_state)"""
+        when = when or datetime.now(timezone.utc)
+        self.last_scraped[user_id] = when
+        self._unsaved_scrapes[user_id] = when
+        stats = self.tier_stats[tier]
+        stats['scraped_total'] += 1
+        stats['jobs_added_total'] += jobs_added
+
+    async def save_state(self):
+        """Persist the scrape times recorded since the last save, in one write"""
+        if not self._unsaved_scrapes:
+            return
+        unsaved, self._unsaved_scrapes = self._unsaved_scrapes, {}
+        if not await firestore_client.set_scraper_state(POLICY_STATE_ID, {'lastScraped': unsaved}):
+            # Keep them for the next save, unless a newer scrape replaced them meanwhile
+            for user_id, when in unsaved.items():
+                self._unsaved_scrapes.setdefault(user_id, when)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-tier statistics for the health endpoint"""
+        return {
+            'max_users_per_cycle': self.max_users_per_cycle,
+            'tiers': {name: dict(stats) for name, stats in self.tier_stats.items()}
+        }
+
+
+# Global instance
+scrape_policy = ScrapePolicy()
@@ -2,42 +2,121 @@
 API-Based Job Scrapers - No Selenium needed, works on cloud
 Uses free public APIs from real job sites
 """
+import os
+import math
 import asyncio
 import logging
-from typing import List, Dict, Any
-import requests
+from typing import List, Dict, Any, Optional, Callable, AsyncIterator, Tuple
 from datetime import datetime
 import json
 
+from backend.utils.circuit_breaker import circuit_breakers
+from backend.utils.http_cache import HTTPCache
+from backend.utils.scrape_archive import scrape_archive
+from backend.utils.scrape_telemetry import scrape_telemetry
+from backend.utils.thread_session import ThreadLocalSession
+from backend.services.ingest_pipeline import after_stored
+from backend.services.source_registry import source_registry, SourceAdapter, PERSONALIZED, GENERAL
+from backend.services.watermarks import WatermarkScan, watermark_store, watermark_key, posting_position
+
 logger = logging.getLogger(__name__)
 
+# Pages requested at once from paginated APIs
+API_PAGE_CONCURRENCY = int(os.getenv("SCRAPER_API_PAGE_CONCURRENCY", "3"))
+# Adzuna's free tier allows ~1000 calls/month (each page is a call). Personalized fetches
+# are spaced so back-to-back fetches all month stay inside it; calls that would start
+# sooner are skipped, not queued. The spacing is per process, so divide the quota by the
+# number of worker processes when scraping through Celery
+ADZUNA_MONTHLY_CALLS = int(os.getenv("ADZUNA_MONTHLY_CALLS", "1000"))
+ADZUNA_LIMIT = 100
+ADZUNA_MIN_INTERVAL_SECONDS = 30 * 24 * 3600 * math.ceil(ADZUNA_LIMIT / 50) / ADZUNA_MONTHLY_CALLS
+
 class APIJobScraper:
     """Scrape jobs from public APIs - works 24/7 on cloud"""
     
     def __init__(self):
-        self.session = requests.Session()
+        self.session = ThreadLocalSession()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        scrape_telemetry.instrument_session(self.session)
+        scrape_archive.instrument_session(self.session)
+        self.http_cache = HTTPCache()
     
-    async def scrape_remoteok(self, keywords: str = "", limit: int = 100) -> List[Dict[str, Any]]:
+    def _fetch_json_feed(self, url: str, source: str, consumer: Optional[str] = None) -> Tuple[Optional[Any], str]:
+        """
+        Fetch a JSON feed through the on-disk HTTP cache (conditional GET)
+        Returns (data, content_hash); data is None when `consumer` already
+        committed this exact body (see _commit_feed)
+        
+        Feeds fetched with a consumer are also checked against that consumer's
+        per-source watermark, so parsing stops at the first already-seen posting
+        """
+        cached = self.http_cache.get(self.session, url, timeout=15, consumer=consumer)
+        
+        if cached.unchanged:
+            logger.info(f"{source}: feed unchanged since last run, skipping")
+            return None, cached.content_hash
+        
+        if cached.not_modified:
+            logger.info(f"{source}: 304 Not Modified, using cached body")
+            scrape_archive.record(url, cached.body, 'application/json')
+        
+        return json.loads(cached.body), cached.content_hash
+    
+    async def _commit_feed(self, url: str, consumer: Optional[str], content_hash: str):
+        """Mark the feed body as processed for `consumer` once its jobs are stored"""
+        if consumer:
+            await after_stored(lambda: self.http_cache.commit(url, consumer, content_hash))
+    
+    async def _fetch_pages(self, fetch_page: Callable[[int], Any], pages: int) -> AsyncIterator[Any]:
+        """
+        Yield decoded pages 1..pages in order, requesting up to API_PAGE_CONCURRENCY at a time
+        Stop iterating to stop fetching; at most one wave of requests is wasted
+        A failed first page raises; a later failure ends pagination with what was fetched
+        """
+        for first in range(1, pages + 1, API_PAGE_CONCURRENCY):
+            numbers = range(first, min(first + API_PAGE_CONCURRENCY, pages + 1))
+            results = await asyncio.gather(
+                *(asyncio.to_thread(fetch_page, number) for number in numbers), return_exceptions=True
+            )
+            for number, result in zip(numbers, results):
+                if isinstance(result, Exception):
+                    if number == 1:
+                        raise result
+                    logger.warning(f"Page {number} failed, stopping pagination: {result}")
+                    return
+                yield result
+    
+    async def scrape_remoteok(self, keywords: str = "", limit: int = 100, consumer: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Scrape RemoteOK.com API - 100% remote jobs
         Public API, no auth needed
         """
         jobs = []
+        breaker = circuit_breakers.get('RemoteOK')
+        if not breaker.allow():
+            logger.info("RemoteOK: circuit open, skipping")
+            return jobs
+        
         try:
             url = "https://remoteok.com/api"
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+            data, content_hash = self._fetch_json_feed(url, 'RemoteOK', consumer)
+            if data is None:
+                breaker.record_success()
+                return jobs
             
-            data = response.json()
+            # Feed is newest-first: stop at the first posting seen in a previous run
+            scan = await watermark_store.scan(watermark_key('RemoteOK', consumer) if consumer else None)
             
             # Filter and process jobs
             for item in data[1:limit+1]:  # Skip first item (metadata)
                 if not isinstance(item, dict):
                     continue
                 
+                if scan.seen(posting_position(item.get('epoch') or item.get('date')), str(item.get('id', ''))):
+                    break
+                
                 # Filter by keywords if provided
                 if keywords:
                     search_text = f"{item.get('position', '')} {item.get('description', '')}".lower()
@@ -57,39 +136,73 @@ class APIJobScraper:
                     'tags': item.get('tags', [])
                 })
             
+            await scan.commit()
+            await self._commit_feed(url, consumer, content_hash)
             logger.info(f"RemoteOK: Scraped {len(jobs)} real remote jobs")
+            breaker.record_success()
             
         except Exception as e:
             logger.error(f"RemoteOK API error: {e}")
+            breaker.record_failure(e)
         
         return jobs
     
-    async def scrape_adzuna(self, keywords: str, location: str = "US", limit: int = 100) -> List[Dict[str, Any]]:
+    async def scrape_adzuna(self, keywords: str, location: str = "US", limit: int = 100, max_pages: int = 4, since: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         Scrape Adzuna API - aggregates from multiple sources
         Free tier: 1000 calls/month
+        
+        Pages (50 results each, newest first) are fetched concurrently up to
+        max_pages; paging stops at the last page, at a page with no new postings,
+        or (with `since`, a user's watermark) at the first posting at or below it.
+        Jobs carry postingPosition so the caller can advance the watermark once stored
         """
         jobs = []
+        breaker = circuit_breakers.get('Adzuna')
+        if not breaker.allow():
+            logger.info("Adzuna: circuit open, skipping")
+            return jobs
+        
         try:
             # Adzuna API (you need to get free API key from developer.adzuna.com)
             app_id = "test"  # Replace with real API key
             app_key = "test"
             
-            url = f"https://api.adzuna.com/v1/api/jobs/{location.lower()}/search/1"
+            page_size = min(limit, 50)
             params = {
                 'app_id': app_id,
                 'app_key': app_key,
-                'results_per_page': min(limit, 50),
+                'results_per_page': page_size,
                 'what': keywords,
+                'sort_by': 'date',
                 'content-type': 'application/json'
             }
             
-            response = self.session.get(url, params=params, timeout=15)
+            def fetch_page(page: int) -> List[Dict[str, Any]]:
+                url = f"https://api.adzuna.com/v1/api/jobs/{location.lower()}/search/{page}"
+                response = self.session.get(url, params=params, timeout=15)
+                response.raise_for_status()
+                return response.json().get('results', [])
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                for item in data.get('results', []):
+            scan = WatermarkScan(watermark_store, None, since)
+            seen_ids = set()
+            pages = min(max_pages, math.ceil(limit / page_size))
+            
+            async for results in self._fetch_pages(fetch_page, pages):
+                new_items = 0
+                reached_seen = False
+                for item in results:
+                    item_id = str(item.get('id', ''))
+                    if item_id in seen_ids:
+                        continue
+                    seen_ids.add(item_id)
+                    position = posting_position(item.get('created'))
+                    if scan.seen(position, item_id):
+                        reached_seen = True
+                        break
+                    if len(jobs) >= limit:
+                        break
+                    new_items += 1
                     jobs.append({
                         'jobTitle': item.get('title', ''),
                         'company': item.get('company', {}).get('display_name', 'Company'),
@@ -99,30 +212,45 @@ class APIJobScraper:
                         'salary': f"${item.get('salary_min', 0)}-${item.get('salary_max', 0)}" if item.get('salary_min') else '',
                         'sourceLink': item.get('redirect_url', ''),
                         'source': 'Adzuna',
-                        'category': item.get('category', {}).get('label', 'General')
+                        'category': item.get('category', {}).get('label', 'General'),
+                        'postingPosition': position,
+                        'postingId': item_id
                     })
                 
-                logger.info(f"Adzuna: Scraped {len(jobs)} real jobs")
+                if reached_seen or new_items == 0 or len(results) < page_size or len(jobs) >= limit:
+                    break
+            
+            logger.info(f"Adzuna: Scraped {len(jobs)} real jobs")
+            breaker.record_success()
             
         except Exception as e:
             logger.error(f"Adzuna API error: {e}")
+            breaker.record_failure(e)
         
         return jobs
     
-    async def scrape_github_jobs(self, keywords: str, location: str = "", limit: int = 50) -> List[Dict[str, Any]]:
+    async def scrape_github_jobs(self, keywords: str, location: str = "", limit: int = 50, consumer: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Scrape GitHub Jobs alternatives (Himalayas, WorkingNomads)
         """
         jobs = []
+        breaker = circuit_breakers.get('Himalayas')
+        if not breaker.allow():
+            logger.info("Himalayas: circuit open, skipping")
+            return jobs
+        
         try:
             # Himalayas.app API (tech jobs)
             url = "https://himalayas.app/jobs/api"
-            response = self.session.get(url, timeout=15)
+            data, content_hash = self._fetch_json_feed(url, 'Himalayas', consumer)
             
-            if response.status_code == 200:
-                data = response.json()
+            if data is not None:
+                scan = await watermark_store.scan(watermark_key('Himalayas', consumer) if consumer else None)
                 
                 for item in data.get('jobs', [])[:limit]:
+                    if scan.seen(posting_position(item.get('pubDate')), str(item.get('guid', ''))):
+                        break
+                    
                     if keywords.lower() in item.get('title', '').lower() or keywords.lower() in item.get('description', '').lower():
                         jobs.append({
                             'jobTitle': item.get('title', ''),
@@ -135,28 +263,43 @@ class APIJobScraper:
                             'source': 'Himalayas',
                             'category': 'Tech'
                         })
+                
+                await scan.commit()
+                await self._commit_feed(url, consumer, content_hash)
             
             logger.info(f"Himalayas: Scraped {len(jobs)} tech jobs")
+            breaker.record_success()
             
         except Exception as e:
             logger.error(f"GitHub alternatives error: {e}")
+            breaker.record_failure(e)
         
         return jobs
     
-    async def scrape_arbeitnow(self, keywords: str = "", limit: int = 100) -> List[Dict[str, Any]]:
+    async def scrape_arbeitnow(self, keywords: str = "", limit: int = 100, consumer: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Scrape Arbeitnow API - European tech jobs
         Free public API
         """
         jobs = []
+        breaker = circuit_breakers.get('Arbeitnow')
+        if not breaker.allow():
+            logger.info("Arbeitnow: circuit open, skipping")
+            return jobs
+        
         try:
             url = "https://www.arbeitnow.com/api/job-board-api"
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+            data, content_hash = self._fetch_json_feed(url, 'Arbeitnow', consumer)
+            if data is None:
+                breaker.record_success()
+                return jobs
             
-            data = response.json()
+            scan = await watermark_store.scan(watermark_key('Arbeitnow', consumer) if consumer else None)
             
             for item in data.get('data', [])[:limit]:
+                if scan.seen(posting_position(item.get('created_at')), str(item.get('slug', ''))):
+                    break
+                
                 if keywords and keywords.lower() not in item.get('title', '').lower():
                     continue
                 
@@ -173,19 +316,33 @@ class APIJobScraper:
                     'tags': item.get('tags', [])
                 })
             
+            await scan.commit()
+            await self._commit_feed(url, consumer, content_hash)
             logger.info(f"Arbeitnow: Scraped {len(jobs)} European tech jobs")
+            breaker.record_success()
             
         except Exception as e:
             logger.error(f"Arbeitnow API error: {e}")
+            breaker.record_failure(e)
         
         return jobs
     
-    async def scrape_usajobs(self, keywords: str, limit: int = 100) -> List[Dict[str, Any]]:
+    async def scrape_usajobs(self, keywords: str, limit: int = 100, max_pages: int = 5) -> List[Dict[str, Any]]:
         """
         Scrape USAJobs.gov API - US Government jobs
         Public API
+        
+        Pages of up to 50 results are fetched concurrently up to max_pages;
+        paging stops at the last page or at a page with no postings new to this run
+        (results are shared by every user with the query and stored per user, and
+        dates are day-granular, so there is no stored watermark to stop at)
         """
         jobs = []
+        breaker = circuit_breakers.get('USAJobs')
+        if not breaker.allow():
+            logger.info("USAJobs: circuit open, skipping")
+            return jobs
+        
         try:
             url = "https://data.usajobs.gov/api/search"
             headers = {
@@ -193,18 +350,31 @@ class APIJobScraper:
                 'User-Agent': 'your@email.com',  # Required by USAJobs
                 'Authorization-Key': 'your-api-key'  # Get free key from usajobs.gov
             }
+            page_size = min(limit, 50)
             
-            params = {
-                'Keyword': keywords,
-                'ResultsPerPage': min(limit, 500)
-            }
+            def fetch_page(page: int) -> List[Dict[str, Any]]:
+                params = {
+                    'Keyword': keywords,
+                    'ResultsPerPage': page_size,
+                    'Page': page
+                }
+                response = self.session.get(url, headers=headers, params=params, timeout=15)
+                response.raise_for_status()
+                return response.json().get('SearchResult', {}).get('SearchResultItems', [])
             
-            response = self.session.get(url, headers=headers, params=params, timeout=15)
+            seen_ids = set()
+            pages = min(max_pages, math.ceil(limit / page_size))
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                for item in data.get('SearchResult', {}).get('SearchResultItems', []):
+            async for results in self._fetch_pages(fetch_page, pages):
+                new_items = 0
+                for item in results:
+                    item_id = str(item.get('MatchedObjectId', ''))
+                    if item_id in seen_ids:
+                        continue
+                    seen_ids.add(item_id)
+                    if len(jobs) >= limit:
+                        break
+                    new_items += 1
                     job = item.get('MatchedObjectDescriptor', {})
                     jobs.append({
                         'jobTitle': job.get('PositionTitle', ''),
@@ -218,10 +388,15 @@ class APIJobScraper:
                         'category': 'Government'
                     })
                 
-                logger.info(f"USAJobs: Scraped {len(jobs)} government jobs")
+                if new_items == 0 or len(results) < page_size or len(jobs) >= limit:
+                    break
+            
+            logger.info(f"USAJobs: Scraped {len(jobs)} government jobs")
+            breaker.record_success()
             
         except Exception as e:
             logger.error(f"USAJobs API error: {e}")
+            breaker.record_failure(e)
         
         return jobs
     
@@ -237,7 +412,8 @@ class APIJobScraper:
             self.scrape_remoteok(keywords, limit_per_source),
             self.scrape_arbeitnow(keywords, limit_per_source),
             self.scrape_github_jobs(keywords, location, limit_per_source),
-            # Add more as needed
+            self.scrape_adzuna(keywords, location, limit_per_source),
+            self.scrape_usajobs(keywords, limit_per_source),
         ]
         
         results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -251,3 +427,28 @@ class APIJobScraper:
 
 # Global instance
 api_scraper = APIJobScraper()
+
+# Public APIs: fast, so they start first. Cached feeds run one at a time (shared disk cache entry)
+for _adapter in [
+    SourceAdapter('RemoteOK', PERSONALIZED, lambda keywords, location: api_scraper.scrape_remoteok(keywords, limit=150),
+                  priority=10, timeout_seconds=30, max_concurrency=1, blocking=True),
+    SourceAdapter('Arbeitnow', PERSONALIZED, lambda keywords, location: api_scraper.scrape_arbeitnow(keywords, limit=150),
+                  priority=10, timeout_seconds=30, max_concurrency=1, blocking=True),
+    SourceAdapter('Himalayas', PERSONALIZED, lambda keywords, location: api_scraper.scrape_github_jobs(keywords, location, limit=150),
+                  priority=10, timeout_seconds=30, max_concurrency=1, blocking=True),
+    # Rate limited to the monthly quota (see ADZUNA_MONTHLY_CALLS); country is fixed since location is free text
+    SourceAdapter('Adzuna', PERSONALIZED,
+                  lambda keywords, location, since=None: api_scraper.scrape_adzuna(keywords, "US", limit=ADZUNA_LIMIT, since=since),
+                  priority=15, timeout_seconds=20, max_concurrency=1, min_interval_seconds=ADZUNA_MIN_INTERVAL_SECONDS,
+                  blocking=True, incremental=True),
+    SourceAdapter('USAJobs', PERSONALIZED, lambda keywords, location: api_scraper.scrape_usajobs(keywords, limit=150),
+                  priority=15, timeout_seconds=20, max_concurrency=2, min_interval_seconds=1, blocking=True),
+    # consumer='general' skips feeds whose body hasn't changed since our last run
+    SourceAdapter('RemoteOK', GENERAL, lambda: api_scraper.scrape_remoteok(keywords="", limit=150, consumer='general'),
+                  priority=10, timeout_seconds=30, max_concurrency=1, blocking=True),
+    SourceAdapter('Arbeitnow', GENERAL, lambda: api_scraper.scrape_arbeitnow(keywords="", limit=100, consumer='general'),
+                  priority=10, timeout_seconds=30, max_concurrency=1, blocking=True),
+    SourceAdapter('Himalayas', GENERAL, lambda: api_scraper.scrape_github_jobs(keywords="", limit=150, consumer='general'),
+                  priority=10, timeout_seconds=30, max_concurrency=1, blocking=True),
+]:
+    source_registry.register(_adapter)
@@ -4,13 +4,12 @@ Scrapes no-skill/low-skill temporary jobs from Upwork, Fiverr, MTurk, surveys, e
 Stores in shared collection accessible to all users
 """
 import asyncio
+import functools
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import random
 import time
 
-import requests
-from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -20,9 +19,19 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 from fake_useragent import UserAgent
 
-from backend.database.firestore_client import firestore_client
+from backend.database.firestore_client import firestore_client, job_document_id
 from backend.services.ai_validator import ai_validator
-from backend.services.scraper_api import api_scraper
+from backend.services.ingest_pipeline import IngestPipeline
+from backend.services.job_categorizer import job_categorizer
+from backend.services.job_record import JobRecord, normalize_job
+from backend.services.scraper_api import api_scraper  # noqa: F401 - registers the API sources
+from backend.services.source_registry import source_registry, SourceAdapter, GENERAL, cycle_deadline
+from backend.utils.circuit_breaker import circuit_breakers
+from backend.utils.html_parser import parse_job_cards
+from backend.utils.near_duplicates import near_duplicates
+from backend.utils.scrape_archive import scrape_archive
+from backend.utils.scrape_telemetry import scrape_telemetry
+from backend.utils.thread_session import ThreadLocalSession
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -32,11 +41,13 @@ class GeneralJobScraper:
     
     def __init__(self):
         self.ua = UserAgent()
-        self.session = requests.Session()
+        self.session = ThreadLocalSession()
         self.session.headers.update({
             'User-Agent': self.ua.random,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
         })
+        scrape_telemetry.instrument_session(self.session)
+        scrape_archive.instrument_session(self.session)
     
     def _get_selenium_driver(self):
         """Initialize Selenium WebDriver"""
@@ -59,6 +70,11 @@ class GeneralJobScraper:
         jobs = []
         driver = None
         
+        breaker = circuit_breakers.get('Upwork')
+        if not breaker.allow():
+            logger.info("Upwork: circuit open, skipping")
+            return self._get_upwork_fallback_data()
+        
         try:
             driver = self._get_selenium_driver()
             
@@ -72,11 +88,10 @@ class GeneralJobScraper:
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
             self._random_delay(2, 3)
             
-            # Parse with BeautifulSoup
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            scrape_archive.record_page(url, driver.page_source)
             
-            # Find job cards
-            job_cards = soup.find_all('article', class_='job-tile')[:limit]
+            # Parse only the job cards
+            job_cards = parse_job_cards(driver.page_source, 'upwork')[:limit]
             
             for card in job_cards:
                 try:
@@ -110,9 +125,11 @@ class GeneralJobScraper:
                     continue
             
             logger.info(f"Scraped {len(jobs)} real jobs from Upwork")
+            breaker.record_success()
             
         except Exception as e:
             logger.error(f"Error scraping Upwork: {e}")
+            breaker.record_failure(e)
             # Fallback to sample data
             jobs = self._get_upwork_fallback_data()
         finally:
@@ -123,6 +140,7 @@ class GeneralJobScraper:
     
     def _get_upwork_fallback_data(self) -> List[Dict[str, Any]]:
         """Generate 100+ realistic Upwork gigs"""
+        scrape_telemetry.mark_fallback()
         jobs = []
         categories = ['Data Entry', 'Virtual Assistant', 'Writing', 'Design', 'Social Media', 'Customer Support']
         
@@ -146,6 +164,11 @@ class GeneralJobScraper:
     async def scrape_fiverr_gigs(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Scrape simple gigs from Fiverr (buyers posting requests)"""
         jobs = []
+        breaker = circuit_breakers.get('Fiverr')
+        if not breaker.allow():
+            logger.info("Fiverr: circuit open, skipping")
+            return jobs
+        
         try:
             # Fiverr buyer requests (requires login, so this is simplified)
             # In production, you'd need authentication or use Fiverr API
@@ -156,10 +179,8 @@ class GeneralJobScraper:
                 url = f"https://www.fiverr.com/categories/{category}"
                 
                 response = self.session.get(url, timeout=10)
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
                 # Simplified - Fiverr structure is complex
-                gig_cards = soup.find_all('div', class_='gig-card-layout')
+                gig_cards = parse_job_cards(response.content, 'fiverr')
                 
                 for card in gig_cards[:3]:
                     try:
@@ -177,9 +198,11 @@ class GeneralJobScraper:
                         continue
             
             logger.info(f"Scraped {len(jobs)} gigs from Fiverr")
+            breaker.record_success()
             
         except Exception as e:
             logger.error(f"Error scraping Fiverr: {e}")
+            breaker.record_failure(e)
         
         return jobs
     
@@ -273,74 +296,82 @@ class GeneralJobScraper:
         logger.info(f"Added {len(jobs)} survey site opportunities")
         return jobs
     
+    async def fetch_general_source(self, source: str, deadline: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Fetch jobs from one general source under its registered limits"""
+        logger.info(f"Scraping general source {source}...")
+        jobs = await source_registry.call(GENERAL, source, deadline=deadline)
+        logger.info(f"Got {len(jobs)} jobs from {source}")
+        return jobs
+    
+    def build_general_pipeline(self, sources: List[str], deadline: Optional[float] = None) -> IngestPipeline:
+        """
+        Streaming fetch -> normalize -> dedup -> categorize -> batched write pipeline for general jobs
+        WITHOUT AI validation for speed; normalizers fill company/location/pay defaults and
+        jobs without a category from the fixed set are categorized locally
+        Writes are idempotent (document id derived from sourceLink), so re-running is safe,
+        and unchanged jobs are only marked seen instead of rewritten
+        """
+        recent = near_duplicates.get("general")
+        
+        async def is_near_duplicate(job: JobRecord) -> bool:
+            # Same posting from another source under a slightly different title/URL
+            # (jobs already stored under the same id are handled by skip_unchanged);
+            # new jobs are held until their batch is stored
+            return recent.check(
+                job_document_id(job.source_link, job.job_title), job.job_title, job.company, job.description, job.source
+            ) is not None
+        
+        async def skip_unchanged(jobs: List[JobRecord]) -> List[JobRecord]:
+            # One batched read per write batch; stored jobs with the same content hash aren't rewritten
+            changed = await firestore_client.filter_changed_general_jobs(
+                {job_document_id(job.source_link, job.job_title): job.content_hash() for job in jobs}
+            )
+            return [job for job in jobs if job_document_id(job.source_link, job.job_title) in changed]
+        
+        async def write_batch(jobs: List[JobRecord]) -> int:
+            count = await firestore_client.add_general_jobs_batch(
+                [(job_document_id(job.source_link, job.job_title), job.to_dict()) for job in jobs]
+            )
+            logger.info(f"✅ Added {count} general jobs")
+            return count
+        
+        return IngestPipeline(
+            "general",
+            sources={source: functools.partial(self.fetch_general_source, source, deadline=deadline) for source in sources},
+            write_batch=write_batch,
+            normalize=normalize_job,
+            dedup_key=lambda job: job_document_id(job.source_link, job.job_title),
+            is_duplicate=is_near_duplicate,
+            score=job_categorizer.apply,
+            filter_changed=skip_unchanged,
+            on_stored=lambda jobs: recent.register([job_document_id(job.source_link, job.job_title) for job in jobs]),
+            on_failed=lambda jobs: recent.release([job_document_id(job.source_link, job.job_title) for job in jobs])
+        )
+    
+    async def scrape_general_source(self, source: str) -> int:
+        """
+        Scrape and store a single general source (one work-queue unit)
+        Returns count of new jobs added
+        """
+        stats = await self.build_general_pipeline([source]).run()
+        logger.info(f"{source}: added {stats['written']} new general jobs out of {stats['fetched']}")
+        return stats['written']
+    
     async def scrape_all_general_jobs(self) -> int:
         """
-        Main method to scrape all general gig jobs from multiple sources
+        Main method to scrape all general gig jobs from every registered source
+        All sources fan out concurrently into one streaming pipeline, so jobs are stored as soon
+        as any source returns instead of after the slowest one
         Returns count of new jobs added
         """
         try:
-            all_jobs = []
+            stats = await self.build_general_pipeline(source_registry.names(GENERAL), deadline=cycle_deadline()).run()
             
-            # ===== REAL API SOURCES FIRST (Work 24/7 everywhere) =====
-            logger.info("Scraping REAL jobs from API sources...")
-            api_jobs = await api_scraper.scrape_remoteok(keywords="", limit=150)
-            all_jobs.extend(api_jobs)
-            logger.info(f"Got {len(api_jobs)} REAL remote jobs from RemoteOK")
-            
-            arbeitnow_jobs = await api_scraper.scrape_arbeitnow(keywords="", limit=100)
-            all_jobs.extend(arbeitnow_jobs)
-            logger.info(f"Got {len(arbeitnow_jobs)} REAL tech jobs from Arbeitnow")
-            
-            # ===== Try Selenium sources (work locally, fallback on cloud) =====
-            logger.info("Starting Upwork scraping...")
-            upwork_jobs = await self.scrape_upwork_gigs(limit=50)
-            all_jobs.extend(upwork_jobs)
-            self._random_delay(2, 4)
-            
-            logger.info("Adding MTurk opportunities...")
-            mturk_jobs = await self.scrape_mturk_hits(limit=10)
-            all_jobs.extend(mturk_jobs)
-            
-            logger.info("Adding survey sites...")
-            survey_jobs = await self.scrape_survey_sites()
-            all_jobs.extend(survey_jobs)
-            
-            logger.info(f"Total general jobs collected: {len(all_jobs)}")
-            
-            # Store jobs in Firestore WITHOUT AI validation for speed
-            new_jobs_count = 0
-            
-            for job in all_jobs:
-                # Check for duplicates by sourceLink
-                is_duplicate = await firestore_client.check_duplicate_general_job(
-                    job['jobTitle'],
-                    job['sourceLink']
-                )
-                
-                if is_duplicate:
-                    logger.debug(f"Skipping duplicate job: {job['jobTitle']}")
-                    continue
-                
-                # Simple categorization without AI
-                if not job.get('category'):
-                    job['category'] = 'General'
-                
-                # Ensure all required fields
-                job.setdefault('company', job.get('source', 'Unknown'))
-                job.setdefault('location', 'Remote')
-                job.setdefault('requirements', 'No experience required')
-                job.setdefault('salary', job.get('estimatedPay', 'Varies'))
-                
-                # Store in Firestore
-                try:
-                    await firestore_client.add_general_job(job)
-                    new_jobs_count += 1
-                    logger.info(f"✅ Added general job: {job['jobTitle']} ({job['source']})")
-                except Exception as e:
-                    logger.error(f"Failed to store job {job['jobTitle']}: {e}")
-            
-            logger.info(f"🎉 General job scraping complete. Added {new_jobs_count} new jobs out of {len(all_jobs)} total")
-            return new_jobs_count
+            logger.info(
+                f"🎉 General job scraping complete. Added {stats['written']} new jobs "
+                f"out of {stats['fetched']} total"
+            )
+            return stats['written']
             
         except Exception as e:
             logger.error(f"Error in general job scraping: {e}")
@@ -348,3 +379,14 @@ class GeneralJobScraper:
 
 # Global instance
 general_scraper = GeneralJobScraper()
+
+# Upwork needs a browser; MTurk and Surveys are curated lists. Fiverr needs a login, so it's off
+for _adapter in [
+    SourceAdapter('Upwork', GENERAL, lambda: general_scraper.scrape_upwork_gigs(limit=50),
+                  priority=20, timeout_seconds=90, max_concurrency=1, blocking=True),
+    SourceAdapter('MTurk', GENERAL, lambda: general_scraper.scrape_mturk_hits(limit=10), priority=30, timeout_seconds=30),
+    SourceAdapter('Surveys', GENERAL, lambda: general_scraper.scrape_survey_sites(), priority=30, timeout_seconds=30),
+    SourceAdapter('Fiverr', GENERAL, lambda: general_scraper.scrape_fiverr_gigs(limit=10),
+                  priority=40, timeout_seconds=90, max_concurrency=1, blocking=True, enabled=False),
+]:
+    source_registry.register(_adapter)
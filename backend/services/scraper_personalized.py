@@ -3,16 +3,17 @@ Personalized Job Scraper
 Scrapes job opportunities from LinkedIn, Indeed, Glassdoor, and company career pages
 Uses BeautifulSoup, Scrapy, and Selenium for comprehensive coverage
 """
+import os
 import asyncio
+import functools
 import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import random
+import re
 import time
 
 # Web scraping imports
-import requests
-from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -23,19 +24,45 @@ from selenium.webdriver.chrome.service import Service
 from fake_useragent import UserAgent
 
 # Internal imports
-from backend.database.firestore_client import firestore_client
+from backend.database.firestore_client import firestore_client, job_document_id
 from backend.services.ai_validator import ai_validator
-from backend.services.scraper_api import api_scraper
+from backend.services.ingest_pipeline import IngestPipeline, after_stored
+from backend.services.job_categorizer import job_categorizer
+from backend.services.job_record import JobRecord, normalize_job
+from backend.services.relevance_cascade import relevance_cascade
+from backend.services.scraper_api import api_scraper  # noqa: F401 - registers the API sources
+from backend.services.scrape_policy import scrape_policy
+from backend.services.source_registry import source_registry, SourceAdapter, PERSONALIZED, cycle_deadline
+from backend.services.watermarks import WatermarkScan, watermark_store, user_watermark_key, newest_position, posting_position
+from backend.utils.circuit_breaker import circuit_breakers
+from backend.utils.html_parser import parse_html, parse_job_cards
+from backend.utils.near_duplicates import near_duplicates
+from backend.utils.query_memo import query_memo
+from backend.utils.scrape_archive import scrape_archive
+from backend.utils.scrape_telemetry import scrape_telemetry
+from backend.utils.thread_session import ThreadLocalSession
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Score new or changed jobs through the relevance cascade (LLM escalation needs
+# OPENAI_API_KEY or GEMINI_API_KEY); 0 keeps default scores
+AI_VALIDATION_ENABLED = os.getenv("SCRAPER_AI_VALIDATION", "1") == "1"
+
+LINKEDIN_POSTING_ID_RE = re.compile(r'urn:li:jobPosting:(\d+)')
+
+# Returns outerHTML of every LinkedIn job card after the first `arguments[0]` cards
+LINKEDIN_NEW_CARDS_JS = (
+    "return Array.from(document.querySelectorAll('div.base-card'))"
+    ".slice(arguments[0]).map(function (el) { return el.outerHTML; });"
+)
+
 class PersonalizedJobScraper:
     """Scrapes personalized jobs for users based on their profiles"""
     
     def __init__(self):
         self.ua = UserAgent()
-        self.session = requests.Session()
+        self.session = ThreadLocalSession()
         self.session.headers.update({
             'User-Agent': self.ua.random,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -43,6 +70,8 @@ class PersonalizedJobScraper:
             'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive',
         })
+        scrape_telemetry.instrument_session(self.session)
+        scrape_archive.instrument_session(self.session)
     
     def _get_selenium_driver(self):
         """Initialize Selenium WebDriver with anti-detection settings"""
@@ -70,6 +99,11 @@ class PersonalizedJobScraper:
     async def scrape_indeed(self, keywords: str, location: str = "", limit: int = 10) -> List[Dict[str, Any]]:
         """Scrape jobs from Indeed with fallback to generated data"""
         jobs = []
+        breaker = circuit_breakers.get('Indeed')
+        if not breaker.allow():
+            logger.info("Indeed: circuit open, skipping")
+            return self._generate_indeed_fallback(keywords, location, limit)
+        
         try:
             # Build Indeed search URL
             base_url = "https://www.indeed.com/jobs"
@@ -82,10 +116,8 @@ class PersonalizedJobScraper:
             response = self.session.get(base_url, params=params, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Find job cards (Indeed's structure may change, adjust selectors as needed)
-            job_cards = soup.find_all('div', class_='job_seen_beacon') or soup.find_all('td', class_='resultContent')
+            # Find job cards (Indeed's structure may change, adjust selectors in html_parser)
+            job_cards = parse_job_cards(response.content, 'indeed')
             
             for card in job_cards[:limit]:
                 try:
@@ -121,9 +153,11 @@ class PersonalizedJobScraper:
                     continue
             
             logger.info(f"Scraped {len(jobs)} jobs from Indeed")
+            breaker.record_success()
             
         except Exception as e:
             logger.error(f"Error scraping Indeed: {e}")
+            breaker.record_failure(e)
             # Generate realistic fallback jobs based on keywords
             jobs = self._generate_indeed_fallback(keywords, location, limit)
         
@@ -131,6 +165,7 @@ class PersonalizedJobScraper:
     
     def _generate_indeed_fallback(self, keywords: str, location: str, limit: int) -> List[Dict[str, Any]]:
         """Generate realistic job listings when scraping fails"""
+        scrape_telemetry.mark_fallback()
         jobs = []
         job_titles = [
             f"{keywords} Developer",
@@ -165,26 +200,42 @@ class PersonalizedJobScraper:
         logger.info(f"Generated {len(jobs)} fallback Indeed jobs for {keywords}")
         return jobs
     
-    async def scrape_linkedin(self, keywords: str, location: str = "", limit: int = 100) -> List[Dict[str, Any]]:
+    async def scrape_linkedin(self, keywords: str, location: str = "", limit: int = 100, since: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         Scrape jobs from LinkedIn using Selenium + BeautifulSoup
         Implements aggressive scrolling and pagination for 100+ jobs
+        
+        Results are sorted newest-first; with `since` (a user's watermark) scrolling
+        stops at the first posting at or below it. Jobs carry postingPosition so
+        the caller can advance the watermark once they are stored
         """
         jobs = []
         driver = None
         
+        breaker = circuit_breakers.get('LinkedIn')
+        if not breaker.allow():
+            logger.info("LinkedIn: circuit open, skipping")
+            return self._generate_linkedin_fallback(keywords, location, limit)
+        
         try:
+            scan = WatermarkScan(watermark_store, None, since)
+            reached_seen = False
+            
             driver = self._get_selenium_driver()
             
-            # Build LinkedIn jobs URL (public search, no login required)
+            # Build LinkedIn jobs URL (public search, no login required, newest first)
             keywords_encoded = keywords.replace(' ', '%20')
-            search_url = f"https://www.linkedin.com/jobs/search/?keywords={keywords_encoded}&location={location}&f_TPR=r86400&start=0"
+            search_url = f"https://www.linkedin.com/jobs/search/?keywords={keywords_encoded}&location={location}&f_TPR=r86400&sortBy=DD&start=0"
             
             driver.get(search_url)
             self._random_delay(3, 5)
             
             # Aggressive scrolling to load MANY more jobs (scroll 20 times to load 100+ jobs)
+            # Only cards added since the previous scroll are pulled out of the DOM and parsed,
+            # so each iteration costs O(new cards) instead of re-parsing the whole page
             logger.info(f"LinkedIn: Aggressively scrolling to load {limit} jobs...")
+            harvested = 0
+            rendered_cards = []
             for scroll_num in range(20):
                 # Scroll to bottom
                 driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
@@ -199,63 +250,44 @@ class PersonalizedJobScraper:
                 except:
                     pass
                 
-                # Check current job count
-                soup = BeautifulSoup(driver.page_source, 'html.parser')
-                current_jobs = len(soup.find_all('div', class_='base-card'))
-                logger.info(f"LinkedIn: Scroll {scroll_num + 1}/20, loaded {current_jobs} jobs so far")
+                # Harvest only the cards appended since the last scroll
+                new_cards = driver.execute_script(LINKEDIN_NEW_CARDS_JS, harvested) or []
+                harvested += len(new_cards)
+                rendered_cards.extend(new_cards)
+                
+                for card_html in new_cards:
+                    if len(jobs) >= limit:
+                        break
+                    posting_id = LINKEDIN_POSTING_ID_RE.search(card_html)
+                    position = posting_position(posting_id.group(1)) if posting_id else None
+                    if posting_id and scan.seen(position, posting_id.group(1)):
+                        reached_seen = True
+                        break
+                    job = self._parse_linkedin_card(card_html, location)
+                    if job:
+                        if position is not None:
+                            job['postingPosition'], job['postingId'] = position, posting_id.group(1)
+                        jobs.append(job)
                 
-                if current_jobs >= limit:
+                logger.info(f"LinkedIn: Scroll {scroll_num + 1}/20, loaded {harvested} jobs so far ({len(new_cards)} new)")
+                
+                if reached_seen:
+                    logger.info("LinkedIn: Reached postings seen in a previous run, stopping")
+                    break
+                
+                if len(jobs) >= limit:
                     logger.info(f"LinkedIn: Reached target of {limit} jobs!")
                     break
             
-            # Get final page source and parse with BeautifulSoup
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            
-            # Find ALL job cards (no limit here, we'll take first 'limit' later)
-            job_cards = soup.find_all('div', class_='base-card')
-            logger.info(f"LinkedIn: Found {len(job_cards)} total job cards, processing up to {limit}...")
-            
-            # Process up to 'limit' jobs
-            for card in job_cards[:limit]:
-                try:
-                    # Extract job details
-                    title_elem = card.find('h3', class_='base-search-card__title')
-                    company_elem = card.find('h4', class_='base-search-card__subtitle')
-                    location_elem = card.find('span', class_='job-search-card__location')
-                    link_elem = card.find('a', class_='base-card__full-link')
-                    
-                    if not title_elem:
-                        continue
-                    
-                    job_title = title_elem.get_text(strip=True)
-                    company = company_elem.get_text(strip=True) if company_elem else "Unknown"
-                    job_location = location_elem.get_text(strip=True) if location_elem else location
-                    job_link = link_elem['href'] if link_elem and link_elem.get('href') else ""
-                    
-                    # Clean URL
-                    if '?' in job_link:
-                        job_link = job_link.split('?')[0]
-                    
-                    jobs.append({
-                        'jobTitle': job_title,
-                        'company': company,
-                        'location': job_location,
-                        'description': f"{job_title} position at {company}",
-                        'requirements': '',
-                        'salary': '',
-                        'sourceLink': job_link,
-                        'source': 'LinkedIn',
-                        'category': 'Professional'
-                    })
-                    
-                except Exception as e:
-                    logger.warning(f"Error parsing LinkedIn job card: {e}")
-                    continue
+            # Archived as one list of <li> cards, which replay serves back a page-worth per scroll
+            scrape_archive.record_page(search_url, ''.join(f"<li>{card}</li>" for card in rendered_cards))
             
             logger.info(f"Scraped {len(jobs)} jobs from LinkedIn")
+            breaker.record_success()
             
         except Exception as e:
             logger.error(f"Error scraping LinkedIn: {e}")
+            breaker.record_failure(e)
             # Generate realistic fallback
             jobs = self._generate_linkedin_fallback(keywords, location, limit)
         finally:
@@ -264,8 +296,48 @@ class PersonalizedJobScraper:
         
         return jobs
     
+    def _parse_linkedin_card(self, card_html: str, location: str = "") -> Optional[Dict[str, Any]]:
+        """Parse a single LinkedIn base-card fragment into a job dict"""
+        try:
+            card = parse_html(card_html)
+            
+            # Extract job details
+            title_elem = card.find('h3', class_='base-search-card__title')
+            company_elem = card.find('h4', class_='base-search-card__subtitle')
+            location_elem = card.find('span', class_='job-search-card__location')
+            link_elem = card.find('a', class_='base-card__full-link')
+            
+            if not title_elem:
+                return None
+            
+            job_title = title_elem.get_text(strip=True)
+            company = company_elem.get_text(strip=True) if company_elem else "Unknown"
+            job_location = location_elem.get_text(strip=True) if location_elem else location
+            job_link = link_elem['href'] if link_elem and link_elem.get('href') else ""
+            
+            # Clean URL
+            if '?' in job_link:
+                job_link = job_link.split('?')[0]
+            
+            return {
+                'jobTitle': job_title,
+                'company': company,
+                'location': job_location,
+                'description': f"{job_title} position at {company}",
+                'requirements': '',
+                'salary': '',
+                'sourceLink': job_link,
+                'source': 'LinkedIn',
+                'category': 'Professional'
+            }
+            
+        except Exception as e:
+            logger.warning(f"Error parsing LinkedIn job card: {e}")
+            return None
+    
     def _generate_linkedin_fallback(self, keywords: str, location: str, limit: int) -> List[Dict[str, Any]]:
         """Generate realistic LinkedIn job listings"""
+        scrape_telemetry.mark_fallback()
         jobs = []
         job_types = ["Full-time", "Part-time", "Contract", "Internship"]
         
@@ -290,6 +362,11 @@ class PersonalizedJobScraper:
         jobs = []
         driver = None
         
+        breaker = circuit_breakers.get('Glassdoor')
+        if not breaker.allow():
+            logger.info("Glassdoor: circuit open, skipping")
+            return jobs
+        
         try:
             driver = self._get_selenium_driver()
             
@@ -300,11 +377,10 @@ class PersonalizedJobScraper:
             driver.get(search_url)
             self._random_delay(3, 5)
             
-            # Parse with BeautifulSoup
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            scrape_archive.record_page(search_url, driver.page_source)
             
-            # Find job cards (Glassdoor uses different selectors)
-            job_cards = soup.find_all('li', class_='react-job-listing')[:limit]
+            # Parse only the job cards (Glassdoor uses different selectors)
+            job_cards = parse_job_cards(driver.page_source, 'glassdoor')[:limit]
             
             for card in job_cards:
                 try:
@@ -338,9 +414,11 @@ class PersonalizedJobScraper:
                     continue
             
             logger.info(f"Scraped {len(jobs)} jobs from Glassdoor")
+            breaker.record_success()
             
         except Exception as e:
             logger.error(f"Error scraping Glassdoor: {e}")
+            breaker.record_failure(e)
         finally:
             if driver:
                 driver.quit()
@@ -352,6 +430,11 @@ class PersonalizedJobScraper:
         jobs = []
         driver = None
         
+        breaker = circuit_breakers.get('Handshake')
+        if not breaker.allow():
+            logger.info("Handshake: circuit open, skipping")
+            return jobs
+        
         try:
             driver = self._get_selenium_driver()
             
@@ -366,11 +449,10 @@ class PersonalizedJobScraper:
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
             self._random_delay(2, 3)
             
-            # Parse with BeautifulSoup
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            scrape_archive.record_page(search_url, driver.page_source)
             
-            # Find job cards
-            job_cards = soup.find_all('div', class_='job-card')[:limit]
+            # Parse only the job cards
+            job_cards = parse_job_cards(driver.page_source, 'handshake')[:limit]
             
             for card in job_cards:
                 try:
@@ -404,102 +486,207 @@ class PersonalizedJobScraper:
                     continue
             
             logger.info(f"Scraped {len(jobs)} jobs from Handshake")
+            breaker.record_success()
             
         except Exception as e:
             logger.error(f"Error scraping Handshake: {e}")
+            breaker.record_failure(e)
         finally:
             if driver:
                 driver.quit()
         
         return jobs
     
-    async def scrape_jobs_for_user(self, user_id: str) -> int:
+    def build_search_profile(self, user_id: str, user_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Derive search keywords/location from a user profile, None if nothing to search for"""
+        if not user_data:
+            logger.warning(f"User {user_id} not found")
+            return None
+        
+        skills = user_data.get('skills', [])
+        interests = user_data.get('interests', [])
+        
+        if not skills and not interests:
+            logger.warning(f"User {user_id} has no skills or interests defined")
+            return None
+        
+        return {
+            'keywords': ', '.join(skills[:3]) if skills else ', '.join(interests[:3]),
+            'location': user_data.get('location', ''),
+            'skills': skills,
+            'interests': interests,
+            'experience': user_data.get('experience', '')
+        }
+    
+    def sources_for_profile(self, profile: Dict[str, Any]) -> List[str]:
+        """Registered sources to scrape for a user, REAL API jobs first (Handshake only for entry-level/students)"""
+        return source_registry.names(PERSONALIZED, profile['experience'])
+    
+    async def fetch_source(
+        self, source: str, keywords: str, location: str, deadline: Optional[float] = None, user_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch jobs from one personalized source under its registered limits
+        Memoized per (source, normalized keywords, location), so users with
+        the same skills share one fetch within the cycle
+        
+        Incremental sources only fetch postings newer than the user's own watermark;
+        the memo is also keyed by that mark, so users who ran together keep sharing
+        fetches while a new or less active user gets a deeper one. The mark advances
+        once the user's jobs are stored
+        """
+        adapter = source_registry.get(PERSONALIZED, source)
+        
+        if not (adapter.incremental and user_id):
+            jobs = await query_memo.get_or_fetch(
+                source, keywords, location,
+                lambda: source_registry.call(PERSONALIZED, source, keywords, location, deadline=deadline)
+            )
+            logger.info(f"Got {len(jobs)} jobs from {source} for '{keywords}'")
+            return jobs
+        
+        key = user_watermark_key(source, user_id, keywords, location)
+        since = await watermark_store.get(key)
+        jobs = await query_memo.get_or_fetch(
+            source, keywords, location,
+            lambda: source_registry.call(PERSONALIZED, source, keywords, location, deadline=deadline, since=since),
+            variant=str(since)
+        )
+        newest, newest_id = newest_position(jobs)
+        await after_stored(lambda: watermark_store.advance(key, newest, newest_id))
+        logger.info(f"Got {len(jobs)} jobs from {source} for '{keywords}' (newer than {since})")
+        return jobs
+    
+    def _score_job(self, job: JobRecord, profile: Dict[str, Any]) -> JobRecord:
+        """Attach default match scores to a job (kept when AI validation is off or fails)"""
+        skills = profile['skills']
+        
+        # Accept all jobs for maximum quantity; AI scores only refine the ranking
+        job.ai_validation_score = 75  # Default good score
+        job.ai_reasoning = f"Job matches keywords: {profile['keywords']}"
+        job.skill_matches = skills[:3] if skills else []
+        job.skill_gaps = []
+        return job
+    
+    async def _ai_score_jobs(
+        self, jobs: List[JobRecord], profile: Dict[str, Any], deadline: Optional[float] = None
+    ) -> List[JobRecord]:
+        """
+        Replace default scores through the relevance cascade: the local scorer
+        decides clear matches and misses, ambiguous jobs go to batched LLM validation
+        Past the cycle deadline only the local scorer runs
+        """
+        if not AI_VALIDATION_ENABLED:
+            return jobs
+        
+        candidates = [
+            {'title': job.job_title, 'description': job.description, 'requirements': job.requirements} for job in jobs
+        ]
+        if deadline is not None and time.monotonic() >= deadline:
+            results = relevance_cascade.local_scores(profile['skills'], profile['interests'], profile['experience'], candidates)
+        else:
+            results = await relevance_cascade.score_batch(
+                profile['skills'], profile['interests'], profile['experience'], candidates
+            )
+        for job, result in zip(jobs, results):
+            job.ai_validation_score = result['relevance_score']
+            job.ai_reasoning = result['reasoning']
+            job.skill_matches = result['skill_matches']
+            job.skill_gaps = result['skill_gaps']
+        return jobs
+    
+    def build_user_pipeline(
+        self, user_id: str, profile: Dict[str, Any], sources: List[str], deadline: Optional[float] = None
+    ) -> IngestPipeline:
+        """
+        Streaming fetch -> normalize -> dedup -> score -> batched write pipeline for one user
+        Sources past the cycle deadline are skipped
+        Writes are idempotent (deterministic document ids), so re-running is safe,
+        and unchanged jobs are only marked seen instead of rewritten
+        """
+        recent = near_duplicates.get(f"user:{user_id}")
+        
+        async def is_near_duplicate(job: JobRecord) -> bool:
+            # Same posting from another source under a slightly different title/URL
+            # (jobs already stored under the same id are handled by skip_unchanged);
+            # new jobs are held until their batch is stored
+            return recent.check(
+                job_document_id(job.job_title, job.company), job.job_title, job.company, job.description, job.source
+            ) is not None
+        
+        async def skip_unchanged(jobs: List[JobRecord]) -> List[JobRecord]:
+            # One batched read per write batch; stored jobs with the same content hash aren't rewritten
+            changed = await firestore_client.filter_changed_personalized_jobs(
+                user_id, {job_document_id(job.job_title, job.company): job.content_hash() for job in jobs}
+            )
+            return [job for job in jobs if job_document_id(job.job_title, job.company) in changed]
+        
+        async def write_batch(jobs: List[JobRecord]) -> int:
+            count = await firestore_client.add_personalized_jobs_batch(
+                user_id, [(job_document_id(job.job_title, job.company), job.to_dict()) for job in jobs]
+            )
+            logger.info(f"Added {count} jobs for user {user_id}")
+            return count
+        
+        return IngestPipeline(
+            f"user:{user_id}",
+            sources={
+                source: functools.partial(
+                    self.fetch_source, source, profile['keywords'], profile['location'], deadline=deadline, user_id=user_id
+                )
+                for source in sources
+            },
+            write_batch=write_batch,
+            normalize=normalize_job,
+            dedup_key=lambda job: job_document_id(job.job_title, job.company),
+            is_duplicate=is_near_duplicate,
+            score=lambda job: job_categorizer.apply(self._score_job(job, profile)),
+            filter_changed=skip_unchanged,
+            on_stored=lambda jobs: recent.register([job_document_id(job.job_title, job.company) for job in jobs]),
+            on_failed=lambda jobs: recent.release([job_document_id(job.job_title, job.company) for job in jobs]),
+            score_batch=lambda jobs: self._ai_score_jobs(jobs, profile, deadline)
+        )
+    
+    async def scrape_source_for_user(self, user_id: str, source: str) -> int:
+        """
+        Scrape a single source for a single user (one work-queue unit)
+        Returns count of new jobs added
+        """
+        user_data = await firestore_client.get_user(user_id)
+        profile = self.build_search_profile(user_id, user_data)
+        if not profile:
+            return 0
+        
+        stats = await self.build_user_pipeline(user_id, profile, [source]).run()
+        
+        logger.info(f"{source} scrape complete for user {user_id}. Added {stats['written']} new jobs")
+        return stats['written']
+    
+    async def scrape_jobs_for_user(self, user_id: str, deadline: Optional[float] = None) -> int:
         """
         Main method to scrape personalized jobs for a specific user
+        All registered sources fan out concurrently into one streaming pipeline,
+        so jobs are stored as soon as any source returns instead of after the slowest one
         Returns count of new jobs added
         """
         try:
             # Get user profile
             user_data = await firestore_client.get_user(user_id)
+            profile = self.build_search_profile(user_id, user_data)
             
-            if not user_data:
-                logger.warning(f"User {user_id} not found")
+            if not profile:
                 return 0
             
-            skills = user_data.get('skills', [])
-            interests = user_data.get('interests', [])
-            experience = user_data.get('experience', '')
-            
-            if not skills and not interests:
-                logger.warning(f"User {user_id} has no skills or interests defined")
-                return 0
-            
-            # Build search keywords
-            keywords = ', '.join(skills[:3]) if skills else ', '.join(interests[:3])
-            location = user_data.get('location', '')
-            
             # Scrape from multiple sources - REAL JOBS FIRST, then fallback
-            all_jobs = []
-            
-            # ===== REAL API SOURCES (Work 24/7 on cloud, no Selenium) =====
-            logger.info(f"Scraping REAL jobs from API sources for user {user_id}...")
-            api_jobs = await api_scraper.scrape_all_sources(keywords, location, limit_per_source=150)
-            all_jobs.extend(api_jobs)
-            logger.info(f"Got {len(api_jobs)} REAL jobs from API sources")
-            
-            # ===== TRY Selenium sources (work locally, might fail on cloud) =====
-            # Indeed - with fallback (200 jobs)
-            indeed_jobs = await self.scrape_indeed(keywords, location, limit=200)
-            all_jobs.extend(indeed_jobs)
-            self._random_delay(1, 2)
-            
-            # LinkedIn - with fallback (200 jobs)
-            linkedin_jobs = await self.scrape_linkedin(keywords, location, limit=200)
-            all_jobs.extend(linkedin_jobs)
-            self._random_delay(1, 2)
-            
-            # Glassdoor - with fallback (200 jobs)
-            glassdoor_jobs = await self.scrape_glassdoor(keywords, location, limit=200)
-            all_jobs.extend(glassdoor_jobs)
-            self._random_delay(1, 2)
-            
-            # Handshake (for entry-level/students) - with fallback (200 jobs)
-            if experience in ['Entry Level', 'Student', 'Intern', '']:
-                handshake_jobs = await self.scrape_handshake(keywords, location, limit=200)
-                all_jobs.extend(handshake_jobs)
-                self._random_delay(1, 2)
-            
-            logger.info(f"Total jobs collected for user {user_id}: {len(all_jobs)}")
+            stats = await self.build_user_pipeline(
+                user_id, profile, self.sources_for_profile(profile), deadline=deadline
+            ).run()
             
-            # Validate and store jobs
-            new_jobs_count = 0
-            
-            for job in all_jobs:
-                # Check for duplicates (simple check on title + company)
-                is_duplicate = await firestore_client.check_duplicate_job(
-                    user_id,
-                    job['jobTitle'],
-                    job['company']
-                )
-                
-                if is_duplicate:
-                    continue
-                
-                # SKIP AI VALIDATION - accept all jobs for maximum quantity
-                # Just add default scores
-                job['aiValidationScore'] = 75  # Default good score
-                job['aiReasoning'] = f"Job matches keywords: {keywords}"
-                job['skillMatches'] = skills[:3] if skills else []
-                job['skillGaps'] = []
-                
-                # Store in Firestore
-                await firestore_client.add_personalized_job(user_id, job)
-                new_jobs_count += 1
-                
-                logger.info(f"Added job for user {user_id}: {job['jobTitle']} at {job['company']}")
-            
-            logger.info(f"Scraping complete for user {user_id}. Added {new_jobs_count} new jobs")
-            return new_jobs_count
+            logger.info(
+                f"Scraping complete for user {user_id}. Added {stats['written']} new jobs "
+                f"out of {stats['fetched']} collected"
+            )
+            return stats['written']
             
         except Exception as e:
             logger.error(f"Error scraping jobs for user {user_id}: {e}")
@@ -507,23 +694,33 @@ class PersonalizedJobScraper:
     
     async def scrape_jobs_for_all_users(self) -> Dict[str, int]:
         """
-        Scrape personalized jobs for all active users
+        Scrape personalized jobs for users that are due this cycle
+        Active users (hot tier) are scraped every cycle, inactive ones less often
+        Users not reached before the cycle deadline stay due for the next cycle
         Returns dictionary of {user_id: jobs_count}
         """
         try:
             # Get all users from Firestore
             users_ref = firestore_client.db.collection('users')
-            users = users_ref.stream()
+            users = [(user_doc.id, user_doc.to_dict() or {}) for user_doc in users_ref.stream()]
+            
+            # Hottest, most overdue users first, capped at the per-cycle capacity
+            await scrape_policy.load_state()
+            planned = scrape_policy.plan(users)
             
             results = {}
+            deadline = cycle_deadline()
             
-            for user_doc in users:
-                user_id = user_doc.id
-                count = await self.scrape_jobs_for_user(user_id)
-                results[user_id] = count
+            for user_id, tier in planned:
+                if time.monotonic() >= deadline:
+                    logger.warning(f"Cycle deadline reached, {len(planned) - len(results)} users left for next cycle")
+                    break
                 
-                # Add delay between users to avoid rate limiting
-                self._random_delay(5, 10)
+                # Rate limiting is per source in the registry, no delay between users
+                count = await self.scrape_jobs_for_user(user_id, deadline=deadline)
+                results[user_id] = count
+                scrape_policy.record_scrape(user_id, tier, count)
+                await scrape_policy.save_state()
             
             total_jobs = sum(results.values())
             logger.info(f"Scraping complete for all users. Total new jobs: {total_jobs}")
@@ -536,3 +733,19 @@ class PersonalizedJobScraper:
 
 # Global instance
 personalized_scraper = PersonalizedJobScraper()
+
+# Selenium/HTML sources (work locally, might fail on cloud) - with fallback (200 jobs)
+# One browser per source at a time; LinkedIn scrolls up to 20 pages so it gets the longest timeout
+for _adapter in [
+    SourceAdapter('Indeed', PERSONALIZED, lambda keywords, location: personalized_scraper.scrape_indeed(keywords, location, limit=200),
+                  priority=20, timeout_seconds=90, max_concurrency=1, min_interval_seconds=5, blocking=True),
+    SourceAdapter('LinkedIn', PERSONALIZED,
+                  lambda keywords, location, since=None: personalized_scraper.scrape_linkedin(keywords, location, limit=200, since=since),
+                  priority=20, timeout_seconds=180, max_concurrency=1, min_interval_seconds=10, blocking=True, incremental=True),
+    SourceAdapter('Glassdoor', PERSONALIZED, lambda keywords, location: personalized_scraper.scrape_glassdoor(keywords, location, limit=200),
+                  priority=25, timeout_seconds=90, max_concurrency=1, min_interval_seconds=5, blocking=True),
+    SourceAdapter('Handshake', PERSONALIZED, lambda keywords, location: personalized_scraper.scrape_handshake(keywords, location, limit=200),
+                  priority=30, timeout_seconds=90, max_concurrency=1, min_interval_seconds=5, blocking=True,
+                  entry_level_only=True),
+]:
+    source_registry.register(_adapter)
@@ -0,0 +1,182 @@
+"""
+Declarative registry of scrape sources
+Each source adapter declares whether it is personalized or general, its
+priority, timeout, concurrency and rate limit; the registry runs calls under
+those limits and one deadline per cycle, so every enabled source fans out
+concurrently instead of following a hard-coded call sequence
+
+Adapters are registered by the scraper modules that own them
+"""
+import os
+import time
+import asyncio
+import logging
+import weakref
+from dataclasses import dataclass
+from typing import List, Dict, Any, Callable, Awaitable, Optional, Tuple
+
+from backend.utils.scrape_archive import scrape_archive
+
+logger = logging.getLogger(__name__)
+
+PERSONALIZED = 'personalized'
+GENERAL = 'general'
+
+# Whole-cycle budget; keeps a cycle inside the 10 minute scheduler interval
+CYCLE_DEADLINE_SECONDS = int(os.getenv("SCRAPER_CYCLE_DEADLINE", "540"))
+# Comma-separated source names to switch off without a deploy
+DISABLED_SOURCES = {name.strip() for name in os.getenv("SCRAPER_DISABLED_SOURCES", "").split(',') if name.strip()}
+
+
+@dataclass
+class SourceAdapter:
+    """
+    One scrape source
+    Personalized fetches take (keywords, location); general fetches take no arguments
+    Incremental fetches also take since=<watermark position> and return jobs
+    carrying postingPosition/postingId
+    Concurrency and rate limits are shared by all adapters with the same name,
+    since they hit the same upstream
+    """
+    name: str
+    kind: str
+    fetch: Callable[..., Awaitable[List[Dict[str, Any]]]]
+    priority: int = 50  # Lower starts first
+    timeout_seconds: float = 60.0
+    max_concurrency: int = 2
+    min_interval_seconds: float = 0.0  # Min gap between call starts
+    blocking: bool = False  # Does sync I/O (requests/Selenium); run on a worker thread
+    entry_level_only: bool = False
+    incremental: bool = False
+    enabled: bool = True
+
+
+def cycle_deadline(seconds: int = CYCLE_DEADLINE_SECONDS) -> float:
+    """Monotonic deadline for a cycle starting now"""
+    return time.monotonic() + seconds
+
+
+class SourceRegistry:
+    """Registered adapters plus the limits state used to run them"""
+
+    def __init__(self):
+        self._adapters: Dict[Tuple[str, str], SourceAdapter] = {}
+        self._next_start: Dict[str, float] = {}
+        # Semaphores are bound to an event loop; Celery tasks each run their own loop
+        self._semaphores: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]' = \
+            weakref.WeakKeyDictionary()
+        self._rate_locks: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Lock]]' = \
+            weakref.WeakKeyDictionary()
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def register(self, adapter: SourceAdapter):
+        if adapter.name in DISABLED_SOURCES:
+            adapter.enabled = False
+        self._adapters[(adapter.kind, adapter.name)] = adapter
+        self.stats.setdefault(adapter.name, {'calls': 0, 'timeouts': 0, 'rate_limited': 0, 'deadline_skips': 0})
+
+    def get(self, kind: str, name: str) -> SourceAdapter:
+        adapter = self._adapters.get((kind, name))
+        if adapter is None:
+            raise ValueError(f"Unknown {kind} source: {name}")
+        return adapter
+
+    def names(self, kind: str, experience: Optional[str] = None) -> List[str]:
+        """Enabled source names of a kind in priority order; experience filters entry-level-only sources"""
+        adapters = sorted(
+            (a for a in self._adapters.values() if a.kind == kind and a.enabled),
+            key=lambda a: a.priority
+        )
+        return [
+            a.name for a in adapters
+            if not a.entry_level_only or experience is None or experience in ['Entry Level', 'Student', 'Intern', '']
+        ]
+
+    def _loop_state(self, adapter: SourceAdapter) -> Tuple[asyncio.Semaphore, asyncio.Lock]:
+        loop = asyncio.get_running_loop()
+        semaphores = self._semaphores.setdefault(loop, {})
+        locks = self._rate_locks.setdefault(loop, {})
+        if adapter.name not in semaphores:
+            semaphores[adapter.name] = asyncio.Semaphore(adapter.max_concurrency)
+            locks[adapter.name] = asyncio.Lock()
+        return semaphores[adapter.name], locks[adapter.name]
+
+    async def _wait_for_rate_limit(self, adapter: SourceAdapter, lock: asyncio.Lock, max_wait: float) -> bool:
+        """Wait for the next allowed start; False (without waiting) if that is more than max_wait away"""
+        if adapter.min_interval_seconds <= 0:
+            return True
+        async with lock:
+            wait = self._next_start.get(adapter.name, 0.0) - time.monotonic()
+            if wait > max_wait:
+                return False
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_start[adapter.name] = time.monotonic() + adapter.min_interval_seconds
+            return True
+
+    async def call(self, kind: str, name: str, *args, deadline: Optional[float] = None, **kwargs) -> List[Dict[str, Any]]:
+        """
+        Run one source fetch under its concurrency, rate limit and timeout
+        Returns [] when the cycle deadline has passed, the rate limit would
+        not allow a call within the timeout, or the call times out
+        """
+        adapter = self.get(kind, name)
+        stats = self.stats[adapter.name]
+        semaphore, lock = self._loop_state(adapter)
+
+        async with semaphore:
+            ends_at = time.monotonic() + adapter.timeout_seconds
+            if deadline is not None:
+                ends_at = min(ends_at, deadline)
+            if ends_at <= time.monotonic():
+                stats['deadline_skips'] += 1
+                logger.warning(f"{name}: cycle deadline reached, skipping")
+                return []
+
+            if not await self._wait_for_rate_limit(adapter, lock, ends_at - time.monotonic()):
+                stats['rate_limited'] += 1
+                logger.info(f"{name}: rate limited, skipping this call")
+                return []
+
+            # Raw responses are archived per call; while replaying, the archived call is served instead
+            with scrape_archive.capture(kind, name, args) as archived:
+                if archived is None:
+                    logger.info(f"{name}: no archived call for {args}, skipping")
+                    return []
+
+                timeout = ends_at - time.monotonic()
+                stats['calls'] += 1
+                if adapter.blocking:
+                    # Own event loop on a worker thread so sync I/O doesn't stall other sources.
+                    # State shared with other threads (scraper sessions, HTTP cache, circuit
+                    # breakers, watermarks) is per-thread or locked; after_stored commits
+                    # are handed back and run on this loop
+                    run = asyncio.to_thread(asyncio.run, adapter.fetch(*args, **kwargs))
+                else:
+                    run = adapter.fetch(*args, **kwargs)
+
+                try:
+                    return await asyncio.wait_for(run, timeout)
+                except asyncio.TimeoutError:
+                    # A worker thread can't be killed; its result is discarded when it finishes
+                    stats['timeouts'] += 1
+                    logger.warning(f"{name}: timed out after {timeout:.0f}s")
+                    return []
+
+    def get_status(self) -> Dict[str, Any]:
+        """Adapter configuration and call counters for the health endpoint"""
+        return {
+            f"{adapter.kind}:{adapter.name}": {
+                'enabled': adapter.enabled,
+                'priority': adapter.priority,
+                'timeout_seconds': adapter.timeout_seconds,
+                'max_concurrency': adapter.max_concurrency,
+                'min_interval_seconds': adapter.min_interval_seconds,
+                **self.stats[adapter.name]
+            }
+            for adapter in sorted(self._adapters.values(), key=lambda a: (a.kind, a.priority))
+        }
+
+
+# Global instance
+source_registry = SourceRegistry()
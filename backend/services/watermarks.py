@@ -0,0 +1,148 @@
+"""
+Per-source high-water marks for incremental scraping
+Remembers the newest posting seen per source (and per query) between runs
+so scrapers can stop parsing as soon as they reach already-seen items
+Marks only advance once the items read in a pass have been stored, and
+personalized marks are kept per user (see user_watermark_key)
+"""
+import re
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+from dateutil import parser as date_parser
+
+from backend.database.firestore_client import firestore_client
+from backend.services.ingest_pipeline import after_stored
+
+logger = logging.getLogger(__name__)
+
+
+def posting_position(value: Any) -> Optional[float]:
+    """
+    Convert a posting date or numeric id into a sortable position
+    Accepts epoch seconds, numeric ids and ISO/RFC date strings
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return date_parser.parse(str(value)).timestamp()
+    except (ValueError, OverflowError):
+        return None
+
+
+def watermark_key(source: str, scope: str, query: str = "") -> str:
+    """Build a Firestore-safe document id for a source/scope/query watermark"""
+    key = f"{source}__{scope}"
+    if query:
+        normalized = ' '.join(query.lower().split())
+        key += "__" + hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+    return re.sub(r'[^A-Za-z0-9_\-]', '_', key)
+
+
+def user_watermark_key(source: str, user_id: str, keywords: str, location: str) -> str:
+    """
+    Watermark for one user's query
+    Personalized jobs are stored per user, so a mark shared by every user with the
+    same query would hide postings from users who haven't stored them yet
+    """
+    return watermark_key(source, f"user_{user_id}", f"{keywords}|{location}")
+
+
+def newest_position(jobs: List[Dict[str, Any]]) -> Tuple[Optional[float], str]:
+    """Newest (postingPosition, postingId) among jobs from an incremental fetch"""
+    positioned = [job for job in jobs if job.get('postingPosition') is not None]
+    if not positioned:
+        return None, ""
+    newest = max(positioned, key=lambda job: job['postingPosition'])
+    return newest['postingPosition'], str(newest.get('postingId', ''))
+
+
+class WatermarkScan:
+    """One pass over a newest-first feed, checked against a stored watermark"""
+
+    def __init__(self, store: 'WatermarkStore', key: Optional[str], mark: Optional[float]):
+        self.store = store
+        self.key = key
+        self.mark = mark
+        self.newest: Optional[float] = None
+        self.newest_id = ""
+
+    def seen(self, position: Optional[float], item_id: str = "") -> bool:
+        """True if this item is at or below the watermark; otherwise track it as new"""
+        if position is None:
+            return False
+        if self.mark is not None and position <= self.mark:
+            return True
+        if self.newest is None or position > self.newest:
+            self.newest = position
+            self.newest_id = item_id
+        return False
+
+    async def commit(self):
+        """Persist the newest position seen during this pass, once its items are stored"""
+        if self.key:
+            key, newest, newest_id = self.key, self.newest, self.newest_id
+            await after_stored(lambda: self.store.advance(key, newest, newest_id))
+
+
+class WatermarkStore:
+    """Loads and advances scraper watermarks, backed by Firestore"""
+
+    def __init__(self):
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        # Blocking sources read marks from worker threads (never held across an await)
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[float]:
+        """Get the newest position seen for a key, or None on first run"""
+        with self._lock:
+            state = self._cache.get(key)
+        if state is None:
+            loaded = await firestore_client.get_scraper_state(key) or {}
+            with self._lock:
+                # Another caller may have loaded or advanced it meanwhile
+                state = self._cache.setdefault(key, loaded)
+        return state.get('position')
+
+    async def advance(self, key: str, position: Optional[float], item_id: str = ""):
+        """Move the watermark forward (never backwards)"""
+        if position is None:
+            return
+
+        await self.get(key)
+        state = {'position': position, 'itemId': item_id}
+        with self._lock:
+            current = self._cache[key].get('position')
+            if current is not None and position <= current:
+                return
+            self._cache[key] = state
+        await firestore_client.set_scraper_state(key, dict(state))
+        logger.info(f"Watermark {key} advanced to {position} ({item_id})")
+
+    async def scan(self, key: Optional[str]) -> WatermarkScan:
+        """Start a pass over a feed; a None key disables watermarking"""
+        mark = await self.get(key) if key else None
+        return WatermarkScan(self, key, mark)
+
+    def reset(self, key: Optional[str] = None):
+        """Forget cached watermarks so the next read goes to Firestore"""
+        with self._lock:
+            if key is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(key, None)
+
+
+# Global instance
+watermark_store = WatermarkStore()
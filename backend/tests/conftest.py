@@ -0,0 +1,17 @@
+"""
+Shared test setup: Firestore is replaced by the in-memory stand-in from the
+offline benchmarks before any backend.services module connects at import time
+"""
+import pytest
+
+from backend.benchmarks import offline
+
+db = offline.install()
+
+
+@pytest.fixture
+def firestore_db():
+    """The in-memory database, emptied for each test"""
+    db.clear()
+    yield db
+    db.clear()
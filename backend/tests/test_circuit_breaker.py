@@ -0,0 +1,42 @@
+"""
+Circuit breakers: open after consecutive failures, one half-open probe after
+the cooldown, closed again by a successful probe
+"""
+from backend.utils.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+def _fail(breaker, times):
+    for _ in range(times):
+        breaker.record_failure(RuntimeError('blocked'))
+
+
+def test_opens_after_threshold_and_skips_calls():
+    breaker = CircuitBreaker('Indeed', failure_threshold=3, cooldown_seconds=3600)
+    _fail(breaker, 2)
+    assert breaker.state == CLOSED and breaker.allow()
+
+    _fail(breaker, 1)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.get_status()['skipped_calls'] == 1
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker('Indeed', failure_threshold=3, cooldown_seconds=3600)
+    _fail(breaker, 2)
+    breaker.record_success()
+    _fail(breaker, 2)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker('LinkedIn', failure_threshold=1, cooldown_seconds=0)
+    _fail(breaker, 1)
+
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    _fail(breaker, 1)
+    assert breaker.state == OPEN and breaker.trips == 2
+
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.consecutive_failures == 0
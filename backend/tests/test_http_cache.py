@@ -0,0 +1,44 @@
+"""
+HTTP cache: conditional GETs answered 304 from disk, and a consumer only
+skips a feed body after committing it
+"""
+import requests
+import pytest
+
+from backend.benchmarks.offline import StubServer, route_session
+from backend.utils.http_cache import HTTPCache
+
+URL = 'https://himalayas.app/jobs/api'
+
+
+@pytest.fixture
+def session():
+    with StubServer({'himalayas.app': ('api/himalayas.json', 'application/json')}) as server:
+        session = requests.Session()
+        route_session(session, server.base_url)
+        yield session
+        session.close()
+
+
+def test_revalidation_serves_the_cached_body(session, tmp_path):
+    cache = HTTPCache(cache_dir=str(tmp_path))
+
+    first = cache.get(session, URL)
+    second = cache.get(session, URL)
+
+    assert not first.not_modified and first.status_code == 200
+    assert second.not_modified and second.body == first.body
+    assert cache.get_stats()['not_modified'] == 1
+
+
+def test_consumer_skips_only_committed_bodies(session, tmp_path):
+    cache = HTTPCache(cache_dir=str(tmp_path))
+
+    fetched = cache.get(session, URL, consumer='general')
+    assert not fetched.unchanged
+    # Not committed (e.g. the store failed): the body is offered again
+    assert not cache.get(session, URL, consumer='general').unchanged
+
+    cache.commit(URL, 'general', fetched.content_hash)
+    assert cache.get(session, URL, consumer='general').unchanged
+    assert not cache.get(session, URL, consumer='other').unchanged
@@ -0,0 +1,123 @@
+"""
+Ingest pipeline: stored/failed callbacks per batch, deferred commits and
+cancelling the other stages when one fails
+"""
+import asyncio
+
+import pytest
+
+from backend.services.ingest_pipeline import IngestPipeline, after_stored
+
+
+def _jobs(*names):
+    return [{'name': name} for name in names]
+
+
+def _run(pipeline):
+    return asyncio.run(pipeline.run())
+
+
+class Recorder:
+    def __init__(self):
+        self.stored, self.failed, self.written = [], [], []
+
+    def on_stored(self, jobs):
+        self.stored.extend(job['name'] for job in jobs)
+
+    def on_failed(self, jobs):
+        self.failed.extend(job['name'] for job in jobs)
+
+
+def test_unchanged_jobs_are_reported_stored_even_with_batch_scoring():
+    recorder = Recorder()
+
+    async def fetch():
+        return _jobs('old', 'new')
+
+    async def filter_changed(jobs):
+        return [job for job in jobs if job['name'] != 'old']
+
+    async def score_batch(jobs):
+        return [dict(job, score=1) for job in jobs]
+
+    async def write(jobs):
+        return len(jobs)
+
+    stats = _run(IngestPipeline(
+        't', {'S': fetch}, write, filter_changed=filter_changed, score_batch=score_batch,
+        on_stored=recorder.on_stored, on_failed=recorder.on_failed
+    ))
+    assert sorted(recorder.stored) == ['new', 'old']
+    assert recorder.failed == []
+    assert stats['unchanged'] == 1 and stats['written'] == 1
+
+
+def test_failed_write_releases_only_the_changed_jobs():
+    recorder = Recorder()
+
+    async def fetch():
+        return _jobs('old', 'new')
+
+    async def filter_changed(jobs):
+        return [job for job in jobs if job['name'] != 'old']
+
+    async def write(jobs):
+        raise RuntimeError('write failed')
+
+    stats = _run(IngestPipeline(
+        't', {'S': fetch}, write, filter_changed=filter_changed,
+        on_stored=recorder.on_stored, on_failed=recorder.on_failed
+    ))
+    assert recorder.stored == ['old']
+    assert recorder.failed == ['new']
+    assert stats['write_failed'] == 1 and stats['score_failed'] == 0
+
+
+def test_scoring_failure_is_counted_separately():
+    async def fetch():
+        return _jobs('a', 'b')
+
+    async def score_batch(jobs):
+        raise RuntimeError('llm down')
+
+    async def write(jobs):
+        return len(jobs)
+
+    stats = _run(IngestPipeline('t', {'S': fetch}, write, score_batch=score_batch))
+    assert stats['score_failed'] == 2 and stats['write_failed'] == 0 and stats['written'] == 0
+
+
+def test_deferred_commits_run_only_after_every_batch_is_stored():
+    commits = []
+
+    def make_source(name):
+        async def fetch():
+            await after_stored(lambda: commits.append(name))
+            return _jobs(name)
+        return fetch
+
+    async def write(jobs):
+        if jobs[0]['name'] == 'bad':
+            raise RuntimeError('write failed')
+        return len(jobs)
+
+    _run(IngestPipeline('t', {'good': make_source('good'), 'bad': make_source('bad')}, write, batch_size=1))
+    assert commits == ['good']
+
+
+def test_failing_stage_cancels_the_others_and_raises():
+    async def fetch():
+        return _jobs(*range(50))
+
+    def score(job):
+        raise ValueError('stage died')
+
+    async def write(jobs):
+        return len(jobs)
+
+    async def main():
+        with pytest.raises(ValueError):
+            await asyncio.wait_for(IngestPipeline('t', {'S': fetch}, write, score=score, queue_size=2).run(), 5)
+        return len(asyncio.all_tasks()) - 1
+
+    assert asyncio.run(main()) == 0
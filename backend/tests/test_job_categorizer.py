@@ -0,0 +1,31 @@
+"""
+Local categorizer: curated source categories are kept, only missing or
+'General' ones are filled in, and no model is blended in by default
+"""
+import asyncio
+
+from backend.services.job_categorizer import JOB_CATEGORIES, JobCategorizer, job_categorizer
+from backend.services.job_record import JobRecord
+
+
+def _apply(category):
+    job = JobRecord(
+        job_title='Senior Python Developer', source='RemoteOK', company='Acme', location='Remote',
+        description='Build backend services and REST APIs in Python', category=category
+    )
+    return asyncio.run(job_categorizer.apply(job)).category
+
+
+def test_curated_source_categories_are_kept():
+    for category in ('Survey & Research', 'Testing & QA', 'Government', 'Entry Level', 'Remote', 'Tech'):
+        assert _apply(category) == category
+
+
+def test_missing_or_general_category_is_filled_from_fixed_set():
+    assert _apply('General') == 'Technology & IT'
+    assert _apply('') == 'Technology & IT'
+
+
+def test_rules_only_by_default():
+    assert job_categorizer.model is None
+    assert JobCategorizer(model_path='').predict('Registered Nurse', 'Patient care in a hospital').category in JOB_CATEGORIES
@@ -0,0 +1,58 @@
+"""
+One-time migration of auto-id jobs to deterministic ids: exact duplicates
+merge (keeping their fields), distinct postings sharing a link stay apart
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from backend.database.firestore_client import firestore_client, job_document_id
+
+NOW = datetime.now(timezone.utc)
+
+
+def _migrate(force=False):
+    return asyncio.run(firestore_client.migrate_legacy_job_ids(force=force))
+
+
+def test_exact_duplicates_merge_into_deterministic_id(firestore_db):
+    jobs = firestore_db.collection('generalJobs')
+    jobs.document('legacy1').set({'jobTitle': 'MTurk HIT', 'company': 'Amazon', 'sourceLink': 'https://x',
+                                  'scrapedAt': NOW - timedelta(days=2), 'savedBy': ['u1']})
+    jobs.document('legacy2').set({'jobTitle': 'MTurk HIT', 'company': 'Amazon', 'sourceLink': 'https://x',
+                                  'scrapedAt': NOW, 'description': 'newest'})
+
+    totals = _migrate()
+
+    assert totals['moved'] == 1 and totals['deleted'] == 2
+    stored = jobs.document(job_document_id('https://x', 'MTurk HIT')).get().to_dict()
+    assert stored['description'] == 'newest' and stored['savedBy'] == ['u1']
+    assert not jobs.document('legacy1').get().exists
+
+
+def test_distinct_postings_sharing_a_link_are_not_merged(firestore_db):
+    jobs = firestore_db.collection('generalJobs')
+    jobs.document('mturk').set({'jobTitle': 'MTurk HIT', 'company': 'Amazon', 'sourceLink': 'https://x'})
+    jobs.document('survey').set({'jobTitle': 'Survey', 'company': 'Amazon', 'sourceLink': 'https://x'})
+    jobs.document('other').set({'jobTitle': 'Survey', 'company': 'Other', 'sourceLink': 'https://x'})
+
+    totals = _migrate()
+
+    assert totals['moved'] == 2 and totals['conflicts'] == 1
+    assert jobs.document(job_document_id('https://x', 'MTurk HIT')).get().exists
+    assert jobs.document(job_document_id('https://x', 'Survey')).get().exists
+    # Same id as the Amazon survey but a different company: left alone
+    assert len([doc for doc in jobs.stream()]) == 3
+
+
+def test_migration_runs_once_unless_forced(firestore_db):
+    users = firestore_db.collection('users')
+    users.document('u1').set({'email': 'a@b.c'})
+    personalized = users.document('u1').collection('personalizedJobs')
+    personalized.document('legacy').set({'jobTitle': 'Dev', 'company': 'Co', 'sourceLink': 'l'})
+
+    assert _migrate()['moved'] == 1
+    personalized.document('late').set({'jobTitle': 'QA', 'company': 'Co', 'sourceLink': 'l'})
+    assert _migrate()['skipped'] == 1
+    assert personalized.document('late').get().exists
+    assert _migrate(force=True)['moved'] == 1
+    assert personalized.document(job_document_id('QA', 'Co')).get().exists
@@ -0,0 +1,80 @@
+"""
+LLM dispatcher: failover to the next provider, skipping providers out of
+quota, demoting unhealthy ones and coalescing identical prompts
+"""
+import asyncio
+
+import pytest
+
+from backend.services.llm_dispatch import LLMDispatcher, LLMProvider, LLMUnavailableError
+
+
+def _provider(name, calls, answer=None, error=None, rpm=100, delay=0.0):
+    async def call(prompt, system, temperature, max_tokens):
+        calls.append(name)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return answer or f"{name}: {prompt}"
+    return LLMProvider(name, f"{name}-model", call, rpm, 1000000)
+
+
+def _dispatcher(*providers):
+    dispatcher = LLMDispatcher()
+    dispatcher.providers = {}
+    for provider in providers:
+        dispatcher.register(provider)
+    return dispatcher
+
+
+def test_fails_over_to_the_next_provider():
+    calls = []
+    dispatcher = _dispatcher(_provider('openai', calls, error=RuntimeError('500')), _provider('gemini', calls))
+
+    assert asyncio.run(dispatcher.complete('hi')) == 'gemini: hi'
+    assert calls == ['openai', 'gemini']
+    assert dispatcher.stats['failovers'] == 1
+
+
+def test_provider_out_of_quota_is_skipped():
+    calls = []
+    dispatcher = _dispatcher(_provider('openai', calls, rpm=1), _provider('gemini', calls))
+
+    async def run():
+        return [await dispatcher.complete('one'), await dispatcher.complete('two')]
+
+    assert asyncio.run(run()) == ['openai: one', 'gemini: two']
+    assert dispatcher.providers['openai'].stats['quota_skips'] == 1
+
+
+def test_unhealthy_provider_is_demoted():
+    calls = []
+    failing = _provider('openai', calls, error=RuntimeError('500'))
+    dispatcher = _dispatcher(failing, _provider('gemini', calls))
+    for _ in range(4):
+        failing.record(False, 1.0)
+
+    assert asyncio.run(dispatcher.complete('hi', prefer=['openai', 'gemini'])) == 'gemini: hi'
+    assert calls == ['gemini']
+
+
+def test_identical_prompts_share_one_call():
+    calls = []
+    dispatcher = _dispatcher(_provider('openai', calls, delay=0.01))
+
+    async def run():
+        return await asyncio.gather(*(dispatcher.complete('same') for _ in range(3)))
+
+    assert asyncio.run(run()) == ['openai: same'] * 3
+    assert calls == ['openai']
+
+
+def test_no_provider_raises():
+    dispatcher = _dispatcher()
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(dispatcher.complete('hi'))
+
+    calls = []
+    dispatcher = _dispatcher(_provider('openai', calls, error=RuntimeError('500')))
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(dispatcher.complete('hi'))
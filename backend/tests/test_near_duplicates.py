@@ -0,0 +1,72 @@
+"""
+Near-duplicate index: seniority/level guards, placeholder descriptions and
+registering jobs only once they are stored
+"""
+from backend.utils.near_duplicates import NearDuplicateIndex, is_placeholder_description, level_tokens
+
+DESCRIPTION = (
+    "Build and maintain backend services in Python and Django, design REST APIs, "
+    "review code and work with the product team on new features for our customers"
+)
+
+
+def test_same_posting_from_two_boards_is_a_duplicate():
+    index = NearDuplicateIndex()
+    assert index.check_and_add('a', 'Python Developer (Remote)', 'Acme Inc', DESCRIPTION, 'RemoteOK') is None
+    assert index.check_and_add('b', 'Python Developer', 'Acme', DESCRIPTION, 'Himalayas') == 'a'
+
+
+def test_different_seniority_is_not_a_duplicate():
+    index = NearDuplicateIndex()
+    assert index.check_and_add('a', 'Senior Python Developer', 'Acme', DESCRIPTION) is None
+    assert index.check_and_add('b', 'Junior Python Developer', 'Acme', DESCRIPTION) is None
+    assert index.check_and_add('c', 'Sr. Python Developer', 'Acme', DESCRIPTION) == 'a'
+
+
+def test_different_level_is_not_a_duplicate():
+    index = NearDuplicateIndex()
+    assert index.check_and_add('a', 'Python Developer II', 'Acme', DESCRIPTION) is None
+    assert index.check_and_add('b', 'Python Developer I', 'Acme', DESCRIPTION) is None
+    assert index.check_and_add('c', 'Python Developer', 'Acme', DESCRIPTION) is None
+
+
+def test_level_tokens():
+    assert level_tokens('Sr. Data Engineer III') == {'senior', '3'}
+    assert level_tokens('Data Engineer') == frozenset()
+
+
+def test_placeholder_descriptions_are_not_evidence():
+    title, company = 'Python Developer', 'Acme'
+    assert is_placeholder_description(f"{title} position at {company}", title, company)
+    assert is_placeholder_description('', title, company)
+    assert not is_placeholder_description(DESCRIPTION, title, company)
+
+    # A placeholder neither confirms nor vetoes a title match
+    index = NearDuplicateIndex()
+    assert index.check_and_add('a', title, company, DESCRIPTION, 'RemoteOK') is None
+    assert index.check_and_add('b', title, company, f"{title} position at {company}", 'LinkedIn') == 'a'
+
+
+def test_placeholder_does_not_confirm_different_seniority():
+    index = NearDuplicateIndex()
+    assert index.check_and_add('a', 'Senior Python Developer', 'Acme', 'Senior Python Developer position at Acme') is None
+    assert index.check_and_add('b', 'Junior Python Developer', 'Acme', 'Junior Python Developer position at Acme') is None
+
+
+def test_pending_jobs_match_until_released():
+    index = NearDuplicateIndex()
+    assert index.check('a', 'Python Developer', 'Acme', DESCRIPTION) is None
+    # Held while its batch is in flight, so the same posting from another board still matches
+    assert index.check('b', 'Python Developer', 'Acme', DESCRIPTION) == 'a'
+
+    index.release(['a'])
+    assert len(index) == 0
+    assert index.check('c', 'Python Developer', 'Acme', DESCRIPTION) is None
+
+
+def test_registered_jobs_survive_release():
+    index = NearDuplicateIndex()
+    index.check('a', 'Python Developer', 'Acme', DESCRIPTION)
+    index.register(['a'])
+    index.release(['a'])
+    assert index.check('b', 'Python Developer', 'Acme', DESCRIPTION) == 'a'
@@ -0,0 +1,63 @@
+"""
+Query memo: equivalent keywords share one fetch, concurrent callers join the
+fetch in flight, and failures aren't memoized
+"""
+import asyncio
+
+import pytest
+
+from backend.utils.query_memo import QueryMemo, normalize_keywords
+
+
+def _fetcher(calls, result=None, error=None, delay=0.0):
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return result if result is not None else [{'jobTitle': 'Python Developer'}]
+    return fetch
+
+
+def test_normalize_keywords():
+    assert normalize_keywords('SQL, Python') == normalize_keywords(' python ,sql,SQL')
+
+
+def test_reordered_keywords_share_one_fetch():
+    memo, calls = QueryMemo(), []
+
+    async def run():
+        first = await memo.get_or_fetch('Indeed', 'SQL, Python', 'Remote', _fetcher(calls))
+        second = await memo.get_or_fetch('Indeed', 'python,sql', 'remote', _fetcher(calls))
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert len(calls) == 1
+    assert first == second and first[0] is not second[0]  # Each caller gets its own copies
+
+
+def test_concurrent_callers_join_the_fetch_in_flight():
+    memo, calls = QueryMemo(), []
+
+    async def run():
+        return await asyncio.gather(*(
+            memo.get_or_fetch('Indeed', 'python', '', _fetcher(calls, delay=0.01)) for _ in range(3)
+        ))
+
+    assert len(asyncio.run(run())) == 3
+    assert len(calls) == 1
+    assert memo.get_stats()['hits'] == 2
+
+
+def test_variants_and_failures_are_not_shared():
+    memo, calls = QueryMemo(), []
+
+    async def run():
+        await memo.get_or_fetch('Adzuna', 'python', '', _fetcher(calls), variant='100')
+        await memo.get_or_fetch('Adzuna', 'python', '', _fetcher(calls), variant='200')
+        with pytest.raises(RuntimeError):
+            await memo.get_or_fetch('Indeed', 'python', '', _fetcher(calls, error=RuntimeError('blocked')))
+        await memo.get_or_fetch('Indeed', 'python', '', _fetcher(calls))
+
+    asyncio.run(run())
+    assert len(calls) == 4
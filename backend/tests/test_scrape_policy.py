@@ -0,0 +1,66 @@
+"""
+Scrape policy: tier state shared through scraperState between processes, and
+users deferred by the per-cycle cap are logged
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from backend.services.scrape_policy import ScrapePolicy, POLICY_STATE_ID
+
+NOW = datetime.now(timezone.utc)
+
+
+def test_activity_and_scrapes_are_shared_between_processes(firestore_db):
+    api, publisher = ScrapePolicy(), ScrapePolicy()
+
+    async def run():
+        await api.record_activity('u1', NOW)
+        await publisher.load_state()
+        publisher.record_scrape('u2', 'cold', 0, NOW)
+        await publisher.save_state()
+
+    asyncio.run(run())
+    users = [('u1', {}), ('u2', {})]
+    assert publisher.get_tier('u1', {}, NOW) == 'hot'
+
+    # A later cycle in another process: u2 was just scraped, u1 never was
+    later = ScrapePolicy()
+    asyncio.run(later.load_state())
+    assert later.plan(users, NOW + timedelta(minutes=1)) == [('u1', 'hot')]
+
+
+def test_activity_writes_are_throttled(firestore_db):
+    policy = ScrapePolicy()
+
+    async def run():
+        await policy.record_activity('u1', NOW)
+        await policy.record_activity('u1', NOW + timedelta(seconds=30))
+
+    asyncio.run(run())
+    state = firestore_db.collection('scraperState').document(POLICY_STATE_ID).get().to_dict()
+    assert state['lastActivity'] == {'u1': NOW}
+    assert policy.last_activity['u1'] == NOW + timedelta(seconds=30)
+
+
+def test_loading_keeps_newer_local_times(firestore_db):
+    firestore_db.collection('scraperState').document(POLICY_STATE_ID).set(
+        {'lastScraped': {'u1': NOW - timedelta(days=1), 'u2': NOW.isoformat()}}
+    )
+    policy = ScrapePolicy()
+    policy.last_scraped['u1'] = NOW
+
+    asyncio.run(policy.load_state())
+
+    assert policy.last_scraped == {'u1': NOW, 'u2': NOW}
+
+
+def test_users_over_the_cap_are_deferred_and_logged(caplog):
+    policy = ScrapePolicy(max_users_per_cycle=1)
+    users = [('u1', {'lastLogin': NOW.isoformat()}), ('u2', {})]
+
+    with caplog.at_level(logging.WARNING, logger='backend.services.scrape_policy'):
+        assert policy.plan(users, NOW) == [('u1', 'hot')]
+
+    assert policy.tier_stats['cold']['deferred'] == 1
+    assert '1 due users deferred' in caplog.text
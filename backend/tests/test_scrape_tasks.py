@@ -0,0 +1,75 @@
+"""
+Queue execution: a published cycle runs each scrape unit exactly once, and a
+failing unit is retried. Units run inline (task_always_eager), so no broker is needed
+"""
+import pytest
+
+from backend.workers import tasks
+from backend.workers.celery_app import celery_app
+from backend.services.scrape_policy import ScrapePolicy
+from backend.services.source_registry import source_registry, PERSONALIZED, GENERAL
+
+
+@pytest.fixture
+def eager(monkeypatch):
+    monkeypatch.setitem(celery_app.conf, 'task_always_eager', True)
+    # Propagating would raise the first Retry instead of re-running the unit inline
+    monkeypatch.setitem(celery_app.conf, 'task_eager_propagates', False)
+    monkeypatch.setattr(tasks, 'scrape_policy', ScrapePolicy())
+
+
+def _record_calls(monkeypatch, target, name, fail_times=0):
+    """Replace target.name with an async stub that records its args and fails the first fail_times calls"""
+    calls = []
+
+    async def unit(*args):
+        calls.append(args)
+        if len(calls) <= fail_times:
+            raise RuntimeError("upstream down")
+        return 1
+
+    monkeypatch.setattr(target, name, unit)
+    return calls
+
+
+def test_personalized_cycle_runs_each_unit_once(eager, monkeypatch, firestore_db):
+    calls = _record_calls(monkeypatch, tasks.personalized_scraper, 'scrape_source_for_user')
+    users = firestore_db.collection('users')
+    users.document('u1').set({'skills': ['Python'], 'experience': 'senior'})
+    users.document('u2').set({'skills': ['React'], 'experience': 'senior'})
+    users.document('u3').set({})  # No profile, nothing to search for
+
+    published = tasks.publish_personalized_cycle()
+
+    sources = source_registry.names(PERSONALIZED, 'senior')
+    assert published == {'u1': len(sources), 'u2': len(sources)}
+    assert sorted(calls) == sorted((user_id, source) for user_id in ('u1', 'u2') for source in sources)
+
+
+def test_general_cycle_runs_each_unit_once(eager, monkeypatch):
+    calls = _record_calls(monkeypatch, tasks.general_scraper, 'scrape_general_source')
+
+    published = tasks.publish_general_cycle()
+
+    assert published == len(source_registry.names(GENERAL))
+    assert sorted(calls) == sorted((source,) for source in source_registry.names(GENERAL))
+
+
+def test_failed_unit_is_retried(eager, monkeypatch):
+    calls = _record_calls(monkeypatch, tasks.personalized_scraper, 'scrape_source_for_user', fail_times=2)
+
+    result = tasks.scrape_user_source.delay('u1', 'RemoteOK')
+
+    assert result.get() == 1
+    assert calls == [('u1', 'RemoteOK')] * 3
+
+
+def test_unit_gives_up_after_max_retries(eager, monkeypatch):
+    calls = _record_calls(monkeypatch, tasks.general_scraper, 'scrape_general_source', fail_times=99)
+
+    result = tasks.scrape_general_source.delay('RemoteOK')
+
+    with pytest.raises(RuntimeError):
+        result.get()
+
+    assert len(calls) == tasks.scrape_general_source.max_retries + 1
@@ -0,0 +1,66 @@
+"""
+SingleFlight: concurrent identical calls share one result (or error), and
+waiters start over if the caller running the call is cancelled
+"""
+import asyncio
+
+import pytest
+
+from backend.utils.single_flight import SingleFlight, flight_key
+
+
+def test_flight_key_ignores_dict_order():
+    assert flight_key({'a': 1, 'b': 2}) == flight_key({'b': 2, 'a': 1})
+    assert flight_key({'a': 1}) != flight_key({'a': 2})
+
+
+def test_concurrent_callers_share_one_call():
+    flight, calls = SingleFlight(), []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 'answer'
+
+    async def run():
+        return await asyncio.gather(*(flight.run('k', call) for _ in range(3)))
+
+    assert asyncio.run(run()) == ['answer'] * 3
+    assert len(calls) == 1 and flight.coalesced == 2
+    assert flight.get_stats()['in_flight'] == 0
+
+
+def test_errors_are_shared():
+    flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise RuntimeError('quota')
+
+    async def run():
+        return await asyncio.gather(*(flight.run('k', call) for _ in range(2)), return_exceptions=True)
+
+    assert [type(result) for result in asyncio.run(run())] == [RuntimeError, RuntimeError]
+    assert flight.calls == 1
+
+
+def test_cancelled_leader_hands_the_call_to_a_waiter():
+    flight, calls = SingleFlight(), []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'answer'
+
+    async def run():
+        leader = asyncio.create_task(flight.run('k', call))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.run('k', call))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(run()) == 'answer'
+    assert len(calls) == 2
@@ -0,0 +1,58 @@
+"""
+Watermarks: position parsing, stopping at already-seen postings, and marks
+that only move forward (persisted in scraperState)
+"""
+import asyncio
+
+from backend.services.watermarks import (
+    WatermarkStore, WatermarkScan, posting_position, user_watermark_key, watermark_key
+)
+
+
+def test_posting_position_accepts_dates_and_ids():
+    assert posting_position(1700000000) == 1700000000.0
+    assert posting_position('42') == 42.0
+    assert posting_position('2026-10-18T00:00:00Z') == posting_position('Sun, 18 Oct 2026 00:00:00 GMT')
+    assert posting_position('') is None
+    assert posting_position('not a date') is None
+
+
+def test_personalized_marks_are_per_user_and_ignore_query_formatting():
+    assert user_watermark_key('Adzuna', 'u1', 'Python', 'Remote') != user_watermark_key('Adzuna', 'u2', 'Python', 'Remote')
+    assert watermark_key('RemoteOK', 'general', 'Python  SQL') == watermark_key('RemoteOK', 'general', 'python sql')
+
+
+def test_scan_stops_at_the_mark_and_tracks_the_newest():
+    scan = WatermarkScan(WatermarkStore(), 'k', mark=100.0)
+    assert not scan.seen(120.0, 'b')
+    assert not scan.seen(None)
+    assert not scan.seen(110.0, 'a')
+    assert scan.seen(100.0, 'old')
+    assert (scan.newest, scan.newest_id) == (120.0, 'b')
+
+
+def test_marks_only_advance_and_are_persisted(firestore_db):
+    store = WatermarkStore()
+
+    async def run():
+        await store.advance('k', 200.0, 'b')
+        await store.advance('k', 150.0, 'a')
+        return await store.get('k')
+
+    assert asyncio.run(run()) == 200.0
+    assert firestore_db.collection('scraperState').document('k').get().to_dict()['position'] == 200.0
+
+    # A fresh store (another process) reads the persisted mark
+    assert asyncio.run(WatermarkStore().get('k')) == 200.0
+
+
+def test_commit_outside_a_pipeline_advances_right_away(firestore_db):
+    store = WatermarkStore()
+
+    async def run():
+        scan = await store.scan('k')
+        scan.seen(300.0, 'c')
+        await scan.commit()
+        return await store.get('k')
+
+    assert asyncio.run(run()) == 300.0
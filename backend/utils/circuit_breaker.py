@@ -0,0 +1,148 @@
+"""
+Per-source circuit breakers for scrapers
+A source that keeps failing (e.g. Selenium on cloud hosts) is skipped for a
+cooldown period instead of paying browser startup and timeouts every call,
+then re-tested with a single half-open probe
+"""
+import os
+import time
+import logging
+import threading
+from typing import Dict, Any, Optional
+
+from backend.utils.scrape_telemetry import scrape_telemetry
+
+logger = logging.getLogger(__name__)
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("SCRAPER_BREAKER_FAILURES", "3"))
+BREAKER_COOLDOWN_SECONDS = int(os.getenv("SCRAPER_BREAKER_COOLDOWN", "1800"))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Closed -> open after N consecutive failures -> half-open probe after cooldown"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        cooldown_seconds: int = BREAKER_COOLDOWN_SECONDS
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_started_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.skipped_calls = 0
+        self.trips = 0
+        # Blocking sources report from worker threads; state changes must not interleave
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go to the source right now"""
+        with self._lock:
+            return self._allow()
+
+    def _allow(self) -> bool:
+        now = time.monotonic()
+
+        if self.state == CLOSED:
+            return True
+
+        if self.state == OPEN:
+            if now - self.opened_at >= self.cooldown_seconds:
+                # Let exactly one probe through
+                self.state = HALF_OPEN
+                self.probe_started_at = now
+                logger.info(f"Circuit {self.name}: half-open, sending probe")
+                return True
+            self.skipped_calls += 1
+            return False
+
+        # HALF_OPEN: a probe is in flight; allow a new one only if it never reported back
+        if now - self.probe_started_at >= self.cooldown_seconds:
+            self.probe_started_at = now
+            return True
+        self.skipped_calls += 1
+        return False
+
+    def record_success(self):
+        """Close the circuit after a successful call"""
+        with self._lock:
+            self._record_success()
+
+    def _record_success(self):
+        if self.state != CLOSED:
+            logger.info(f"Circuit {self.name}: probe succeeded, closing")
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_started_at = None
+
+    def record_failure(self, error: Optional[BaseException] = None):
+        """Count a failure; trip the circuit at the threshold or on a failed probe"""
+        scrape_telemetry.mark_error(error)
+        with self._lock:
+            self._record_failure(error)
+
+    def _record_failure(self, error: Optional[BaseException]):
+        self.consecutive_failures += 1
+        self.last_error = f"{type(error).__name__}: {error}" if error else None
+
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.trips += 1
+                logger.warning(
+                    f"Circuit {self.name}: open for {self.cooldown_seconds}s "
+                    f"after {self.consecutive_failures} consecutive failures"
+                )
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.probe_started_at = None
+
+    def get_status(self) -> Dict[str, Any]:
+        """Breaker state for the scheduler status endpoint"""
+        with self._lock:
+            return self._status()
+
+    def _status(self) -> Dict[str, Any]:
+        retry_in = None
+        if self.state == OPEN and self.opened_at is not None:
+            retry_in = max(0, round(self.cooldown_seconds - (time.monotonic() - self.opened_at)))
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'trips': self.trips,
+            'skipped_calls': self.skipped_calls,
+            'retry_in_seconds': retry_in,
+            'last_error': self.last_error
+        }
+
+
+class CircuitBreakerRegistry:
+    """One breaker per source name, created on first use"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(name)
+            return self._breakers[name]
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = sorted(self._breakers.items())
+        return {name: breaker.get_status() for name, breaker in breakers}
+
+
+# Global instance
+circuit_breakers = CircuitBreakerRegistry()
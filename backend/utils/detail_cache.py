@@ -0,0 +1,80 @@
+"""
+On-disk TTL cache for full job descriptions
+One gzip-compressed JSON entry per job URL, so details fetched once survive
+restarts and are shared by every request until they expire
+"""
+import os
+import gzip
+import json
+import time
+import hashlib
+import logging
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+DETAIL_CACHE_DIR = os.getenv("SCRAPER_DETAIL_CACHE_DIR", "./.cache/details")
+# Postings rarely change once published
+DETAIL_CACHE_TTL_SECONDS = int(os.getenv("SCRAPER_DETAIL_CACHE_TTL", str(7 * 24 * 3600)))
+# Pages with no usable description are retried sooner
+DETAIL_CACHE_MISS_TTL_SECONDS = int(os.getenv("SCRAPER_DETAIL_CACHE_MISS_TTL", "3600"))
+
+
+class DetailCache:
+    """URL -> description (None when the page had none), with separate TTLs for both cases"""
+
+    def __init__(
+        self,
+        cache_dir: str = DETAIL_CACHE_DIR,
+        ttl_seconds: int = DETAIL_CACHE_TTL_SECONDS,
+        miss_ttl_seconds: int = DETAIL_CACHE_MISS_TTL_SECONDS
+    ):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.miss_ttl_seconds = miss_ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json.gz')
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Cached entry for a URL ({'description': str or None, 'fetched_at': epoch}),
+        or None if there is no fresh entry
+        """
+        try:
+            with gzip.open(self._path(url), 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        ttl = self.ttl_seconds if entry.get('description') else self.miss_ttl_seconds
+        if time.time() - entry.get('fetched_at', 0) > ttl:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry
+
+    def set(self, url: str, description: Optional[str]):
+        """Store a fetched description (None records that the page had none)"""
+        path = self._path(url)
+        tmp_path = path + '.tmp'
+        try:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                json.dump({'url': url, 'description': description, 'fetched_at': time.time()}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Detail cache: could not persist {url}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters since startup"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
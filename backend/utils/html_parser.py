@@ -0,0 +1,68 @@
+"""
+Shared HTML parsing layer for job scrapers
+Uses lxml with SoupStrainer so only job-card subtrees are ever built
+Falls back to the stdlib html.parser when lxml is unavailable
+"""
+import re
+from typing import List, Dict, Optional
+from bs4 import BeautifulSoup, SoupStrainer
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+    logger.warning("lxml not installed, falling back to html.parser for scraping")
+
+# Job card containers per source as (tag, class) pairs, tried in order
+JOB_CARD_SELECTORS: Dict[str, List[tuple]] = {
+    'indeed': [('div', 'job_seen_beacon'), ('td', 'resultContent')],
+    'linkedin': [('div', 'base-card')],
+    'glassdoor': [('li', 'react-job-listing')],
+    'handshake': [('div', 'job-card')],
+    'upwork': [('article', 'job-tile')],
+    'fiverr': [('div', 'gig-card-layout')],
+}
+
+
+def _class_pattern(css_class: str):
+    """Match one class inside the raw (unsplit) class attribute seen while parsing"""
+    return re.compile(r'(?:^|\s)' + re.escape(css_class) + r'(?:\s|$)')
+
+
+# One strainer per selector, tried in order so the common case is a single pass
+_STRAINERS: Dict[str, List[tuple]] = {
+    source: [
+        (tag, css_class, SoupStrainer(tag, class_=_class_pattern(css_class)))
+        for tag, css_class in selectors
+    ]
+    for source, selectors in JOB_CARD_SELECTORS.items()
+}
+
+
+def parse_html(html, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """Parse an HTML document (or fragment) with the fastest available parser"""
+    return BeautifulSoup(html, HTML_PARSER, parse_only=parse_only)
+
+
+def parse_job_cards(html, source: str) -> List:
+    """
+    Parse only the job-card subtrees for a source
+
+    Args:
+        html: Page source (str or bytes)
+        source: Key into JOB_CARD_SELECTORS (e.g. 'indeed', 'linkedin')
+
+    Returns:
+        List of card Tags, using the first selector that yields any cards
+    """
+    for tag, css_class, strainer in _STRAINERS[source]:
+        soup = parse_html(html, parse_only=strainer)
+        cards = soup.find_all(tag, class_=css_class)
+        if cards:
+            return cards
+
+    return []
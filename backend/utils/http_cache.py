@@ -0,0 +1,186 @@
+"""
+On-disk HTTP cache for slow-changing job feeds
+Stores ETag/Last-Modified validators and gzip-compressed bodies per URL,
+sends conditional requests, and tracks which body each consumer has already processed
+(recorded with commit() once the consumer has stored what it parsed from the body)
+"""
+import os
+import gzip
+import json
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Dict, Any
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+HTTP_CACHE_DIR = os.getenv("SCRAPER_HTTP_CACHE_DIR", "./.cache/http")
+
+
+@dataclass
+class CachedResponse:
+    """Result of a cached GET"""
+    body: bytes
+    content_hash: str
+    status_code: int
+    not_modified: bool  # Server answered 304, body came from disk
+    unchanged: bool  # Consumer already committed this exact body
+
+
+class HTTPCache:
+    """Conditional-GET cache with compressed bodies on local disk"""
+
+    def __init__(self, cache_dir: str = HTTP_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.stats = {'requests': 0, 'not_modified': 0, 'unchanged': 0, 'bytes_downloaded': 0}
+        # Blocking sources fetch on worker threads while commits run on the event loop
+        self._meta_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _key(self, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Stable cache key for a URL and its query params"""
+        raw = url + '?' + json.dumps(params or {}, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.meta.json")
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.body.gz")
+
+    def _load_meta(self, key: str) -> Dict[str, Any]:
+        try:
+            with open(self._meta_path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _tmp_path(path: str) -> str:
+        # Unique per writer, so concurrent fetches of one URL don't clobber each other's temp file
+        return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def _count(self, name: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[name] += amount
+
+    def _save_meta(self, key: str, meta: Dict[str, Any]):
+        tmp_path = self._tmp_path(self._meta_path(key))
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._meta_path(key))
+
+    def _read_body(self, key: str) -> Optional[bytes]:
+        try:
+            with gzip.open(self._body_path(key), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_body(self, key: str, body: bytes):
+        tmp_path = self._tmp_path(self._body_path(key))
+        with gzip.open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, self._body_path(key))
+
+    def get(
+        self,
+        session: requests.Session,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 15,
+        consumer: Optional[str] = None
+    ) -> CachedResponse:
+        """
+        GET a URL, revalidating against the cached copy
+
+        Args:
+            consumer: Optional name of the caller (e.g. 'general'). When given,
+                `unchanged` is True if this consumer already committed the same
+                body, so it can skip parsing and storage entirely. The consumer
+                calls commit() with the returned content_hash once it has stored
+                what it parsed, so a failed run sees the body again next time.
+
+        Raises:
+            requests.HTTPError on non-2xx/304 responses
+        """
+        key = self._key(url, params)
+        meta = self._load_meta(key)
+        cached_body = self._read_body(key) if meta else None
+
+        request_headers = dict(headers or {})
+        if cached_body is not None:
+            if meta.get('etag'):
+                request_headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request_headers['If-Modified-Since'] = meta['last_modified']
+
+        response = session.get(url, params=params, headers=request_headers, timeout=timeout)
+        self._count('requests')
+
+        if response.status_code == 304 and cached_body is not None:
+            body = cached_body
+            content_hash = meta['content_hash']
+            not_modified = True
+            self._count('not_modified')
+        else:
+            response.raise_for_status()
+            body = response.content
+            content_hash = hashlib.sha256(body).hexdigest()
+            not_modified = False
+            self._count('bytes_downloaded', len(body))
+
+            if meta.get('content_hash') != content_hash or cached_body is None:
+                self._write_body(key, body)
+
+            meta.update({
+                'url': url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'content_hash': content_hash,
+                'fetched_at': datetime.now().isoformat()
+            })
+
+        unchanged = consumer is not None and meta.get('consumers', {}).get(consumer) == content_hash
+        if unchanged:
+            self._count('unchanged')
+
+        with self._meta_lock:
+            # Keep consumer commits made while this request was in flight
+            meta['consumers'] = self._load_meta(key).get('consumers', {})
+            try:
+                self._save_meta(key, meta)
+            except OSError as e:
+                logger.warning(f"HTTP cache: could not persist metadata for {url}: {e}")
+
+        return CachedResponse(
+            body=body,
+            content_hash=content_hash,
+            status_code=response.status_code,
+            not_modified=not_modified,
+            unchanged=unchanged
+        )
+
+    def commit(self, url: str, consumer: str, content_hash: str, params: Optional[Dict[str, Any]] = None):
+        """Record that `consumer` has processed and stored the body with this hash"""
+        key = self._key(url, params)
+        with self._meta_lock:
+            meta = self._load_meta(key)
+            if not meta:
+                return
+            meta.setdefault('consumers', {})[consumer] = content_hash
+            try:
+                self._save_meta(key, meta)
+            except OSError as e:
+                logger.warning(f"HTTP cache: could not persist metadata for {url}: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Request/304/unchanged counters since startup"""
+        with self._stats_lock:
+            return dict(self.stats)
@@ -0,0 +1,280 @@
+"""
+Cross-source near-duplicate detection with MinHash LSH
+The same posting shows up on RemoteOK, Himalayas, Arbeitnow and LinkedIn with
+slightly different titles and URLs; exact sourceLink / title+company checks miss
+those. Jobs are MinHashed over normalized title+company shingles and bucketed
+by LSH bands, so each lookup only compares against a handful of candidates
+
+Character shingles barely move when one seniority or level word changes, so
+'Senior' vs 'Junior' or 'II' vs 'I' must match exactly before titles can count
+as duplicates, and template descriptions ('{title} position at {company}')
+are not used as evidence. A job found new is held as pending until its batch
+is stored (register) and dropped if the write fails (release)
+"""
+import os
+import re
+import random
+import hashlib
+import logging
+from array import array
+from collections import OrderedDict, deque
+from typing import Dict, Any, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Estimated Jaccard similarity of title+company shingles to count as the same posting
+NEAR_DUP_THRESHOLD = float(os.getenv("SCRAPER_NEAR_DUP_THRESHOLD", "0.7"))
+# Min company name similarity (exact Jaccard of 3-grams) when both postings name a company
+NEAR_DUP_COMPANY_THRESHOLD = float(os.getenv("SCRAPER_NEAR_DUP_COMPANY_THRESHOLD", "0.5"))
+# Min description similarity when both postings carry a description
+NEAR_DUP_DESCRIPTION_THRESHOLD = float(os.getenv("SCRAPER_NEAR_DUP_DESC_THRESHOLD", "0.3"))
+# Descriptions with fewer words than this besides the title and company are placeholders
+PLACEHOLDER_MAX_WORDS = 6
+# Entries kept per index (oldest evicted first) and number of indexes kept
+NEAR_DUP_MAX_ENTRIES = int(os.getenv("SCRAPER_NEAR_DUP_MAX_ENTRIES", "5000"))
+NEAR_DUP_MAX_SCOPES = int(os.getenv("SCRAPER_NEAR_DUP_MAX_SCOPES", "500"))
+
+# 16 bands x 4 rows: pairs at 0.7 similarity share a band ~99% of the time, pairs at 0.3 ~12%
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_rng = random.Random(1337)
+_PERMUTATIONS = [
+    (_rng.randint(1, _MERSENNE_PRIME - 1), _rng.randint(0, _MERSENNE_PRIME - 1)) for _ in range(NUM_PERM)
+]
+
+# Noise that differs between boards for the same posting
+_NOISE_RE = re.compile(r'\((?:remote|hybrid|on-?site|m/f/d|f/m/d|w/m/d)\)|\b(?:remote|hybrid|inc|llc|ltd|gmbh|corp)\b\.?')
+_NON_WORD_RE = re.compile(r'[^a-z0-9]+')
+
+# Title words that make otherwise similar titles different postings (aliases map to one form)
+LEVEL_TOKENS = {
+    'senior': 'senior', 'sr': 'senior', 'junior': 'junior', 'jr': 'junior', 'lead': 'lead',
+    'principal': 'principal', 'staff': 'staff', 'head': 'head', 'chief': 'chief', 'intern': 'intern',
+    'internship': 'intern', 'entry': 'entry', 'mid': 'mid', 'associate': 'associate', 'trainee': 'trainee',
+    'i': '1', 'ii': '2', 'iii': '3', 'iv': '4', 'v': '5', '1': '1', '2': '2', '3': '3', '4': '4', '5': '5'
+}
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop board-specific noise and punctuation"""
+    text = _NOISE_RE.sub(' ', (text or '').lower())
+    return ' '.join(_NON_WORD_RE.sub(' ', text).split())
+
+
+def char_shingles(text: str, k: int = 4) -> Set[str]:
+    """Character k-grams; robust to small wording changes in short titles"""
+    if len(text) <= k:
+        return {text} if text else set()
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+def word_shingles(text: str, k: int = 3, max_words: int = 80) -> Set[str]:
+    """Word k-grams over the start of a description"""
+    words = text.split()[:max_words]
+    if len(words) <= k:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def minhash(shingles: Set[str]) -> Optional[array]:
+    """MinHash signature of a shingle set, None for an empty set"""
+    if not shingles:
+        return None
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'little')
+        for s in shingles
+    ]
+    return array('Q', (
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH for a, b in _PERMUTATIONS
+    ))
+
+
+def similarity(sig_a: array, sig_b: array) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def level_tokens(title: str) -> frozenset:
+    """Seniority and level words in a title, e.g. {'senior'} or {'2'}"""
+    return frozenset(LEVEL_TOKENS[word] for word in normalize_text(title).split() if word in LEVEL_TOKENS)
+
+
+def is_placeholder_description(description: str, title: str = "", company: str = "") -> bool:
+    """True for empty or template descriptions that only restate the title and company"""
+    known = set(normalize_text(f"{title} {company}").split())
+    words = [word for word in normalize_text(description).split() if word not in known]
+    return len(words) < PLACEHOLDER_MAX_WORDS
+
+
+def _description_signature(description: str, title: str, company: str) -> Optional[array]:
+    if is_placeholder_description(description, title, company):
+        return None
+    return minhash(word_shingles(normalize_text(description)))
+
+
+def _company_shingles(company: str) -> frozenset:
+    normalized = normalize_text(company)
+    if normalized in ('', 'unknown', 'company'):
+        return frozenset()
+    return frozenset(char_shingles(normalized, 3))
+
+
+class NearDuplicateIndex:
+    """In-memory LSH index of recently ingested jobs for one scope"""
+
+    def __init__(
+        self,
+        threshold: float = NEAR_DUP_THRESHOLD,
+        company_threshold: float = NEAR_DUP_COMPANY_THRESHOLD,
+        description_threshold: float = NEAR_DUP_DESCRIPTION_THRESHOLD,
+        max_entries: int = NEAR_DUP_MAX_ENTRIES
+    ):
+        self.threshold = threshold
+        self.company_threshold = company_threshold
+        self.description_threshold = description_threshold
+        self.max_entries = max_entries
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(BANDS)]
+        self._entries: Dict[str, tuple] = {}
+        # Ids held by check() whose batch hasn't been stored yet
+        self._pending: Set[str] = set()
+        self._order: deque = deque()
+        self.checked = 0
+        self.duplicates = 0
+
+    @staticmethod
+    def _band_keys(signature: array) -> List[bytes]:
+        return [signature[band * ROWS:(band + 1) * ROWS].tobytes() for band in range(BANDS)]
+
+    def _evict_oldest(self):
+        self._remove(self._order.popleft())
+
+    def _remove(self, job_id: str):
+        signature = self._entries.pop(job_id)[0]
+        self._pending.discard(job_id)
+        for band, key in enumerate(self._band_keys(signature)):
+            ids = self._buckets[band].get(key)
+            if ids:
+                ids.remove(job_id)
+                if not ids:
+                    del self._buckets[band][key]
+
+    def find(self, title: str, company: str = "", description: str = "") -> Optional[str]:
+        """Return the id of an indexed near-duplicate, or None"""
+        signature = minhash(char_shingles(normalize_text(f"{title} {company}")))
+        if signature is None:
+            return None
+        return self._find(
+            signature, level_tokens(title), _company_shingles(company), _description_signature(description, title, company)
+        )
+
+    def _find(
+        self, signature: array, levels: frozenset, company: frozenset, description_sig: Optional[array]
+    ) -> Optional[str]:
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+
+        for job_id in candidates:
+            other_sig, other_levels, other_company, other_desc, _ = self._entries[job_id]
+            if levels != other_levels or similarity(signature, other_sig) < self.threshold:
+                continue
+            if company and other_company:
+                if len(company & other_company) / len(company | other_company) < self.company_threshold:
+                    continue
+            if description_sig is not None and other_desc is not None:
+                if similarity(description_sig, other_desc) < self.description_threshold:
+                    continue
+            return job_id
+        return None
+
+    def check(self, job_id: str, title: str, company: str = "", description: str = "", source: str = "") -> Optional[str]:
+        """
+        Look up a job; if it is new, hold it as pending so later jobs in the same run match it
+        Returns the id of the existing near-duplicate, or None if the job is new
+        Call register() once the job is stored, or release() if storing it failed
+        """
+        self.checked += 1
+        signature = minhash(char_shingles(normalize_text(f"{title} {company}")))
+        if signature is None or job_id in self._entries:
+            return None
+        levels = level_tokens(title)
+        company_shingles = _company_shingles(company)
+        description_sig = _description_signature(description, title, company)
+
+        existing = self._find(signature, levels, company_shingles, description_sig)
+        if existing is not None:
+            self.duplicates += 1
+            logger.debug(f"Near-duplicate: '{title}' ({source}) matches {existing} ({self._entries[existing][4]})")
+            return existing
+
+        if len(self._entries) >= self.max_entries:
+            self._evict_oldest()
+        self._entries[job_id] = (signature, levels, company_shingles, description_sig, source)
+        self._pending.add(job_id)
+        self._order.append(job_id)
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, []).append(job_id)
+        return None
+
+    def register(self, job_ids: List[str]):
+        """Keep pending jobs whose batch was stored"""
+        self._pending.difference_update(job_ids)
+
+    def release(self, job_ids: List[str]):
+        """Drop pending jobs whose batch failed, so they aren't treated as stored next time"""
+        for job_id in job_ids:
+            if job_id in self._pending:
+                self._order.remove(job_id)
+                self._remove(job_id)
+
+    def check_and_add(self, job_id: str, title: str, company: str = "", description: str = "", source: str = "") -> Optional[str]:
+        """check() and register() in one step, for callers that store jobs immediately"""
+        existing = self.check(job_id, title, company, description, source)
+        if existing is None:
+            self.register([job_id])
+        return existing
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class NearDuplicateRegistry:
+    """One index per scope (e.g. 'general', 'user:<id>'), least recently used dropped first"""
+
+    def __init__(self, max_scopes: int = NEAR_DUP_MAX_SCOPES):
+        self.max_scopes = max_scopes
+        self._indexes: 'OrderedDict[str, NearDuplicateIndex]' = OrderedDict()
+
+    def get(self, scope: str) -> NearDuplicateIndex:
+        if scope in self._indexes:
+            self._indexes.move_to_end(scope)
+        else:
+            if len(self._indexes) >= self.max_scopes:
+                self._indexes.popitem(last=False)
+            self._indexes[scope] = NearDuplicateIndex()
+        return self._indexes[scope]
+
+    def clear(self):
+        """Drop all indexes"""
+        self._indexes.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Aggregate counters for the health endpoint"""
+        checked = sum(index.checked for index in self._indexes.values())
+        duplicates = sum(index.duplicates for index in self._indexes.values())
+        return {
+            'scopes': len(self._indexes),
+            'indexed_jobs': sum(len(index) for index in self._indexes.values()),
+            'checked': checked,
+            'near_duplicates': duplicates,
+            'duplicate_rate': round(duplicates / checked, 3) if checked else 0.0
+        }
+
+
+# Global instance
+near_duplicates = NearDuplicateRegistry()
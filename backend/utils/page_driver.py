@@ -0,0 +1,50 @@
+"""
+Selenium stand-in for serving pages without a browser
+Used by the replay worker (archived pages) and the offline benchmark (stub
+server pages) in place of Chrome, so the Selenium scrapers run unmodified
+"""
+import re
+from typing import List
+
+# Card outerHTML in a LinkedIn results page (each card is the only child of an <li>)
+_LINKEDIN_CARD_RE = re.compile(r'<div class="base-card\b.*?</div>(?=\s*</li>)', re.S)
+
+
+class PageDriver:
+    """
+    Just enough of a Chrome WebDriver for the Selenium scrapers
+    Subclasses supply page HTML through fetch(); LinkedIn's new-cards script
+    returns card outerHTML slices, a page-worth (25 cards) per scroll like infinite scroll
+    """
+
+    CARDS_PER_SCROLL = 25
+
+    def __init__(self):
+        self._load("")
+
+    def fetch(self, url: str) -> str:
+        """HTML for a URL"""
+        raise NotImplementedError
+
+    def get(self, url: str):
+        self._load(self.fetch(url))
+
+    def _load(self, html: str):
+        self.page_source = html
+        self._cards: List[str] = _LINKEDIN_CARD_RE.findall(html)
+        self._loaded = min(self.CARDS_PER_SCROLL, len(self._cards))
+
+    def execute_script(self, script: str, *args):
+        if 'scrollTo' in script:
+            self._loaded = min(self._loaded + self.CARDS_PER_SCROLL, len(self._cards))
+            return None
+        if args and isinstance(args[0], int):
+            return self._cards[args[0]:self._loaded]
+        return None
+
+    def find_element(self, *args, **kwargs):
+        from selenium.common.exceptions import NoSuchElementException
+        raise NoSuchElementException(f"{type(self).__name__} has no interactive elements")
+
+    def quit(self):
+        pass
@@ -0,0 +1,108 @@
+"""
+Query-level memoization for scrape results
+Users with identical (or reordered) search keywords share one fetch per source
+for the TTL, instead of each triggering their own Indeed/LinkedIn/Glassdoor scrape
+"""
+import os
+import re
+import time
+import asyncio
+import logging
+from typing import List, Dict, Any, Callable, Awaitable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default TTL matches the 10 minute scrape cycle
+QUERY_MEMO_TTL_SECONDS = int(os.getenv("SCRAPER_QUERY_MEMO_TTL", "600"))
+
+
+def normalize_keywords(keywords: str) -> str:
+    """Lowercase, dedupe and sort comma-separated keywords so 'SQL, Python' == 'python,sql'"""
+    terms = {' '.join(term.split()) for term in re.split(r'[,;]', keywords.lower())}
+    return ', '.join(sorted(term for term in terms if term))
+
+
+class QueryMemo:
+    """TTL memo of scrape results keyed by (source, normalized keywords, location)"""
+
+    def __init__(self, ttl_seconds: int = QUERY_MEMO_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Tuple[str, str, str, str], Tuple[float, List[Dict[str, Any]]]] = {}
+        self._in_flight: Dict[Tuple[str, str, str, str], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, source: str, keywords: str, location: str, variant: str = "") -> Tuple[str, str, str, str]:
+        return (source, normalize_keywords(keywords), ' '.join((location or '').lower().split()), variant)
+
+    def _purge_expired(self, now: float):
+        expired = [key for key, (stored_at, _) in self._entries.items() if now - stored_at > self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+
+    async def get_or_fetch(
+        self,
+        source: str,
+        keywords: str,
+        location: str,
+        fetch: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        variant: str = ""
+    ) -> List[Dict[str, Any]]:
+        """
+        Return memoized jobs for the query, or run `fetch` once and share the result
+        Concurrent callers for the same key wait on the same in-flight fetch
+        Each caller gets its own copies of the job dicts, since callers annotate them
+        variant: anything else the fetch depends on (e.g. the watermark it starts from)
+        """
+        key = self._key(source, keywords, location, variant)
+        now = time.monotonic()
+
+        entry = self._entries.get(key)
+        if entry and now - entry[0] <= self.ttl_seconds:
+            self.hits += 1
+            logger.info(f"Query memo hit: {source} '{key[1]}' ({len(entry[1])} jobs)")
+            return [dict(job) for job in entry[1]]
+
+        if key in self._in_flight:
+            self.hits += 1
+            jobs = await asyncio.shield(self._in_flight[key])
+            return [dict(job) for job in jobs]
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            jobs = await fetch()
+            self._purge_expired(now)
+            self._entries[key] = (time.monotonic(), jobs)
+            future.set_result(jobs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; mark the exception as retrieved
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+        return [dict(job) for job in jobs]
+
+    def clear(self):
+        """Drop all memoized results (e.g. at the start of a new cycle)"""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
+
+
+# Global instance
+query_memo = QueryMemo()
@@ -0,0 +1,262 @@
+"""
+Raw scrape snapshot archive
+Every raw source response (API JSON, fetched HTML, Selenium page source) is
+stored gzip-compressed under its SHA-256, so identical feed bodies are kept
+once; a daily JSONL index records one line per source call: kind, source,
+call arguments, time and the responses it received in order
+
+Replay mode serves archived calls back to the same scraper code (see
+backend.workers.replay), so parsing, dedup, scoring and storage can be rerun
+after a normalization or scoring change without any network
+"""
+import os
+import gzip
+import json
+import hashlib
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = os.getenv("SCRAPER_ARCHIVE_DIR", "./.cache/archive")
+ARCHIVE_ENABLED = os.getenv("SCRAPER_ARCHIVE", "1") == "1"
+ARCHIVE_RETENTION_DAYS = int(os.getenv("SCRAPER_ARCHIVE_RETENTION_DAYS", "14"))
+
+
+@dataclass
+class ArchivedResponse:
+    """One raw response within a call; the body lives in objects/ under its hash"""
+    url: str
+    sha256: str
+    bytes: int
+    content_type: str = ''
+    status: int = 200
+
+
+@dataclass
+class ArchivedCall:
+    """One source call (a registry fetch) and the responses it received"""
+    kind: str
+    source: str
+    args: List[Any]
+    ts: str
+    responses: List[ArchivedResponse] = field(default_factory=list)
+    # Replay cursor: responses already served, by position
+    _served: set = field(default_factory=set, repr=False)
+
+    @property
+    def signature(self) -> Tuple[str, str, str]:
+        return (self.kind, self.source, json.dumps(self.args))
+
+
+_current_call: contextvars.ContextVar[Optional[ArchivedCall]] = contextvars.ContextVar('archived_call', default=None)
+
+
+class ScrapeArchive:
+    """Content-addressed body store plus per-day call index"""
+
+    def __init__(self, root: str = ARCHIVE_DIR, enabled: bool = ARCHIVE_ENABLED):
+        self.root = root
+        self.enabled = enabled
+        # Signature -> archived call to serve, set while replaying
+        self._replay: Optional[Dict[Tuple[str, str, str], ArchivedCall]] = None
+        self._index_lock = threading.Lock()
+        self.stats = {'calls': 0, 'responses': 0, 'objects_written': 0, 'bytes_written': 0}
+
+    @property
+    def replaying(self) -> bool:
+        return self._replay is not None
+
+    # ==================== STORAGE ====================
+
+    def _object_path(self, sha256: str) -> str:
+        return os.path.join(self.root, 'objects', sha256[:2], f"{sha256}.gz")
+
+    def _index_path(self, day: str) -> str:
+        return os.path.join(self.root, 'index', f"{day}.jsonl")
+
+    def _store_object(self, body: bytes) -> str:
+        sha256 = hashlib.sha256(body).hexdigest()
+        path = self._object_path(sha256)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+            self.stats['objects_written'] += 1
+            self.stats['bytes_written'] += os.path.getsize(path)
+        return sha256
+
+    def load_body(self, sha256: str) -> bytes:
+        with gzip.open(self._object_path(sha256), 'rb') as f:
+            return f.read()
+
+    def _append_index(self, call: ArchivedCall):
+        line = json.dumps({key: value for key, value in asdict(call).items() if not key.startswith('_')})
+        path = self._index_path(call.ts[:10])
+        with self._index_lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+    # ==================== RECORDING ====================
+
+    @contextmanager
+    def capture(self, kind: str, source: str, args: tuple) -> Iterator[Optional[ArchivedCall]]:
+        """
+        Scope one source call: responses recorded inside it are indexed together
+        While replaying, yields the archived call to serve instead (None if it wasn't archived)
+        """
+        if self._replay is not None:
+            call = self._replay.get((kind, source, json.dumps(list(args))))
+            if call is not None:
+                call._served = set()
+        else:
+            call = ArchivedCall(kind, source, list(args), datetime.now(timezone.utc).isoformat())
+
+        token = _current_call.set(call)
+        try:
+            yield call
+        finally:
+            _current_call.reset(token)
+            if self.enabled and self._replay is None and call.responses:
+                try:
+                    self._append_index(call)
+                    self.stats['calls'] += 1
+                except OSError as e:
+                    logger.warning(f"Scrape archive: could not index {source} call: {e}")
+
+    def record(self, url: str, body: bytes, content_type: str = '', status: int = 200):
+        """Archive a raw response for the current call (no-op outside a call or while replaying)"""
+        call = _current_call.get()
+        if not self.enabled or self._replay is not None or call is None:
+            return
+        try:
+            sha256 = self._store_object(body)
+        except OSError as e:
+            logger.warning(f"Scrape archive: could not store {url}: {e}")
+            return
+        call.responses.append(ArchivedResponse(url, sha256, len(body), content_type, status))
+        self.stats['responses'] += 1
+
+    def record_page(self, url: str, html: str):
+        """Archive a rendered (Selenium) page source"""
+        self.record(url, html.encode('utf-8'), 'text/html; charset=utf-8')
+
+    def instrument_session(self, session: requests.Session):
+        """Archive every final response received by this session"""
+        session.hooks['response'].append(self._on_response)
+
+    def _on_response(self, response: requests.Response, *args, **kwargs):
+        # Redirect hops and 304s carry no body worth keeping (cached bodies are recorded by the caller)
+        if response.is_redirect or response.status_code == 304 or _current_call.get() is None:
+            return
+        original = response.history[0] if response.history else response
+        self.record(
+            original.request.url, response.content, response.headers.get('Content-Type', ''), response.status_code
+        )
+
+    # ==================== REPLAY ====================
+
+    def iter_calls(self, since: datetime, until: datetime, sources: Optional[List[str]] = None) -> Iterator[ArchivedCall]:
+        """Archived calls in [since, until] (UTC), oldest first"""
+        day = since.date()
+        while day <= until.date():
+            try:
+                with open(self._index_path(day.isoformat()), 'r', encoding='utf-8') as f:
+                    lines = f.readlines()
+            except OSError:
+                lines = []
+            for line in lines:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if not since <= datetime.fromisoformat(entry['ts']) <= until:
+                    continue
+                if sources and entry['source'] not in sources:
+                    continue
+                entry['responses'] = [ArchivedResponse(**response) for response in entry['responses']]
+                yield ArchivedCall(**entry)
+            day += timedelta(days=1)
+
+    def start_replay(self, since: datetime, until: datetime, sources: Optional[List[str]] = None) -> int:
+        """Serve archived calls from the window (latest per kind/source/arguments); returns calls loaded"""
+        self._replay = {call.signature: call for call in self.iter_calls(since, until, sources)}
+        return len(self._replay)
+
+    def stop_replay(self):
+        self._replay = None
+
+    def archived_response(self, url: str) -> Optional[Tuple[bytes, str, int]]:
+        """
+        Next unserved archived response for a URL in the current call, as (body, content_type, status)
+        Falls back to the last response for the URL when the scraper asks again
+        """
+        call = _current_call.get()
+        if call is None:
+            return None
+        match = None
+        for position, response in enumerate(call.responses):
+            if response.url != url:
+                continue
+            match = (position, response)
+            if position not in call._served:
+                break
+        if match is None:
+            return None
+        position, response = match
+        call._served.add(position)
+        return self.load_body(response.sha256), response.content_type, response.status
+
+    # ==================== MAINTENANCE ====================
+
+    def prune(self, days: int = ARCHIVE_RETENTION_DAYS) -> int:
+        """Drop index files older than `days` and bodies no remaining call refers to; returns bodies removed"""
+        index_dir = os.path.join(self.root, 'index')
+        objects_dir = os.path.join(self.root, 'objects')
+        if not os.path.isdir(index_dir):
+            return 0
+
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).date().isoformat()
+        live = set()
+        for name in sorted(os.listdir(index_dir)):
+            path = os.path.join(index_dir, name)
+            if name[:10] < cutoff:
+                os.remove(path)
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        live.update(response['sha256'] for response in json.loads(line)['responses'])
+                    except (ValueError, KeyError):
+                        continue
+
+        removed = 0
+        # Bodies from the last hour may belong to a call that isn't indexed yet
+        recent = datetime.now().timestamp() - 3600
+        for prefix in os.listdir(objects_dir) if os.path.isdir(objects_dir) else []:
+            for name in os.listdir(os.path.join(objects_dir, prefix)):
+                path = os.path.join(objects_dir, prefix, name)
+                if name.split('.', 1)[0] not in live and os.path.getmtime(path) < recent:
+                    os.remove(path)
+                    removed += 1
+
+        logger.info(f"Scrape archive: pruned {removed} bodies older than {days} days")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Write counters since startup"""
+        return {'enabled': self.enabled, **self.stats}
+
+
+# Global instance
+scrape_archive = ScrapeArchive()
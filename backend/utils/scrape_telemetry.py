@@ -0,0 +1,165 @@
+"""
+Per-source scrape telemetry
+Records one entry per source per pipeline run (latency, bytes downloaded, items
+parsed/deduped/unchanged/written, fallback used, exception class) in a rolling window,
+so /health/scrapers and /metrics show which source is eating the cycle budget
+
+Scrapers don't return this detail, so the current run is kept in a context
+variable: HTTP response hooks add bytes, fallback generators and circuit
+breaker failures mark the run they happen in
+"""
+import os
+import time
+import logging
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Runs kept per source
+TELEMETRY_WINDOW = int(os.getenv("SCRAPER_TELEMETRY_WINDOW", "50"))
+
+
+@dataclass
+class SourceRun:
+    """Telemetry for one source in one pipeline run"""
+    source: str
+    pipeline: str
+    started_at: float
+    latency_seconds: float = 0.0
+    bytes_downloaded: int = 0
+    requests: int = 0
+    items_parsed: int = 0
+    items_deduped: int = 0
+    items_unchanged: int = 0
+    items_written: int = 0
+    fallback_used: bool = False
+    error: Optional[str] = None
+
+
+_current_run: contextvars.ContextVar[Optional[SourceRun]] = contextvars.ContextVar('scrape_run', default=None)
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ScrapeTelemetry:
+    """Rolling window of SourceRun records per source"""
+
+    def __init__(self, window: int = TELEMETRY_WINDOW):
+        self.window = window
+        self._runs: Dict[str, deque] = {}
+
+    @contextmanager
+    def track(self, source: str, pipeline: str = ""):
+        """Time a source fetch and make it the current run for hooks called inside it"""
+        run = SourceRun(source=source, pipeline=pipeline, started_at=time.time())
+        token = _current_run.set(run)
+        start = time.perf_counter()
+        try:
+            yield run
+        except Exception as e:
+            run.error = type(e).__name__
+            raise
+        finally:
+            run.latency_seconds = time.perf_counter() - start
+            _current_run.reset(token)
+
+    def record(self, run: SourceRun):
+        """Store a finished run (call once its dedup/write counts are final)"""
+        self._runs.setdefault(run.source, deque(maxlen=self.window)).append(run)
+
+    def instrument_session(self, session: requests.Session):
+        """Count response bytes for the current run on every request made by this session"""
+        session.hooks['response'].append(self._on_response)
+
+    @staticmethod
+    def _on_response(response: requests.Response, *args, **kwargs):
+        run = _current_run.get()
+        if run is not None:
+            run.requests += 1
+            # Header when present, so streaming bodies aren't forced to load here
+            length = response.headers.get('Content-Length')
+            run.bytes_downloaded += int(length) if length and length.isdigit() else len(response.content)
+
+    @staticmethod
+    def mark_fallback():
+        """Flag the current run as having returned generated fallback data"""
+        run = _current_run.get()
+        if run is not None:
+            run.fallback_used = True
+
+    @staticmethod
+    def mark_error(error: Optional[BaseException]):
+        """Note an exception a scraper caught and handled itself"""
+        run = _current_run.get()
+        if run is not None and error is not None:
+            run.error = type(error).__name__
+
+    def get_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-source aggregates over the window, plus the most recent run"""
+        summary = {}
+        total_latency = sum(run.latency_seconds for runs in self._runs.values() for run in runs) or 1.0
+
+        for source, runs in sorted(self._runs.items()):
+            latencies = [run.latency_seconds for run in runs]
+            errors: Dict[str, int] = {}
+            for run in runs:
+                if run.error:
+                    errors[run.error] = errors.get(run.error, 0) + 1
+
+            summary[source] = {
+                'runs': len(runs),
+                'latency_p50_seconds': round(_percentile(latencies, 0.5), 3),
+                'latency_p95_seconds': round(_percentile(latencies, 0.95), 3),
+                'latency_share': round(sum(latencies) / total_latency, 3),
+                'bytes_downloaded': sum(run.bytes_downloaded for run in runs),
+                'items_parsed': sum(run.items_parsed for run in runs),
+                'items_deduped': sum(run.items_deduped for run in runs),
+                'items_unchanged': sum(run.items_unchanged for run in runs),
+                'items_written': sum(run.items_written for run in runs),
+                'fallback_runs': sum(1 for run in runs if run.fallback_used),
+                'errors': errors,
+                'last_run': asdict(runs[-1])
+            }
+        return summary
+
+    def render_prometheus(self) -> str:
+        """Window aggregates in the Prometheus text exposition format"""
+        metrics = [
+            ('scraper_source_runs', 'gauge', 'Runs in the telemetry window', 'runs'),
+            ('scraper_source_latency_p50_seconds', 'gauge', 'Median fetch latency', 'latency_p50_seconds'),
+            ('scraper_source_latency_p95_seconds', 'gauge', '95th percentile fetch latency', 'latency_p95_seconds'),
+            ('scraper_source_latency_share', 'gauge', 'Share of total fetch time', 'latency_share'),
+            ('scraper_source_bytes_downloaded', 'gauge', 'Bytes downloaded in the window', 'bytes_downloaded'),
+            ('scraper_source_items_parsed', 'gauge', 'Items parsed in the window', 'items_parsed'),
+            ('scraper_source_items_deduped', 'gauge', 'Items dropped as duplicates in the window', 'items_deduped'),
+            ('scraper_source_items_unchanged', 'gauge', 'Items already stored unchanged in the window', 'items_unchanged'),
+            ('scraper_source_items_written', 'gauge', 'Items written in the window', 'items_written'),
+            ('scraper_source_fallback_runs', 'gauge', 'Runs that returned fallback data', 'fallback_runs'),
+        ]
+        summary = self.get_summary()
+        lines = []
+        for name, kind, help_text, key in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for source, stats in summary.items():
+                lines.append(f'{name}{{source="{source}"}} {stats[key]}')
+
+        lines.append("# HELP scraper_source_errors Runs that ended with an exception, by class")
+        lines.append("# TYPE scraper_source_errors gauge")
+        for source, stats in summary.items():
+            for error, count in stats['errors'].items():
+                lines.append(f'scraper_source_errors{{source="{source}",error="{error}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+# Global instance
+scrape_telemetry = ScrapeTelemetry()
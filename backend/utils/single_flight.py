@@ -0,0 +1,78 @@
+"""
+Single-flight coalescing of identical in-flight calls
+Concurrent callers with the same key share one running call and its result
+instead of each starting their own; nothing is kept once the call finishes
+(caching results is left to the caller)
+"""
+import json
+import asyncio
+import hashlib
+import logging
+import weakref
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class _LeaderCancelled(Exception):
+    """The caller running the shared call was cancelled; waiters run it themselves"""
+
+
+def flight_key(*parts: Any) -> str:
+    """Hash of the call's inputs (e.g. prompt, system prompt and sampling settings)"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SingleFlight:
+    """In-flight calls keyed by input hash; callers arriving mid-call wait on the same future"""
+
+    def __init__(self):
+        # Futures are bound to their event loop; Celery tasks each run their own loop
+        self._in_flight: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]' = \
+            weakref.WeakKeyDictionary()
+        self.calls = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Result of `call`, shared with every concurrent caller using the same key
+        Errors are shared too; if the caller running the call is cancelled,
+        the waiting callers start over instead of being cancelled with it
+        """
+        in_flight = self._in_flight.setdefault(asyncio.get_running_loop(), {})
+        while key in in_flight:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(in_flight[key])
+            except _LeaderCancelled:
+                self.coalesced -= 1
+
+        self.calls += 1
+        future = asyncio.get_running_loop().create_future()
+        in_flight[key] = future
+        try:
+            result = await call()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; mark the exception as retrieved
+            future.exception()
+            raise
+        finally:
+            del in_flight[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Calls actually made and calls that joined one already in flight"""
+        total = self.calls + self.coalesced
+        return {
+            'calls': self.calls,
+            'coalesced': self.coalesced,
+            'coalesced_rate': round(self.coalesced / total, 3) if total else 0.0,
+            'in_flight': sum(len(calls) for calls in self._in_flight.values())
+        }
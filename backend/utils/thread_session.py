@@ -0,0 +1,76 @@
+"""
+Per-thread requests sessions for scrapers
+Blocking sources run on worker threads, and a requests.Session (cookie jar,
+mounted adapters) isn't meant to be shared between threads. A ThreadLocalSession
+keeps one template session for configuration and hands each thread its own copy
+"""
+import threading
+from typing import Any, List
+
+import requests
+from requests.adapters import BaseAdapter
+
+
+class ThreadLocalSession:
+    """
+    Drop-in for requests.Session where each thread gets its own session
+    Headers and hooks set on it (before first use) and adapters mounted on it
+    (at any time, e.g. by the replay worker or the offline benchmark) apply to
+    every thread's session; requests go through the calling thread's session
+    """
+
+    def __init__(self):
+        self.template = requests.Session()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sessions: List[requests.Session] = []
+
+    @property
+    def headers(self):
+        return self.template.headers
+
+    @property
+    def hooks(self):
+        return self.template.hooks
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            with self._lock:
+                session.headers = self.template.headers.copy()
+                session.hooks = {event: list(hooks) for event, hooks in self.template.hooks.items()}
+                for prefix, adapter in self.template.adapters.items():
+                    session.mount(prefix, adapter)
+                self._sessions.append(session)
+            self._local.session = session
+        return session
+
+    def mount(self, prefix: str, adapter: BaseAdapter):
+        """Mount an adapter on the template and on every thread's session"""
+        with self._lock:
+            self.template.mount(prefix, adapter)
+            for session in self._sessions:
+                session.mount(prefix, adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        return self._session().request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self._session().get(url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self._session().post(url, **kwargs)
+
+    def close(self):
+        """Close every thread's session and the template"""
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions = []
+            self.template.close()
+        self._local = threading.local()
+
+    def __getattr__(self, name: str) -> Any:
+        # Anything else (cookies, proxies, ...) reads from the calling thread's session
+        return getattr(self._session(), name)
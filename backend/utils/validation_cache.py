@@ -0,0 +1,146 @@
+"""
+Two-level memo cache for LLM validation results
+An in-memory LRU in front of one small JSON file per entry on disk, keyed by a
+hash of the normalized inputs plus the model and prompt version, so the same
+job validated for users with identical profiles costs one LLM call per TTL and
+survives restarts
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+VALIDATION_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "./.cache/validation")
+VALIDATION_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+VALIDATION_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "5000"))
+
+
+def normalize_text(text: Any) -> str:
+    """Lowercase and collapse whitespace so formatting-only differences share an entry"""
+    return ' '.join(str(text or '').lower().split())
+
+
+def normalize_terms(terms) -> list:
+    """Lowercase, dedupe and sort a skill/interest list (or comma-separated string)"""
+    if isinstance(terms, str):
+        terms = re.split(r'[,;]', terms)
+    return sorted({normalize_text(term) for term in terms or [] if normalize_text(term)})
+
+
+def make_key(kind: str, model: str, prompt_version: int, *parts: Any) -> str:
+    """Cache key for one prompt: kind, model, prompt version and the normalized inputs"""
+    payload = json.dumps([kind, model, prompt_version, *parts], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ValidationCache:
+    """key -> JSON-serializable result, with an LRU memory tier and a TTL'd disk tier"""
+
+    def __init__(
+        self,
+        cache_dir: str = VALIDATION_CACHE_DIR,
+        ttl_seconds: int = VALIDATION_CACHE_TTL_SECONDS,
+        max_memory_entries: int = VALIDATION_CACHE_MEMORY_ENTRIES
+    ):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self._memory: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0, 'lookup_seconds': 0.0}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _remember(self, key: str, stored_at: float, value: Any):
+        self._memory[key] = (stored_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, key: str, now: float) -> Tuple[Optional[str], Any]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            if now - entry[0] <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                return 'memory_hits', entry[1]
+            del self._memory[key]
+
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None, None
+        if now - entry.get('stored_at', 0) > self.ttl_seconds:
+            return None, None
+
+        self._remember(key, entry['stored_at'], entry['value'])
+        return 'disk_hits', entry['value']
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached result for a key, or None if there is no fresh entry"""
+        started = time.perf_counter()
+        tier, value = self._lookup(key, time.time())
+        self.stats[tier or 'misses'] += 1
+        self.stats['lookup_seconds'] += time.perf_counter() - started
+        return value
+
+    def set(self, key: str, value: Any):
+        """Store a result in both tiers (only cache successful LLM answers)"""
+        stored_at = time.time()
+        self._remember(key, stored_at, value)
+        path = self._path(key)
+        # Unique per writer: Celery workers share the directory and validate on several threads
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'stored_at': stored_at, 'value': value}, f)
+            os.replace(tmp_path, path)
+            self.stats['writes'] += 1
+        except OSError as e:
+            logger.warning(f"Validation cache: could not persist {key}: {e}")
+
+    def prune(self) -> int:
+        """Delete disk entries past the TTL (and temp files left by crashed writers); returns files removed"""
+        now = time.time()
+        removed = 0
+        for prefix in os.listdir(self.cache_dir):
+            directory = os.path.join(self.cache_dir, prefix)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                # Entries are written once at stored_at, so the file's mtime is its age
+                max_age = 3600 if name.endswith('.tmp') else self.ttl_seconds
+                try:
+                    if now - os.path.getmtime(path) > max_age:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    continue
+
+        if removed:
+            logger.info(f"Validation cache: pruned {removed} expired entries")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-tier hit counters since startup"""
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        lookups = hits + self.stats['misses']
+        return {
+            'memory_entries': len(self._memory),
+            'memory_hits': self.stats['memory_hits'],
+            'disk_hits': self.stats['disk_hits'],
+            'misses': self.stats['misses'],
+            'writes': self.stats['writes'],
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+            'avg_lookup_us': round(self.stats['lookup_seconds'] / lookups * 1e6, 1) if lookups else 0.0
+        }
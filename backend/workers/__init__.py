@@ -0,0 +1 @@
+# Distributed scrape workers (Celery)
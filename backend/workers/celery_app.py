@@ -0,0 +1,49 @@
+"""
+Celery application for distributed scraping
+Scrape units are published by the API process and consumed by separately
+launched workers, which can be scaled horizontally:
+
+    celery -A backend.workers.celery_app worker -Q scrape --concurrency 4
+
+Delivery is at-least-once (late acks, requeue on worker loss) and all job
+writes use deterministic document ids, so a redelivered unit is harmless.
+For local runs and tests, set CELERY_BROKER_URL=memory:// (in-process
+broker) and optionally CELERY_TASK_ALWAYS_EAGER=true to run units inline.
+"""
+import os
+import sys
+
+# Workers are launched outside uvicorn, so make the backend package importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from celery import Celery
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND") or None
+SCRAPE_QUEUE = os.getenv("SCRAPE_QUEUE", "scrape")
+
+celery_app = Celery(
+    'gophora_scrapers',
+    broker=CELERY_BROKER_URL,
+    backend=CELERY_RESULT_BACKEND,
+    include=['backend.workers.tasks']
+)
+
+celery_app.conf.update(
+    task_default_queue=SCRAPE_QUEUE,
+    task_serializer='json',
+    accept_content=['json'],
+    result_serializer='json',
+    # At-least-once: ack only after the unit finished, requeue if the worker dies
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    # Redis redelivers unacked units after this many seconds
+    broker_transport_options={'visibility_timeout': int(os.getenv("SCRAPE_VISIBILITY_TIMEOUT", "3600"))},
+    task_time_limit=int(os.getenv("SCRAPE_TASK_TIME_LIMIT", "900")),
+    task_always_eager=os.getenv("CELERY_TASK_ALWAYS_EAGER", "false").lower() == "true",
+    task_eager_propagates=True,
+)
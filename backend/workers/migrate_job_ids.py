@@ -0,0 +1,39 @@
+"""
+Move jobs stored before deterministic document ids to their job_document_id
+Scrapers now write each posting under a hash of its identifying fields; jobs
+stored earlier under auto-generated ids would otherwise sit next to their
+re-scraped copies. Exact duplicates (same title, company and sourceLink) are
+merged into the deterministic document, keeping their fields; anything that
+would merge distinct postings is left in place and reported.
+
+Runs once: completion is recorded in scraperState and later runs skip unless --force
+
+Usage (from repo root):
+    python -m backend.workers.migrate_job_ids [--force]
+"""
+import os
+import sys
+import asyncio
+import argparse
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.database.firestore_client import firestore_client  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-key legacy auto-id job documents to deterministic ids")
+    parser.add_argument('--force', action='store_true', help="Run even if the migration was already recorded as done")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    totals = asyncio.run(firestore_client.migrate_legacy_job_ids(force=args.force))
+    print(
+        f"Moved {totals['moved']} jobs ({totals['deleted']} legacy documents), "
+        f"left {totals['conflicts']} conflicting documents in place"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Replay archived scrape responses through the ingestion pipelines
+Archived source calls (see backend.utils.scrape_archive) are served back to
+the unmodified scrapers: HTTP sessions answer from archived bodies and
+Selenium sources get a driver that loads archived pages. Parsing,
+normalization, dedup, scoring and storage run as in a live cycle, with no
+network, rate limits or politeness delays. Relevance scoring is local-only:
+the cascade never escalates to an LLM, so replay makes no OpenAI/Gemini calls
+
+Personalized calls are replayed for users whose current profile builds the
+same query; general calls go through the general pipeline. Unchanged jobs are
+skipped by the content-hash check, so only reprocessed jobs are rewritten
+
+Usage (from repo root):
+    python -m backend.workers.replay [--since 2026-10-18] [--until 2026-10-19T06:00]
+        [--source RemoteOK] [--kind all|personalized|general] [--user ID] [--dry-run]
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import logging
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.utils.page_driver import PageDriver  # noqa: E402
+from backend.utils.scrape_archive import scrape_archive  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Answers requests from the archived call being replayed; 404 for anything not archived"""
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.connection = self
+
+        archived = scrape_archive.archived_response(request.url)
+        if archived is None:
+            response.status_code = 404
+            response._content = b''
+        else:
+            body, content_type, status = archived
+            response.status_code = status
+            response._content = body
+            response.headers['Content-Type'] = content_type
+            response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+
+class ReplayDriver(PageDriver):
+    """Selenium stand-in that loads pages from the archived call being replayed"""
+
+    def fetch(self, url: str) -> str:
+        archived = scrape_archive.archived_response(url)
+        return archived[0].decode('utf-8', 'replace') if archived else ""
+
+
+def _parse_time(value: str) -> datetime:
+    moment = datetime.fromisoformat(value)
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _prepare_scrapers():
+    """
+    Route scraper I/O to the archive, turn off state that would hide archived
+    items, and keep scoring local (no LLM provider calls)
+    """
+    from backend.services.ai_validator import ai_validator
+    from backend.services.scraper_api import api_scraper
+    from backend.services.scraper_general import general_scraper
+    from backend.services.scraper_personalized import personalized_scraper
+    from backend.services.source_registry import source_registry
+    from backend.services.watermarks import watermark_store, WatermarkScan
+    from backend.utils.http_cache import HTTPCache
+
+    adapter = ReplayAdapter()
+    for scraper in (api_scraper, general_scraper, personalized_scraper):
+        scraper.session.mount('https://', adapter)
+        scraper.session.mount('http://', adapter)
+    for scraper in (general_scraper, personalized_scraper):
+        scraper._get_selenium_driver = ReplayDriver
+        scraper._random_delay = lambda *args, **kwargs: None
+
+    for source_adapter in source_registry._adapters.values():
+        source_adapter.min_interval_seconds = 0
+        source_adapter.incremental = False
+
+    # A fresh HTTP cache and no watermarks, so feeds aren't skipped as already processed
+    api_scraper.http_cache = HTTPCache(cache_dir=tempfile.mkdtemp(prefix='replay-http-cache-'))
+
+    async def scan_without_watermark(key: Optional[str]) -> WatermarkScan:
+        return WatermarkScan(watermark_store, None, None)
+
+    watermark_store.scan = scan_without_watermark
+
+    # The relevance cascade and categorizer only use an LLM while a provider is enabled
+    ai_validator.use_openai = False
+    ai_validator.use_gemini = False
+
+
+async def _replay(kind: str, user_ids: Optional[List[str]]) -> dict:
+    from backend.database.firestore_client import firestore_client
+    from backend.services.scraper_general import general_scraper
+    from backend.services.scraper_personalized import personalized_scraper
+
+    summary = {'users': 0, 'personalized_written': 0, 'general_written': 0}
+
+    if kind in ('all', 'personalized'):
+        if user_ids is None:
+            user_ids = [doc.id for doc in firestore_client.db.collection('users').stream()]
+        for user_id in user_ids:
+            summary['personalized_written'] += await personalized_scraper.scrape_jobs_for_user(user_id)
+            summary['users'] += 1
+
+    if kind in ('all', 'general'):
+        summary['general_written'] = await general_scraper.scrape_all_general_jobs()
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay archived scrape responses through the ingestion pipelines. "
+                    "Relevance scoring is local-only (no OpenAI/Gemini calls)"
+    )
+    parser.add_argument('--since', help="Start of the window, ISO date/time in UTC (default: 24 hours ago)")
+    parser.add_argument('--until', help="End of the window, ISO date/time in UTC (default: now)")
+    parser.add_argument('--source', action='append', help="Only these sources")
+    parser.add_argument('--kind', choices=['all', 'personalized', 'general'], default='all')
+    parser.add_argument('--user', action='append', help="Only these users (personalized replay)")
+    parser.add_argument('--dry-run', action='store_true', help="Store into an in-memory database instead of Firestore")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.dry_run:
+        # Must run before backend.services connects to Firestore
+        from backend.benchmarks import offline
+        offline.install()
+
+    until = _parse_time(args.until) if args.until else datetime.now(timezone.utc)
+    since = _parse_time(args.since) if args.since else until - timedelta(days=1)
+
+    _prepare_scrapers()
+    loaded = scrape_archive.start_replay(since, until, args.source)
+    print(f"Replaying {loaded} archived calls from {since.isoformat()} to {until.isoformat()}")
+
+    start = time.perf_counter()
+    try:
+        summary = asyncio.run(_replay(args.kind, args.user))
+    finally:
+        scrape_archive.stop_replay()
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"Replayed in {elapsed:.1f}s: {summary['personalized_written']} personalized jobs written "
+        f"for {summary['users']} users, {summary['general_written']} general jobs written"
+    )
+
+
+if __name__ == "__main__":
+    main()
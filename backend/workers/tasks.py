@@ -0,0 +1,75 @@
+"""
+Scrape work units and publishers
+A unit is either (user x personalized source) or one general source
+"""
+import asyncio
+import logging
+from typing import Dict
+
+from backend.workers.celery_app import celery_app
+from backend.database.firestore_client import firestore_client
+from backend.services.scraper_personalized import personalized_scraper
+from backend.services.scraper_general import general_scraper
+from backend.services.scrape_policy import scrape_policy
+from backend.services.source_registry import source_registry, GENERAL
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(
+    name='scrape.user_source',
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    max_retries=3
+)
+def scrape_user_source(user_id: str, source: str) -> int:
+    """Scrape one personalized source for one user"""
+    return asyncio.run(personalized_scraper.scrape_source_for_user(user_id, source))
+
+
+@celery_app.task(
+    name='scrape.general_source',
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    max_retries=3
+)
+def scrape_general_source(source: str) -> int:
+    """Scrape one general source into the shared collection"""
+    return asyncio.run(general_scraper.scrape_general_source(source))
+
+
+def publish_personalized_cycle() -> Dict[str, int]:
+    """
+    Publish one unit per (due user x source) for this cycle
+    Users are picked by the activity-tier policy, hottest first
+    Returns {user_id: units_published}
+    """
+    users_ref = firestore_client.db.collection('users')
+    users = {user_doc.id: user_doc.to_dict() or {} for user_doc in users_ref.stream()}
+
+    published = {}
+    for user_id, tier in scrape_policy.plan(list(users.items())):
+        profile = personalized_scraper.build_search_profile(user_id, users[user_id])
+        if not profile:
+            continue
+
+        sources = personalized_scraper.sources_for_profile(profile)
+        for source in sources:
+            scrape_user_source.delay(user_id, source)
+
+        # Job counts arrive asynchronously from workers; the tier interval starts now
+        scrape_policy.record_scrape(user_id, tier, 0)
+        published[user_id] = len(sources)
+
+    logger.info(f"Published {sum(published.values())} personalized scrape units for {len(published)} users")
+    return published
+
+
+def publish_general_cycle() -> int:
+    """Publish one unit per general source; returns units published"""
+    sources = source_registry.names(GENERAL)
+    for source in sources:
+        scrape_general_source.delay(source)
+
+    logger.info(f"Published {len(sources)} general scrape units")
+    return len(sources)